@@ -1,4 +1,6 @@
-from mise.app import run
+import sys
+
+from mise.cli import main
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    sys.exit(main())
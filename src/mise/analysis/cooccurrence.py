@@ -0,0 +1,178 @@
+"""
+Code co-occurrence over character intervals.
+
+Two codes co-occur where a segment of one overlaps a segment of the other,
+or, with a proximity window, where they lie at most window characters
+apart. For every pair of codes the matrix holds:
+
+- counts: segment pairs that co-occur (a segment of each code)
+- overlap_chars: characters coded with both codes, from the union of each
+  code's segments so repeated codings of a passage count once
+- jaccard: overlap_chars / characters coded with either code
+
+Pairs are found with a sweep over segments sorted by document and start
+rather than by comparing codes pairwise. Every document is laid out on one
+axis, so a single searchsorted gives, for each segment, how many later
+segments start before it ends (plus the window). The pairs themselves are
+expanded in bounded chunks and accumulated into the matrix with bincount.
+
+Usage:
+matrix = compute_cooccurrence(repo, window=200)
+frame = matrix.to_frame("jaccard")
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from .segments import SegmentArrays, load_segments, merge_code_intervals
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+import logging
+logger = logging.getLogger(__name__)
+
+MEASURES = ("counts", "overlap_chars", "jaccard")
+
+# Segment pairs expanded at once; bounds memory on densely coded documents
+MAX_PAIRS_PER_CHUNK = 4_000_000
+
+class CooccurrenceMatrix(NamedTuple):
+    """
+    Symmetric code x code matrices, rows and columns in code_ids order.
+
+    The diagonal holds each code's own totals: its segment count in counts,
+    the characters it covers in overlap_chars and 1.0 in jaccard (0.0 for
+    an unused code).
+    """
+    code_ids: list
+    labels: list
+    counts: np.ndarray
+    overlap_chars: np.ndarray
+    jaccard: np.ndarray
+    window: int
+
+    def to_frame(self, measure: str = "counts") -> pd.DataFrame:
+        """
+        One measure as a DataFrame indexed by code label on both axes.
+
+        :raises ValueError: for a measure not in MEASURES
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"measure must be one of {MEASURES}")
+        # pandas is heavy; load it on first use
+        import pandas as pd
+
+        return pd.DataFrame(getattr(self, measure), index=self.labels, columns=self.labels)
+
+def compute_cooccurrence(repo, window: int = 0) -> CooccurrenceMatrix:
+    """
+    Co-occurrence of every pair of codes in the project.
+
+    :param window: Also count segments at most this many characters apart;
+        0 counts overlapping segments only
+    :rtype: CooccurrenceMatrix
+    """
+    return cooccurrence_from_arrays(load_segments(repo), window)
+
+def cooccurrence_from_arrays(arrays: SegmentArrays, window: int = 0) -> CooccurrenceMatrix:
+    """Co-occurrence matrix of segments already loaded as arrays."""
+    if window < 0:
+        raise ValueError("window must not be negative")
+
+    n = len(arrays.code_ids)
+    counts = _pair_totals(arrays, n, window)
+    np.fill_diagonal(counts, np.bincount(arrays.code, minlength=n))
+
+    # Characters are measured on each code's union, so overlaps within one
+    # code do not inflate them
+    merged = merge_code_intervals(arrays)
+    overlap_chars = _pair_totals(merged, n, 0, measure_overlap=True)
+    coded_chars = np.bincount(merged.code, weights=merged.end - merged.start, minlength=n).astype(np.int64)
+    np.fill_diagonal(overlap_chars, coded_chars)
+
+    union = coded_chars[:, None] + coded_chars[None, :] - overlap_chars
+    np.fill_diagonal(union, coded_chars)
+    jaccard = np.divide(
+        overlap_chars, union,
+        out=np.zeros((n, n), dtype=np.float64),
+        where=union > 0,
+    )
+
+    logger.info("cooccurrence: %d segments, %d codes, window=%d", arrays.size, n, window)
+    return CooccurrenceMatrix(
+        code_ids=list(arrays.code_ids),
+        labels=list(arrays.labels),
+        counts=counts,
+        overlap_chars=overlap_chars,
+        jaccard=jaccard,
+        window=window,
+    )
+
+# ---- internal helpers ------------------------------------------------------
+def _pair_totals(arrays: SegmentArrays, n: int, window: int, measure_overlap: bool = False) -> np.ndarray:
+    """
+    Symmetric n x n totals over co-occurring segment pairs of different
+    codes: the number of pairs, or with measure_overlap the characters they
+    share. The diagonal is left at zero.
+    """
+    totals = np.zeros(n * n, dtype=np.int64)
+    if arrays.size == 0:
+        return totals.reshape(n, n)
+
+    order = np.lexsort((arrays.start, arrays.document))
+    arrays = arrays.take(order)
+    code, start, end = arrays.code, arrays.start, arrays.end
+
+    # Documents end to end on one axis, far enough apart that no segment's
+    # reach (end + window) gets into the next document
+    _, document_rank = np.unique(arrays.document, return_inverse=True)
+    span = int(end.max()) + window + 1
+    base = document_rank.astype(np.int64) * span
+    key_start = base + start
+    # Later segments starting before this one ends (overlap), or at most
+    # window characters after it
+    reach = np.searchsorted(key_start, base + end + window, side="left" if window == 0 else "right")
+    pair_counts = np.maximum(reach - np.arange(arrays.size) - 1, 0)
+
+    for first, second in _expand_pairs(pair_counts):
+        a = code[first]
+        b = code[second]
+        distinct = a != b
+        flat = a[distinct] * n + b[distinct]
+        if measure_overlap:
+            shared = np.minimum(end[first], end[second]) - start[second]
+            weights = np.maximum(shared[distinct], 0)
+            totals += np.bincount(flat, weights=weights, minlength=n * n).astype(np.int64)
+        else:
+            totals += np.bincount(flat, minlength=n * n)
+
+    totals = totals.reshape(n, n)
+    # Each pair was seen once, from its earlier segment
+    return totals + totals.T
+
+def _expand_pairs(pair_counts: np.ndarray):
+    """
+    Yield (first, second) index arrays for segment i paired with the
+    pair_counts[i] segments after it, MAX_PAIRS_PER_CHUNK pairs at a time
+    (more if one segment alone has more partners).
+    """
+    cumulative = np.cumsum(pair_counts)
+    total = len(pair_counts)
+    lo = 0
+    while lo < total:
+        done = cumulative[lo - 1] if lo else 0
+        hi = int(np.searchsorted(cumulative, done + MAX_PAIRS_PER_CHUNK, side="right"))
+        hi = min(max(hi, lo + 1), total)
+
+        counts = pair_counts[lo:hi]
+        pairs = int(counts.sum())
+        if pairs:
+            first = np.repeat(np.arange(lo, hi), counts)
+            # Position of each pair within its segment's run of partners
+            run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+            second = first + 1 + (np.arange(pairs) - run_starts)
+            yield first, second
+        lo = hi
@@ -0,0 +1,192 @@
+"""
+Code-by-document coverage: characters coded and the share of each text.
+
+Coverage is measured on the union of intervals, so overlapping segments
+(of one code, or of different codes for a document's total) are not counted
+twice. Results are cached in the coverage_documents and coverage_codes
+tables. Triggers drop a document's cached rows whenever its segments or text
+change, so refresh_coverage only recomputes documents that were touched; after
+one coding action that is a single document's row.
+
+Usage:
+matrix = load_coverage(repo)
+frame = matrix.to_frame("percent")
+row = document_coverage(repo, document_id)
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from .segments import SegmentArrays, load_segments, merge_code_intervals
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+import logging
+logger = logging.getLogger(__name__)
+
+MEASURES = ("chars", "percent")
+
+class CoverageMatrix(NamedTuple):
+    """
+    Coverage of every document (rows, by display name) by every code
+    (columns, by label).
+    """
+    document_ids: list
+    document_names: list
+    code_ids: list
+    labels: list
+    # Per document: text length and characters coded with any code
+    text_length: np.ndarray
+    coded_chars: np.ndarray
+    # documents x codes: characters coded with each code
+    chars: np.ndarray
+
+    def percent(self) -> np.ndarray:
+        """documents x codes: percentage of each document coded with each code."""
+        return _percent(self.chars, self.text_length[:, None])
+
+    def document_percent(self) -> np.ndarray:
+        """Per document: percentage coded with any code."""
+        return _percent(self.coded_chars, self.text_length)
+
+    def to_frame(self, measure: str = "chars") -> pd.DataFrame:
+        """
+        The matrix as a DataFrame, documents by codes, with each document's
+        length and total coverage as the last two columns.
+
+        :raises ValueError: for a measure not in MEASURES
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"measure must be one of {MEASURES}")
+        # pandas is heavy; load it on first use
+        import pandas as pd
+
+        if measure == "chars":
+            values, total = self.chars, self.coded_chars
+        else:
+            values, total = self.percent(), self.document_percent()
+        frame = pd.DataFrame(values, index=self.document_names, columns=self.labels)
+        frame.index.name = "document"
+        frame["(text length)"] = self.text_length
+        frame["(any code)"] = total
+        return frame
+
+def refresh_coverage(repo, document_id: int | None = None) -> int:
+    """
+    Recompute and cache coverage of documents whose cache was invalidated.
+
+    :param document_id: Only refresh this document (if it is stale)
+    :return: Number of documents recomputed
+    :rtype: int
+    """
+    stale = repo.get_stale_coverage_documents(document_id)
+    if not stale:
+        return 0
+
+    arrays = load_segments(repo, document_ids=stale)
+    documents, codes = _compute(repo, arrays, stale)
+    repo.store_coverage(documents, codes)
+    logger.debug("refresh_coverage: recomputed %d documents", len(stale))
+    return len(stale)
+
+def document_coverage(repo, document_id: int) -> dict | None:
+    """
+    One document's coverage, recomputing it first if it is stale.
+
+    :return: Dict with text_length, coded_chars and percent, or None for an
+        unknown document
+    :rtype: dict | None
+    """
+    refresh_coverage(repo, document_id)
+    rows = repo.get_document_coverage(document_id)
+    if not rows:
+        return None
+    row = rows[0]
+    text_length = row["text_length"] or 0
+    coded_chars = row["coded_chars"] or 0
+    return {
+        "text_length": text_length,
+        "coded_chars": coded_chars,
+        "percent": 100.0 * coded_chars / text_length if text_length else 0.0,
+    }
+
+def load_coverage(repo) -> CoverageMatrix:
+    """Refresh stale documents and read the whole matrix from the cache."""
+    refresh_coverage(repo)
+
+    documents = repo.get_document_coverage()
+    codes = repo.get_code_usage_overview()
+    document_index = {row["doc_id"]: i for i, row in enumerate(documents)}
+    code_index = {code["id"]: i for i, code in enumerate(codes)}
+
+    chars = np.zeros((len(documents), len(codes)), dtype=np.int64)
+    pairs = [
+        (document_index[document_id], code_index[code_id], coded)
+        for document_id, code_id, coded in repo.get_code_coverage()
+        if document_id in document_index and code_id in code_index
+    ]
+    if pairs:
+        rows, columns, values = (np.array(column, dtype=np.int64) for column in zip(*pairs))
+        chars[rows, columns] = values
+
+    return CoverageMatrix(
+        document_ids=[row["doc_id"] for row in documents],
+        document_names=[row["display_name"] for row in documents],
+        code_ids=[code["id"] for code in codes],
+        labels=[code["label"] for code in codes],
+        text_length=np.array([row["text_length"] or 0 for row in documents], dtype=np.int64),
+        coded_chars=np.array([row["coded_chars"] or 0 for row in documents], dtype=np.int64),
+        chars=chars,
+    )
+
+# ---- internal helpers ------------------------------------------------------
+def _compute(repo, arrays: SegmentArrays, document_ids: list[int]) -> tuple[list[tuple], list[tuple]]:
+    """Coverage rows of the given documents from their segments."""
+    # Per (document, code): length of the code's union in the document
+    per_code = merge_code_intervals(arrays)
+    document, code, lengths = _sum_runs(per_code, per_code.document, per_code.code)
+    codes = [
+        (int(document_id), per_code.code_ids[code_index], int(length))
+        for document_id, code_index, length in zip(document, code, lengths)
+    ]
+
+    # Per document: the union over all codes
+    any_code = merge_code_intervals(arrays._replace(code=np.zeros_like(arrays.code)))
+    covered_documents, covered_lengths = _sum_runs(any_code, any_code.document)
+    covered = dict(zip(covered_documents.tolist(), covered_lengths.tolist()))
+
+    documents = []
+    for document_id in document_ids:
+        try:
+            text_length = repo.text_service.get_length(document_id)
+        except (KeyError, OSError) as e:
+            logger.warning("refresh_coverage: no text for document_id=%s: %s", document_id, e)
+            text_length = 0
+        documents.append((document_id, text_length, covered.get(document_id, 0)))
+    return documents, codes
+
+def _sum_runs(arrays: SegmentArrays, *keys: np.ndarray) -> tuple:
+    """
+    Sum interval lengths over runs of equal keys (arrays sorted by them).
+
+    :return: The key values of each run followed by the run totals
+    """
+    if arrays.size == 0:
+        return tuple(np.empty(0, dtype=np.int64) for _ in range(len(keys) + 1))
+    begins = np.zeros(arrays.size, dtype=bool)
+    begins[0] = True
+    for key in keys:
+        begins[1:] |= key[1:] != key[:-1]
+    first = np.flatnonzero(begins)
+    totals = np.add.reduceat(arrays.end - arrays.start, first)
+    return (*(key[first] for key in keys), totals)
+
+def _percent(part: np.ndarray, whole: np.ndarray) -> np.ndarray:
+    return np.divide(
+        100.0 * part, whole,
+        out=np.zeros(np.broadcast_shapes(part.shape, whole.shape), dtype=np.float64),
+        where=whole > 0,
+    )
@@ -0,0 +1,122 @@
+"""
+Coded segments as NumPy arrays, for the vectorised analyses.
+
+load_segments reads every segment in one query into parallel int64 arrays
+(document id, code index, start, end), with codes numbered in label order.
+merge_code_intervals replaces each code's segments in a document by their
+union, so overlapping or repeated codings of the same passage count once
+when measuring characters.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+
+import logging
+logger = logging.getLogger(__name__)
+
+class SegmentArrays(NamedTuple):
+    """
+    Segments as parallel arrays; code holds indexes into code_ids/labels.
+    Empty segments and segments of deleted codes are left out.
+    """
+    code_ids: list
+    labels: list
+    document: np.ndarray
+    code: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+    @property
+    def size(self) -> int:
+        """Number of segments."""
+        return len(self.start)
+
+    def take(self, index) -> SegmentArrays:
+        """The segments at index (an index array or boolean mask)."""
+        return self._replace(
+            document=self.document[index],
+            code=self.code[index],
+            start=self.start[index],
+            end=self.end[index],
+        )
+
+def load_segments(repo, document_id: int | None = None, document_ids=None) -> SegmentArrays:
+    """
+    Read segments into arrays ordered by document and start.
+
+    :param document_id: Only this document's segments (codes still cover
+        the whole project, so matrices line up)
+    :param document_ids: Only these documents' segments
+    :rtype: SegmentArrays
+    """
+    codes = repo.get_code_usage_overview()
+    code_ids = [code["id"] for code in codes]
+    labels = [code["label"] for code in codes]
+    code_index = {code_id: i for i, code_id in enumerate(code_ids)}
+
+    if document_ids is not None:
+        rows = repo.get_document_segment_spans(document_ids)
+    else:
+        rows = repo.get_segment_spans(document_id)
+    if rows:
+        documents, segment_codes, starts, ends = zip(*rows)
+    else:
+        documents = segment_codes = starts = ends = ()
+
+    arrays = SegmentArrays(
+        code_ids=code_ids,
+        labels=labels,
+        document=np.array(documents, dtype=np.int64),
+        code=np.fromiter(
+            (code_index.get(code_id, -1) for code_id in segment_codes),
+            dtype=np.int64,
+            count=len(segment_codes),
+        ),
+        start=np.array(starts, dtype=np.int64),
+        end=np.array(ends, dtype=np.int64),
+    )
+    keep = (arrays.code >= 0) & (arrays.end > arrays.start)
+    if not keep.all():
+        logger.debug("load_segments: leaving out %d empty or orphaned segments", int((~keep).sum()))
+        arrays = arrays.take(keep)
+    return arrays
+
+def merge_code_intervals(arrays: SegmentArrays) -> SegmentArrays:
+    """
+    Union of each code's segments per document: overlapping or touching
+    segments of one code in one document become a single interval.
+
+    :return: Disjoint intervals ordered by (document, code, start)
+    :rtype: SegmentArrays
+    """
+    if arrays.size == 0:
+        return arrays
+
+    order = np.lexsort((arrays.start, arrays.code, arrays.document))
+    arrays = arrays.take(order)
+
+    # Lay the (document, code) groups end to end on one axis so a single
+    # running maximum of the end offsets never crosses a group boundary
+    group = _group_numbers(arrays.document, arrays.code)
+    span = int(arrays.end.max()) + 1
+    key_start = group * span + arrays.start
+    reach = np.maximum.accumulate(group * span + arrays.end)
+
+    # An interval starts wherever a segment begins after everything before it ends
+    begins = np.empty(arrays.size, dtype=bool)
+    begins[0] = True
+    begins[1:] = key_start[1:] > reach[:-1]
+    first = np.flatnonzero(begins)
+    last = np.append(first[1:] - 1, arrays.size - 1)
+
+    merged = arrays.take(first)
+    return merged._replace(end=reach[last] - group[last] * span)
+
+def _group_numbers(*keys: np.ndarray) -> np.ndarray:
+    """Number the runs of equal key tuples in arrays sorted by those keys: 0, 0, 1, 2, 2, ..."""
+    changes = np.zeros(len(keys[0]), dtype=np.int64)
+    for key in keys:
+        changes[1:] |= key[1:] != key[:-1]
+    return np.cumsum(changes)
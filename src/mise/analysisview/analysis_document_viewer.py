@@ -4,16 +4,14 @@ from pathlib import Path
 
 from PySide6.QtWidgets import (
     QVBoxLayout, QWidget,
-    QTextBrowser, QDialog
+    QDialog
 )
 
-from PySide6.QtGui import (
-    QTextCursor, QTextCharFormat, 
-    QColor)
-
 from PySide6.QtCore import Qt
 
 from ..utils.project_repository import ProjectRepository
+from ..utils.repository_events import DocumentDeleted
+from ..ui.windowed_text_view import WindowedTextView
 from ..ui import theme
 
 class AnalysisDocumentViewerWidget(QWidget):
@@ -30,17 +28,22 @@ class AnalysisDocumentViewerWidget(QWidget):
         # UI
         layout = QVBoxLayout(self)
 
-        self.document_viewer = QTextBrowser()
+        # Large documents are loaded a window at a time
+        self.document_viewer = WindowedTextView(self.repo)
         self.document_viewer.setFont(theme.serif_font)
-        self.document_viewer.setText("Select a document to view its content.")
+        self.document_viewer.show_text("Select a document to view its content.")
         layout.addWidget(self.document_viewer)
 
+        self.highlighter = self.document_viewer.highlighter
+
         # context menu for document viewer
         self.document_viewer.setContextMenuPolicy(Qt.CustomContextMenu)
         self.document_viewer.customContextMenuRequested.connect(
             self.open_text_context_menu
         )
 
+        self.repo.events.subscribe(self._on_document_deleted, DocumentDeleted)
+
     # UI Methods ------------------------------------------------------------
     def set_content_font_size(self, size_pt: int):
         font = self.document_viewer.font()
@@ -54,9 +57,21 @@ class AnalysisDocumentViewerWidget(QWidget):
         try:
             # Use Path’s own API, not bare open(path, "r")
             content = path.read_text(encoding="utf-8")
-            self.document_viewer.setPlainText(content)
+            self.document_viewer.show_text(content)
         except Exception as e:
-            self.document_viewer.setPlainText(f"Error reading file {path}: {e}")
+            self.document_viewer.show_text(f"Error reading file {path}: {e}")
+
+    def show_document(self, document_id: int):
+        """
+        Display a registered document and its highlights. Text comes from the
+        repository's shared text service, a window at a time for large
+        documents.
+        """
+        self.current_document_id = document_id
+        try:
+            self.document_viewer.show_document(document_id)
+        except Exception as e:
+            self.document_viewer.show_text(f"Error reading document {document_id}: {e}")
         
     def open_text_context_menu(self, pos):
         """
@@ -64,7 +79,7 @@ class AnalysisDocumentViewerWidget(QWidget):
         right click in document viewer.
         """
         cursor = self.document_viewer.cursorForPosition(pos)
-        char_pos = cursor.position()
+        char_pos = self.document_viewer.to_offset(cursor.position())
 
         segment = self.repo.get_segment_at_position(self.current_document_id, char_pos)
 
@@ -75,45 +90,18 @@ class AnalysisDocumentViewerWidget(QWidget):
         Clear the viewer and reset current_document_id.
         """
         self.current_document_id = None
-        self.document_viewer.clear()
-        self.document_viewer.setText("Select a document to view its content.")
+        self.document_viewer.show_text("Select a document to view its content.")
+
+    def _on_document_deleted(self, event: DocumentDeleted):
+        if event.document_id == self.current_document_id:
+            self.clear_document()
 
     def refresh_highlights(self):
-        if self.current_document_id is None:
-            return
-
-        cursor = self.document_viewer.textCursor()
-        cursor.select(QTextCursor.Document)
-        default_format = QTextCharFormat()
-        cursor.setCharFormat(default_format)
-
-        rows = self.repo.get_coded_segments(self.current_document_id)
-        logger.debug("refresh_highlights: found %d segments", len(rows))
-
-        for seg in rows:
-            fmt = QTextCharFormat()
-
-            # use the code color if present, otherwise a default
-            code_color = seg["code_color"]
-            if code_color:
-                qcolor = QColor(code_color)
-                if qcolor.isValid():
-                    fmt.setBackground(qcolor)
-                else:
-                    fmt.setBackground(QColor("yellow"))
-            else:
-                fmt.setBackground(QColor("yellow"))
-
-            cursor.setPosition(seg["start_offset"])
-            cursor.setPosition(seg["end_offset"], QTextCursor.KeepAnchor)
-            cursor.setCharFormat(fmt)
+        """Re-render every highlight, e.g. after code colours changed."""
+        self.highlighter.refresh()
 
     def focus_segment(self, start: int, end: int):
         """
         Move the text cursor to [start, end) and ensure it is visible.
         """
-        cursor = self.document_viewer.textCursor()
-        cursor.setPosition(start)
-        cursor.setPosition(end, QTextCursor.KeepAnchor)
-        self.document_viewer.setTextCursor(cursor)
-        self.document_viewer.ensureCursorVisible()
\ No newline at end of file
+        self.document_viewer.reveal(start, end)
\ No newline at end of file
@@ -18,16 +18,18 @@ from .code_stats_tree import CodeStatsTreeWidget
 from .document_stats_tree import DocumentStatsTreeWidget
 from .analysis_document_viewer import AnalysisDocumentViewerWidget
 from .code_viewer import CodeSegmentView  # you’ll create this
+from .cooccurrence_view import CooccurrenceView
 
 # write analysis helper scripts in the /analysis directory and make them accessible above including:
 #   - tokenize text
-#   - network functions
+#   - network functions (code co-occurrence: analysis/cooccurrence.py)
 #   - word cloud
 
 class AnalysisView(QWidget):
 
     PAGE_DOCUMENT = 0
     PAGE_CODE_SEGMENTS = 1
+    PAGE_COOCCURRENCE = 2
 
     def __init__(self, project_name: str, project_root: Path, repo: ProjectRepository, parent=None):
         super().__init__(parent)
@@ -59,10 +61,12 @@ class AnalysisView(QWidget):
         # ----- Right side: stacked widget (document view vs code segments) -----
         self.document_view = AnalysisDocumentViewerWidget(repo, self)
         self.code_segment_view = CodeSegmentView(repo, self)
+        self.cooccurrence_view = CooccurrenceView(repo, self)
 
         self.stacked = QStackedWidget()
         self.stacked.addWidget(self.document_view)      # PAGE_DOCUMENT
         self.stacked.addWidget(self.code_segment_view)  # PAGE_CODE_SEGMENTS
+        self.stacked.addWidget(self.cooccurrence_view)  # PAGE_COOCCURRENCE
 
         # Default: show document
         self.stacked.setCurrentIndex(self.PAGE_DOCUMENT)
@@ -121,26 +125,22 @@ class AnalysisView(QWidget):
     def show_code_segments_page(self):
         self.stacked.setCurrentIndex(self.PAGE_CODE_SEGMENTS)
 
-    def _on_document_selected(self, text_path: str, doc_id: int):
-        # text_path is the DB value (now relative); resolve it to an absolute path
-        abs_path = (self.repo.texts_dir / text_path).resolve()
+    def show_cooccurrence_page(self):
+        self.stacked.setCurrentIndex(self.PAGE_COOCCURRENCE)
+        if not self.cooccurrence_view.has_result():
+            self.cooccurrence_view.compute()
 
+    def _on_document_selected(self, text_path: str, doc_id: int):
         self.show_document_page()
-        self.document_view.display_file_content(abs_path)
-        self.document_view.current_document_id = doc_id
-        self.document_view.refresh_highlights()
+        self.document_view.show_document(doc_id)
 
-    def _on_code_selected(self, code_id: int):
+    def _on_code_selected(self, code_id: str):
         self.show_code_segments_page()
         self.code_segment_view.load_segments_for_code(code_id)
     
     def _on_segment_activated(self, doc_id: int, start: int, end: int):
         self.show_document_page()
-        path = self.repo.get_document_path(doc_id)
-
-        self.document_view.display_file_content(path)
-        self.document_view.current_document_id = doc_id
-        self.document_view.refresh_highlights()
+        self.document_view.show_document(doc_id)
 
         # Delegate focusing to the viewer widget itself
         self.document_view.focus_segment(start, end)
\ No newline at end of file
@@ -1,65 +1,44 @@
 # src/mise/analysisview/code_stats_tree.py
 
-from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QColor, QBrush
+from PySide6.QtWidgets import QTreeView
+from PySide6.QtCore import Qt, Signal, QSortFilterProxyModel
 from ..utils.project_repository import ProjectRepository
+from ..ui.code_tree_model import CodeTreeModel, CODE_ID_ROLE, COLUMN_LABEL
 
-class CodeStatsTreeWidget(QTreeWidget):
+class CodeStatsTreeWidget(QTreeView):
 
-    codeSelected = Signal(object)
+    codeSelected = Signal(str)
 
     def __init__(self, repo: ProjectRepository, parent=None):
         super().__init__(parent)
         self.repo = repo
 
-        self.setColumnCount(4)
-        self.setHeaderLabels([
-            "Code Name",
-            "Color",
-            "Times Used",
-            "Documents Used In",
-        ])
+        # Shared with the code browser; the proxy only sorts
+        self.code_model = CodeTreeModel.for_repository(repo)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.code_model)
+        self.proxy.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.setModel(self.proxy)
 
-        self.reload_data()
-
-    def reload_data(self):
-        self.clear()
-        rows = self.repo.get_code_usage_overview()
-
-        for row in rows:
-            color_hex = row["color"] or ""
+        self.setSortingEnabled(True)
+        self.sortByColumn(COLUMN_LABEL, Qt.AscendingOrder)
+        self.expandAll()
 
-            item = QTreeWidgetItem([
-                row["label"],
-                "",   # <-- leave color column text empty
-                str(row["segment_count"]),
-                str(row["document_count"]),
-            ])
+        self.clicked.connect(self.handle_code_click)
 
-            # Store code ID (you probably want ID, not label)
-            item.setData(0, Qt.UserRole, row["id"])
-            self.itemClicked.connect(self.handle_code_click)
-
-            # Apply background color to the Color column (col 1)
-            if color_hex:
-                color = QColor(color_hex)
-                brush = QBrush(color)
-                item.setBackground(1, brush)
-
-                # Tooltip with the hex code
-                item.setToolTip(1, color_hex)
+        self.reload_data()
 
-            self.addTopLevelItem(item)
+    def reload_data(self):
+        """Refresh usage counts; only rows whose counts changed repaint."""
+        self.code_model.refresh_usage()
 
     def current_code_id(self):
-        item = self.currentItem()
-        if not item:
+        index = self.currentIndex()
+        if not index.isValid():
             return None
-        return item.data(0, Qt.UserRole)
+        return index.data(CODE_ID_ROLE)
     
-    def handle_code_click(self, item):
-        code_id = item.data(0, Qt.UserRole)
+    def handle_code_click(self, index):
+        code_id = index.data(CODE_ID_ROLE)
         if code_id is not None:
             self.codeSelected.emit(code_id)
-        
\ No newline at end of file
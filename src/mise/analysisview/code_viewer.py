@@ -6,62 +6,90 @@ logger = logging.getLogger(__name__)
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
-    QListWidget,
-    QListWidgetItem,
-    QLabel,
-    QHBoxLayout,
+    QListView,
+    QStyledItemDelegate,
+    QStyle,
 )
-from PySide6.QtCore import Qt, Signal, QSize
+from PySide6.QtCore import Qt, Signal, QSize, QRect, QModelIndex
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPen
 
 from ..utils.project_repository import ProjectRepository
+from .segment_list_model import (
+    SegmentListModel, DOC_ID_ROLE, START_ROLE, END_ROLE, SEGMENT_ROLE, SNIPPET_ROLE
+)
 
-# custom roles
-DOC_ID_ROLE = Qt.UserRole + 1
-START_ROLE = Qt.UserRole + 2
-END_ROLE = Qt.UserRole + 3
+# Lines of snippet shown on each card
+CARD_SNIPPET_LINES = 3
+CARD_MARGIN = 6
+CARD_SPACING = 3
 
-class SegmentCardWidget(QWidget):
+class SegmentCardDelegate(QStyledItemDelegate):
     """
-    Visual card for a single coded segment:
+    Paints a card for a single coded segment:
       - Document name (bold)
-      - Offsets (small, muted)
-      - Snippet (wrapped)
-    """
-
-    def __init__(self, document_name: str, start: int, end: int, snippet: str, parent=None):
-        super().__init__(parent)
-
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(6, 6, 6, 6)
-        layout.setSpacing(3)
+      - Page and offsets (small, muted)
+      - Snippet (wrapped, first few lines)
 
-        # Top row: document name + offsets
-        top_row = QHBoxLayout()
-        top_row.setSpacing(8)
+    Cards have a fixed height so the view can lay out any number of rows
+    without measuring them, and only visible cards ever read a snippet.
+    """
 
-        doc_label = QLabel(document_name)
-        font = doc_label.font()
+    def sizeHint(self, option, index) -> QSize:
+        title_height = QFontMetrics(self._title_font(option)).height()
+        snippet_height = QFontMetrics(option.font).lineSpacing() * CARD_SNIPPET_LINES
+        height = 2 * CARD_MARGIN + title_height + CARD_SPACING + snippet_height
+        return QSize(option.rect.width(), max(height, 60))
+
+    def paint(self, painter, option, index):
+        painter.save()
+
+        card = option.rect.adjusted(2, 2, -2, -2)
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(card, option.palette.highlight())
+            text_color = option.palette.highlightedText().color()
+        else:
+            painter.fillRect(card, option.palette.base())
+            text_color = option.palette.text().color()
+        painter.setPen(QPen(QColor("#dddddd")))
+        painter.drawRect(card)
+
+        content = card.adjusted(CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN)
+        segment = index.data(SEGMENT_ROLE)
+
+        # Top row: document name + location
+        title_font = self._title_font(option)
+        title_height = QFontMetrics(title_font).height()
+        title_rect = QRect(content.left(), content.top(), content.width(), title_height)
+
+        location = f"{segment['start_offset']} – {segment['end_offset']}"
+        if segment["page_number"] is not None:
+            location = f"p. {segment['page_number']} · {location}"
+
+        painter.setPen(QColor("#666666") if not option.state & QStyle.State_Selected else text_color)
+        painter.drawText(title_rect, Qt.AlignRight | Qt.AlignVCenter, location)
+        location_width = QFontMetrics(option.font).horizontalAdvance(location) + 8
+
+        painter.setFont(title_font)
+        painter.setPen(text_color)
+        name = QFontMetrics(title_font).elidedText(
+            segment["display_name"], Qt.ElideRight, max(title_rect.width() - location_width, 0)
+        )
+        painter.drawText(title_rect, Qt.AlignLeft | Qt.AlignVCenter, name)
+
+        # Snippet: wrapped text, clipped to the card
+        painter.setFont(option.font)
+        snippet_rect = QRect(content)
+        snippet_rect.setTop(title_rect.bottom() + CARD_SPACING)
+        painter.setClipRect(snippet_rect)
+        painter.drawText(snippet_rect, Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, index.data(SNIPPET_ROLE))
+
+        painter.restore()
+
+    @staticmethod
+    def _title_font(option):
+        font = QFont(option.font)
         font.setBold(True)
-        doc_label.setFont(font)
-
-        offsets_label = QLabel(f"{start} – {end}")
-        offsets_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        offsets_label.setStyleSheet("color: #666666; font-size: 11px;")
-
-        top_row.addWidget(doc_label, 1)
-        top_row.addWidget(offsets_label, 0)
-
-        # Snippet: wrapped text
-        snippet_label = QLabel(snippet)
-        snippet_label.setWordWrap(True)
-        snippet_label.setStyleSheet("font-size: 12px;")
-
-        layout.addLayout(top_row)
-        layout.addWidget(snippet_label)
-
-    def sizeHint(self) -> QSize:
-        base = super().sizeHint()
-        return QSize(base.width(), max(base.height(), 60))
+        return font
 
 
 class CodeSegmentView(QWidget):
@@ -71,7 +99,7 @@ class CodeSegmentView(QWidget):
     """
 
     segmentActivated = Signal(int, int, int)
-    # document_id, start_offset, end_offset, text_path
+    # document_id, start_offset, end_offset
 
     def __init__(self, repo: ProjectRepository, parent=None):
         super().__init__(parent)
@@ -80,67 +108,38 @@ class CodeSegmentView(QWidget):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        self.list = QListWidget()
-        self.list.setSelectionMode(QListWidget.SingleSelection)
-        self.list.setUniformItemSizes(False)  # allow variable-height cards
-        self.list.setSpacing(4)
+        self.model = SegmentListModel(repo, self)
+
+        self.list = QListView()
+        self.list.setModel(self.model)
+        self.list.setItemDelegate(SegmentCardDelegate(self.list))
+        self.list.setSelectionMode(QListView.SingleSelection)
+        # Every card has the same height, so layout never measures rows
+        self.list.setUniformItemSizes(True)
+        self.list.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.list.setSpacing(2)
 
         layout.addWidget(self.list)
 
-        self.list.itemDoubleClicked.connect(self._on_item_activated)
+        self.list.doubleClicked.connect(self._on_item_activated)
 
     def clear(self):
-        self.list.clear()
-
-    def get_text_snippet(self, text_path: str, start_offset: int, end_offset: int) -> str:
-        # text_path is the DB path (now relative); resolve it against the repo's texts_dir
-        abs_path = (self.repo.texts_dir / text_path).resolve()
+        self.model.set_code(None)
 
-        content = abs_path.read_text(encoding="utf-8")
-        snippet = content[start_offset:end_offset]
-        return snippet.strip()
-
-    def load_segments_for_code(self, code_id: int):
+    def load_segments_for_code(self, code_id: str):
         """
-        Populate the list with all segments coded with this code.
-        Expects repo.get_segments_for_code(code_id) to return rows with:
-          - document_id
-          - display_name
-          - text_path
-          - start_offset
-          - end_offset
+        Show the segments coded with this code. Only the first page is
+        queried here; the rest load as the list scrolls.
         """
-        self.list.clear()
-
-        rows = self.repo.get_segments_for_code(code_id)
-        logger.debug("CodeSegmentView: loaded %d segments for code_id=%s", len(rows), code_id)
-
-        for seg in rows:
-            doc_label = seg["display_name"]
-            text_path = seg["text_path"]
-            start = seg["start_offset"]
-            end = seg["end_offset"]
-            snippet = self.get_text_snippet(text_path=text_path, start_offset=start, end_offset=end)
-
-            item = QListWidgetItem()
-            card = SegmentCardWidget(doc_label, start, end, snippet, parent=self.list)
-
-            # store metadata
-            item.setData(DOC_ID_ROLE, seg["document_id"])
-            item.setData(START_ROLE, start)
-            item.setData(END_ROLE, end)
-
-            item.setSizeHint(card.sizeHint())
-
-            self.list.addItem(item)
-            self.list.setItemWidget(item, card)
+        self.model.set_code(code_id)
+        self.list.scrollToTop()
 
-    def _on_item_activated(self, item: QListWidgetItem):
-        doc_id = item.data(DOC_ID_ROLE)
-        start = item.data(START_ROLE)
-        end = item.data(END_ROLE)
+    def _on_item_activated(self, index: QModelIndex):
+        doc_id = index.data(DOC_ID_ROLE)
+        start = index.data(START_ROLE)
+        end = index.data(END_ROLE)
 
         if doc_id is None or start is None or end is None:
             return
 
-        self.segmentActivated.emit(doc_id, start, end)
\ No newline at end of file
+        self.segmentActivated.emit(doc_id, start, end)
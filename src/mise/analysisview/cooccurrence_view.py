@@ -0,0 +1,196 @@
+# src/mise/analysisview/cooccurrence_view.py
+
+import logging
+logger = logging.getLogger(__name__)
+
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QComboBox,
+    QSpinBox,
+    QPushButton,
+    QTableView,
+    QApplication,
+    QHeaderView,
+)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QColor
+
+from ..utils.project_repository import ProjectRepository
+from ..utils.repository_events import (
+    CodeAdded, CodeDeleted, CodeUpdated, SegmentsAdded, SegmentsRemoved, DocumentDeleted,
+)
+
+# (measure, menu text) in menu order
+MEASURE_CHOICES = [
+    ("counts", "Overlapping segments"),
+    ("overlap_chars", "Overlapping characters"),
+    ("jaccard", "Jaccard similarity"),
+]
+
+# Colour of the largest off-diagonal value; others fade towards white
+HEAT_COLOR = QColor("#c0392b")
+CELL_WIDTH = 56
+
+class CooccurrenceModel(QAbstractTableModel):
+    """
+    One measure of a CooccurrenceMatrix as a table, cells shaded by value
+    relative to the largest value off the diagonal.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matrix = None
+        self.measure = "counts"
+        self._values = None
+        self._max = 0
+
+    def set_matrix(self, matrix, measure: str) -> None:
+        self.beginResetModel()
+        self.matrix = matrix
+        self.measure = measure
+        self._values = getattr(matrix, measure) if matrix is not None else None
+        self._max = 0
+        if self._values is not None and len(self._values) > 1:
+            off_diagonal = self._values.copy()
+            off_diagonal.flat[::len(off_diagonal) + 1] = 0
+            self._max = off_diagonal.max()
+        self.endResetModel()
+
+    def set_measure(self, measure: str) -> None:
+        self.set_matrix(self.matrix, measure)
+
+    # ---- QAbstractTableModel ---------------------------------------------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid() or self.matrix is None:
+            return 0
+        return len(self.matrix.labels)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return self.rowCount(parent)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or self._values is None:
+            return None
+        row, column = index.row(), index.column()
+        value = self._values[row, column]
+
+        if role == Qt.DisplayRole:
+            return self._format(value)
+
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+
+        if role == Qt.BackgroundRole:
+            if row == column:
+                return QColor("#eeeeee")
+            if self._max > 0 and value > 0:
+                return _heat(value / self._max)
+            return None
+
+        if role == Qt.ToolTipRole:
+            labels = self.matrix.labels
+            return f"{labels[row]} × {labels[column]}: {self._format(value)}"
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if self.matrix is None or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        if 0 <= section < len(self.matrix.labels):
+            return self.matrix.labels[section]
+        return None
+
+    def _format(self, value) -> str:
+        if self.measure == "jaccard":
+            return f"{value:.2f}"
+        return str(int(value))
+
+class CooccurrenceView(QWidget):
+    """
+    Heatmap of code co-occurrence. Computed on demand and marked out of
+    date (not recomputed) when coding changes, since a large project takes
+    a few seconds.
+    """
+    def __init__(self, repo: ProjectRepository, parent=None):
+        super().__init__(parent)
+        self.repo = repo
+        self.matrix = None
+
+        self.measure_combo = QComboBox()
+        for measure, text in MEASURE_CHOICES:
+            self.measure_combo.addItem(text, measure)
+
+        self.window_spin = QSpinBox()
+        self.window_spin.setRange(0, 100_000)
+        self.window_spin.setSingleStep(50)
+        self.window_spin.setSuffix(" chars")
+        self.window_spin.setSpecialValueText("Overlap only")
+        self.window_spin.setToolTip("Also count segments this close to each other")
+
+        self.compute_button = QPushButton("Compute")
+        self.status_label = QLabel()
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Measure:"))
+        controls.addWidget(self.measure_combo)
+        controls.addWidget(QLabel("Within:"))
+        controls.addWidget(self.window_spin)
+        controls.addWidget(self.compute_button)
+        controls.addStretch(1)
+        controls.addWidget(self.status_label)
+
+        self.model = CooccurrenceModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setDefaultSectionSize(CELL_WIDTH)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+        self.measure_combo.currentIndexChanged.connect(self._on_measure_changed)
+        self.compute_button.clicked.connect(self.compute)
+
+        repo.events.subscribe(
+            self._on_coding_changed,
+            SegmentsAdded, SegmentsRemoved, CodeAdded, CodeUpdated, CodeDeleted, DocumentDeleted,
+        )
+
+    def has_result(self) -> bool:
+        return self.matrix is not None
+
+    def compute(self) -> None:
+        """Compute the matrix for the current window and show it."""
+        # numpy is heavy; load the analysis on first use
+        from ..analysis.cooccurrence import compute_cooccurrence
+
+        window = self.window_spin.value()
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.matrix = compute_cooccurrence(self.repo, window)
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        self.model.set_matrix(self.matrix, self.measure_combo.currentData())
+        self.status_label.setText(f"{len(self.matrix.labels)} codes")
+        logger.debug("CooccurrenceView: computed %d codes, window=%d", len(self.matrix.labels), window)
+
+    def _on_measure_changed(self, _index: int) -> None:
+        self.model.set_measure(self.measure_combo.currentData())
+
+    def _on_coding_changed(self, event) -> None:
+        if self.matrix is not None:
+            self.status_label.setText("Out of date, compute again to update")
+
+def _heat(fraction: float) -> QColor:
+    """White blended towards HEAT_COLOR by fraction (0..1)."""
+    fraction = min(max(float(fraction), 0.0), 1.0)
+    return QColor(
+        round(255 + (HEAT_COLOR.red() - 255) * fraction),
+        round(255 + (HEAT_COLOR.green() - 255) * fraction),
+        round(255 + (HEAT_COLOR.blue() - 255) * fraction),
+    )
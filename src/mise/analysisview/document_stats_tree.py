@@ -1,9 +1,16 @@
 # src/mise/analysisview/document_stats_tree.py
 
-from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem
+import logging
+logger = logging.getLogger(__name__)
+
+from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QMenu, QFileDialog, QMessageBox
 from PySide6.QtCore import Qt, Signal
 
 from ..utils.project_repository import ProjectRepository
+from ..utils.repository_events import (
+    CodeDeleted, DocumentDeleted, DocumentRenamed, DocumentsAdded, DocumentTextChanged,
+    SegmentsAdded, SegmentsRemoved,
+)
 
 # for cursor info
 DOC_ID_ROLE = Qt.UserRole + 1
@@ -17,18 +24,31 @@ class DocumentStatsTreeWidget(QTreeWidget):
         super().__init__(parent)
         self.repo = repo
 
-        self.setColumnCount(4)
+        self.setColumnCount(6)
         self.setHeaderLabels([
             "Document Name",
             "Document ID",
             "Coded Segments",
             "Unique Codes",
+            "Coded Characters",
+            "% Coded",
         ])
 
+        # doc_id -> item, so changes to one document touch one row
+        self._items: dict[int, QTreeWidgetItem] = {}
         self.reload_data()
 
         self.itemClicked.connect(self.handle_item_click)
 
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self._show_context_menu)
+
+        repo.events.subscribe(self._on_segments_changed, SegmentsAdded, SegmentsRemoved)
+        repo.events.subscribe(self._on_text_changed, DocumentTextChanged)
+        repo.events.subscribe(self._on_document_renamed, DocumentRenamed)
+        repo.events.subscribe(self._on_document_deleted, DocumentDeleted)
+        repo.events.subscribe(self._on_bulk_change, DocumentsAdded, CodeDeleted)
+
     def handle_item_click(self, item):
         path = item.data(0, PATH_ROLE)
         doc_id = item.data(0, DOC_ID_ROLE)
@@ -37,21 +57,95 @@ class DocumentStatsTreeWidget(QTreeWidget):
             
 
     def reload_data(self):
+        # numpy is heavy; load the analysis on first use
+        from ..analysis.coverage import refresh_coverage
+
         self.clear()
+        self._items = {}
+        # Only documents changed since the coverage was last cached are computed
+        refresh_coverage(self.repo)
+        coverage = {row["doc_id"]: row for row in self.repo.get_document_coverage()}
         rows = self.repo.get_document_coding_overview()
         for row in rows:
-            item = QTreeWidgetItem([
-                str(row["display_name"]),
-                str(row["doc_id"]),
-                str(row["segment_count"]),
-                str(row["unique_codes"]),
-            ])
-            item.setData(0, DOC_ID_ROLE, row["doc_id"])
-            item.setData(0, PATH_ROLE, row["path"])
+            item = QTreeWidgetItem()
+            self._fill_item(item, row, coverage.get(row["doc_id"]))
+            self._items[row["doc_id"]] = item
             self.addTopLevelItem(item)
 
+    def _fill_item(self, item: QTreeWidgetItem, row: dict, coverage: dict | None):
+        item.setText(0, str(row["display_name"]))
+        item.setText(1, str(row["doc_id"]))
+        item.setText(2, str(row["segment_count"]))
+        item.setText(3, str(row["unique_codes"]))
+        coded_chars = (coverage or {}).get("coded_chars") or 0
+        text_length = (coverage or {}).get("text_length") or 0
+        item.setText(4, str(coded_chars))
+        item.setText(5, f"{100.0 * coded_chars / text_length:.1f}" if text_length else "")
+        for column in range(2, 6):
+            item.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+        item.setData(0, DOC_ID_ROLE, row["doc_id"])
+        item.setData(0, PATH_ROLE, row["path"])
+
+    # ---- matrix export -----------------------------------------------------
+    def _show_context_menu(self, pos):
+        menu = QMenu(self)
+        export_chars = menu.addAction("Export Coverage Matrix (characters)…")
+        export_percent = menu.addAction("Export Coverage Matrix (% of document)…")
+        chosen = menu.exec(self.viewport().mapToGlobal(pos))
+        if chosen is export_chars:
+            self.export_coverage_matrix("chars")
+        elif chosen is export_percent:
+            self.export_coverage_matrix("percent")
+
+    def export_coverage_matrix(self, measure: str):
+        """Save the code-by-document coverage matrix as CSV."""
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Coverage Matrix", f"coverage-{measure}.csv", "CSV files (*.csv)"
+        )
+        if not path:
+            return
+
+        from ..analysis.coverage import load_coverage
+        try:
+            load_coverage(self.repo).to_frame(measure).to_csv(path)
+        except OSError as e:
+            logger.exception("DocumentStatsTreeWidget: could not export coverage to %r", path)
+            QMessageBox.warning(self, "Export failed", f"Could not write {path}:\n{e}")
+            return
+        logger.info("DocumentStatsTreeWidget: exported %s coverage matrix to %r", measure, path)
+
+    # ---- repository events -------------------------------------------------
+    def _on_segments_changed(self, event):
+        for doc_id in event.document_ids:
+            self._refresh_document(doc_id)
+
+    def _on_text_changed(self, event: DocumentTextChanged):
+        self._refresh_document(event.document_id)
+
+    def _on_document_renamed(self, event: DocumentRenamed):
+        item = self._items.get(event.document_id)
+        if item is not None:
+            item.setText(0, event.display_name)
+
+    def _on_document_deleted(self, event: DocumentDeleted):
+        item = self._items.pop(event.document_id, None)
+        if item is not None:
+            self.takeTopLevelItem(self.indexOfTopLevelItem(item))
+
+    def _on_bulk_change(self, event):
+        self.reload_data()
+
+    def _refresh_document(self, doc_id: int):
+        from ..analysis.coverage import document_coverage
+
+        item = self._items.get(doc_id)
+        rows = self.repo.get_document_coding_overview(doc_id)
+        if item is not None and rows:
+            # Recomputes this document's coverage only
+            self._fill_item(item, rows[0], document_coverage(self.repo, doc_id))
+
     def current_document_id(self):
         item = self.currentItem()
         if not item:
             return None
-        return item.data(0, Qt.UserRole)
\ No newline at end of file
+        return item.data(0, DOC_ID_ROLE)
\ No newline at end of file
@@ -0,0 +1,203 @@
+# src/mise/analysisview/segment_list_model.py
+
+import logging
+logger = logging.getLogger(__name__)
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from ..utils.project_repository import ProjectRepository
+from ..utils.repository_events import (
+    CodeDeleted, DocumentDeleted, DocumentRenamed, SegmentsAdded, SegmentsRemoved,
+)
+
+# custom roles
+DOC_ID_ROLE = Qt.UserRole + 1
+START_ROLE = Qt.UserRole + 2
+END_ROLE = Qt.UserRole + 3
+SEGMENT_ROLE = Qt.UserRole + 4
+SNIPPET_ROLE = Qt.UserRole + 5
+
+# Segments fetched per query as the list is scrolled
+SEGMENT_PAGE_SIZE = 200
+
+# Longest excerpt read for a card; the delegate only shows a few lines
+SNIPPET_MAX_CHARS = 600
+
+# SQLite's NOCASE collation folds ASCII letters only
+_NOCASE = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+class SegmentListModel(QAbstractListModel):
+    """
+    Segments coded with one code, loaded a page at a time.
+
+    Rows are fetched with keyset-paginated queries through Qt's
+    canFetchMore/fetchMore protocol, so views only pull pages as they scroll
+    towards the end. Snippets are read the first time a row's SNIPPET_ROLE
+    is asked for, which only happens when its card is painted.
+
+    Follows the repository's change events for the shown code: removed
+    segments and documents drop their rows, renames reload the list (rows
+    are ordered by document name), and new segments are picked up by the
+    next page unless they sort among the rows already loaded.
+    """
+    def __init__(self, repo: ProjectRepository, parent=None):
+        super().__init__(parent)
+        self.repo = repo
+        self.code_id = None
+        self._rows: list[dict] = []
+        self._snippets: dict[int, str] = {}
+        self._exhausted = True
+
+        repo.events.subscribe(self._on_segments_added, SegmentsAdded)
+        repo.events.subscribe(self._on_segments_removed, SegmentsRemoved)
+        repo.events.subscribe(self._on_code_deleted, CodeDeleted)
+        repo.events.subscribe(self._on_document_renamed, DocumentRenamed)
+        repo.events.subscribe(self._on_document_deleted, DocumentDeleted)
+
+    def set_code(self, code_id) -> None:
+        """Show the segments of code_id, starting with its first page."""
+        self.beginResetModel()
+        self.code_id = code_id
+        self._rows = []
+        self._snippets = {}
+        self._exhausted = code_id is None
+        self.endResetModel()
+
+        if self.canFetchMore():
+            self.fetchMore()
+
+    # ---- lazy loading ------------------------------------------------------
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if parent.isValid() or self._exhausted:
+            return
+
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last["display_name"], last["document_id"], last["start_offset"], last["segment_id"])
+
+        page = self.repo.get_segments_for_code_page(self.code_id, after=after, limit=SEGMENT_PAGE_SIZE)
+        if len(page) < SEGMENT_PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+        logger.debug("SegmentListModel: fetched %d segments for code_id=%s", len(page), self.code_id)
+
+    def snippet(self, row: int) -> str:
+        segment_id = self._rows[row]["segment_id"]
+        snippet = self._snippets.get(segment_id)
+        if snippet is None:
+            snippet = self._read_snippet(self._rows[row])
+            self._snippets[segment_id] = snippet
+        return snippet
+
+    def _read_snippet(self, segment: dict) -> str:
+        start = segment["start_offset"]
+        end = min(segment["end_offset"], start + SNIPPET_MAX_CHARS)
+        try:
+            snippet = self.repo.text_service.get_snippet(segment["document_id"], start, end)
+        except Exception as e:
+            logger.warning(
+                "SegmentListModel: error reading snippet for document_id=%s: %s",
+                segment["document_id"], e,
+            )
+            return "[Error reading snippet]"
+        if end < segment["end_offset"]:
+            snippet += "…"
+        return snippet
+
+    # ---- repository events -------------------------------------------------
+    def _on_segments_added(self, event: SegmentsAdded) -> None:
+        if self.code_id is None or self.code_id not in event.code_ids:
+            return
+        if self._rows and not self._exhausted:
+            last = self._rows[-1]
+            last_key = _sort_key(last["display_name"], last["document_id"], last["start_offset"], last["segment_id"])
+            names = {segment["document_id"]: segment["display_name"] for segment in self._rows}
+            if all(
+                _sort_key(
+                    self._display_name(segment["document_id"], names),
+                    segment["document_id"], segment["start_offset"], segment["id"],
+                ) > last_key
+                for segment in event.segments
+                if segment["code_id"] == self.code_id
+            ):
+                return  # beyond the loaded pages; fetchMore will return them
+        self.set_code(self.code_id)
+
+    def _on_segments_removed(self, event: SegmentsRemoved) -> None:
+        if self.code_id is None or self.code_id not in event.code_ids:
+            return
+        removed = {segment["id"] for segment in event.segments}
+        self._remove_rows_where(lambda segment: segment["segment_id"] in removed)
+
+    def _on_code_deleted(self, event: CodeDeleted) -> None:
+        if event.code_id == self.code_id:
+            self.set_code(None)
+
+    def _on_document_renamed(self, event: DocumentRenamed) -> None:
+        # Rows are ordered by document name, so a rename can move them
+        if any(segment["document_id"] == event.document_id for segment in self._rows) or not self._exhausted:
+            self.set_code(self.code_id)
+
+    def _on_document_deleted(self, event: DocumentDeleted) -> None:
+        self._remove_rows_where(lambda segment: segment["document_id"] == event.document_id)
+
+    def _display_name(self, document_id: int, names: dict) -> str:
+        if document_id not in names:
+            documents = self.repo.list_documents(document_id)
+            names[document_id] = documents[0]["display_name"] if documents else ""
+        return names[document_id]
+
+    def _remove_rows_where(self, predicate) -> None:
+        # Back to front, one removal per contiguous run (a document's rows
+        # are adjacent), so earlier row numbers stay valid
+        row = len(self._rows) - 1
+        while row >= 0:
+            if not predicate(self._rows[row]):
+                row -= 1
+                continue
+            last = row
+            while row > 0 and predicate(self._rows[row - 1]):
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            for segment in self._rows[row:last + 1]:
+                self._snippets.pop(segment["segment_id"], None)
+            del self._rows[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
+
+    # ---- QAbstractListModel ------------------------------------------------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        segment = self._rows[index.row()]
+
+        if role == Qt.DisplayRole:
+            return segment["display_name"]
+        if role == DOC_ID_ROLE:
+            return segment["document_id"]
+        if role == START_ROLE:
+            return segment["start_offset"]
+        if role == END_ROLE:
+            return segment["end_offset"]
+        if role == SEGMENT_ROLE:
+            return segment
+        if role == SNIPPET_ROLE:
+            return self.snippet(index.row())
+        return None
+
+def _sort_key(display_name: str, document_id: int, start_offset: int, segment_id: int) -> tuple:
+    """Python equivalent of the page query's ORDER BY."""
+    return (display_name.translate(_NOCASE), document_id, start_offset, segment_id)
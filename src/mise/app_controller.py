@@ -1,23 +1,26 @@
 import logging
 logger = logging.getLogger(__name__)
 
-from typing import Optional
-from datetime import datetime
-from html import escape
+from typing import Optional, TYPE_CHECKING
 import webbrowser
 from pathlib import Path
 
-from PySide6.QtWidgets import QMainWindow, QMessageBox, QApplication
+from PySide6.QtWidgets import QMainWindow, QMessageBox, QApplication, QStackedWidget
 from PySide6.QtCore import QSettings
 from PySide6.QtGui import QFontDatabase
 
 
 from .utils.project_repository import ProjectRepository
-from .projectview.project_window import ProjectView
-from .analysisview.analysis_window import AnalysisView
-from .project_init import init_project
+from .utils.report_writer import default_report_path, write_code_report
+from .project_init import init_project, is_project, project_name_of
 from .ui import theme
 
+# The view stacks are imported when first shown, keeping them (and the
+# import pipeline they pull in) off the path to the welcome screen
+if TYPE_CHECKING:
+    from .projectview.project_window import ProjectView
+    from .analysisview.analysis_window import AnalysisView
+
 class AppController:
     """
     Central program controller, handles all state changes and project life-cycle
@@ -40,6 +43,10 @@ class AppController:
 
         self._project_view: Optional[ProjectView] = None
         self._analysis_view: Optional[AnalysisView] = None
+        # Central widget holding both views once created; switching views
+        # flips pages instead of rebuilding them, and each view keeps itself
+        # current through the repository's change events
+        self._view_stack: Optional[QStackedWidget] = None
 
     # ----------- Font Setup ----------------
     def load_app_fonts(self):
@@ -81,7 +88,7 @@ class AppController:
             QMessageBox.warning(self.main_window, "Invalid project", "The selected path is not a directory.")
             return
 
-        if not (project_root / ".mise").exists():
+        if not is_project(project_root):
             QMessageBox.warning(
                 self.main_window,
                 "Invalid project",
@@ -89,9 +96,7 @@ class AppController:
             )
             return
 
-        project_name = project_root.name
-        if project_name.endswith(".mise"):
-            project_name = project_name[:-5]
+        project_name = project_name_of(project_root)
 
         db_path = project_root / "project.db"
         repo = ProjectRepository(db_path, texts_dir)
@@ -116,20 +121,43 @@ class AppController:
         self.current_repo = repo
 
         # Any existing views are now tied to a stale project → drop them
-        self._project_view = None
-        self._analysis_view = None
+        self._discard_views()
 
     # ---------- view management ----------
 
+    def _ensure_view_stack(self) -> QStackedWidget:
+        if self._view_stack is not None and self.main_window.centralWidget() is self._view_stack:
+            return self._view_stack
+        # First view in this window, or the stack was replaced as central
+        # widget, which deleted it along with the views it held
+        self._project_view = None
+        self._analysis_view = None
+        self._view_stack = QStackedWidget()
+        self.main_window.setCentralWidget(self._view_stack)
+        return self._view_stack
+
+    def _discard_views(self):
+        for view in (self._project_view, self._analysis_view):
+            if view is None:
+                continue
+            if self._view_stack is not None:
+                self._view_stack.removeWidget(view)
+            view.deleteLater()
+        self._project_view = None
+        self._analysis_view = None
+
     def _create_project_view_if_needed(self):
         if self.current_repo is None:
             return
+        stack = self._ensure_view_stack()
         if self._project_view is None:
+            from .projectview.project_window import ProjectView
             self._project_view = ProjectView(
                 self.current_project_name,
                 self.current_project_root,
                 self.current_repo,
             )
+            stack.addWidget(self._project_view)
 
     def _create_analysis_view_if_needed(self):
         if self.current_repo is None:
@@ -139,41 +167,43 @@ class AppController:
                 "Open or create a project before using the analysis view.",
             )
             return
+        stack = self._ensure_view_stack()
         if self._analysis_view is None:
+            from .analysisview.analysis_window import AnalysisView
             self._analysis_view = AnalysisView(
                 self.current_project_name,
                 self.current_project_root,
                 self.current_repo,
             )
+            stack.addWidget(self._analysis_view)
 
     def show_project_view(self):
         if self.current_repo is None:
             QMessageBox.warning(self.main_window, "No project", "Open or create a project first.")
             return
 
-        view = ProjectView(
-            self.current_project_name,
-            self.current_project_root,
-            self.current_repo,
-        )
-        self._project_view = view # updates controller state
-        self.main_window.setCentralWidget(view)
-        self._project_view.set_content_font_size(self.content_font_size)
+        self._create_project_view_if_needed()
+        self._show_view(self._project_view)
 
     def show_analysis_view(self):
         if self.current_repo is None:
             QMessageBox.warning(self.main_window, "No project", "Open or create a project first.")
             return
 
-        view = AnalysisView(
-            self.current_project_name,
-            self.current_project_root,
-            self.current_repo,
-        )
-        self._analysis_view = view
-        self.main_window.setCentralWidget(view)
-        self._analysis_view.set_content_font_size(self.content_font_size)
-        
+        self._create_analysis_view_if_needed()
+        self._show_view(self._analysis_view)
+
+    def show_cooccurrence_view(self):
+        if self.current_repo is None:
+            QMessageBox.warning(self.main_window, "No project", "Open or create a project first.")
+            return
+
+        self.show_analysis_view()
+        self._analysis_view.show_cooccurrence_page()
+
+    def _show_view(self, view):
+        self._view_stack.setCurrentWidget(view)
+        view.set_content_font_size(self.content_font_size)
 
     # ---------- UI Methods ------------------------------
 
@@ -203,140 +233,50 @@ class AppController:
     def _apply_content_font_size(self):
         self.settings.setValue("content_font_size", self.content_font_size)
 
-        current = self.main_window.centralWidget()
-        # Only update the visible view; ignore things that don't support font size
-        if hasattr(current, "set_content_font_size"):
-            current.set_content_font_size(self.content_font_size)
+        # Cached views get it now too, rather than when next shown
+        for view in (self._project_view, self._analysis_view):
+            if view is not None:
+                view.set_content_font_size(self.content_font_size)
     
     # ---------- reports ------------------------------
 
-    def generate_report(self, report_data: list[dict]):
+    def generate_report(self, code_ids: list[str]):
         """
-        Export HTML code report from selected codes, open report in default browser.
-        
-        :param self: Description
-        :param report_data: List of dictionaries containing code and segment info
-        :type report_data: list[dict]
+        Export an HTML report of the selected codes to project_root/reports/
+        and open it in the default browser.
+
+        :param code_ids: Codes to include, in report order
+        :type code_ids: list[str]
         """
 
-        if not report_data:
-            logger.warning("generate_report called with empty report_data.")
+        if not code_ids:
+            logger.warning("generate_report called with no codes.")
             return
 
-        # --------------------------------------------
-        # 1. Load HTML template
-        # --------------------------------------------
-        template_path = (
-            Path(__file__).resolve().parent
-            / "assets"
-            / "templates"
-            / "template.html"
-        )
+        if self.current_repo is None:
+            logger.warning("generate_report called with no project open.")
+            return
+
+        out_path = default_report_path(self.current_project_root)
 
+        project_name = self.current_project_name or "Unknown Project"
         try:
-            template = template_path.read_text(encoding="utf-8")
-        except FileNotFoundError:
-            logger.error("AppController.generate_report: Template not found at %r", template_path)
+            write_code_report(self.current_repo, code_ids, out_path, project_name)
+        except OSError:
+            logger.exception("AppController.generate_report: could not write report to %r", out_path)
+            QMessageBox.warning(
+                self.main_window,
+                "Report failed",
+                f"Could not write the report to:\n{out_path}",
+            )
             return
 
-        # --------------------------------------------
-        # 2. Generate report body (inner HTML)
-        # --------------------------------------------
-        project_name = escape(getattr(self, "current_project_name", "Unknown Project"))
-        body_parts = []
-
-        for entry in report_data:
-            code = entry["code"]
-            segments = entry["segments"]
-
-            code_label = escape(code["label"])
-            code_color = escape(code.get("color") or "#cccccc")
-            segment_count = code.get("segment_count", len(segments))
-            document_count = code.get("document_count", None)
-
-            # ----- Code header block -----
-            body_parts.append(
-                f"<section>\n"
-                f"<h2><span class='code-badge' "
-                f"style='border-color:{code_color};background:{code_color}22;'>"
-                f"{code_label}</span></h2>\n"
-                f"<p>Project: {project_name}</p>\n"
-                f"<p>Segments: {segment_count}"
-                + (f" | Documents: {document_count}</p>\n" if document_count else "</p>\n")
-            )
+        try:
+            webbrowser.open(out_path.as_uri())
+        except Exception as e:
+            logger.warning("Could not open report automatically: %s", e)
 
-            # ----- Group segments by document -----
-            docs = {}
-            for seg in segments:
-                doc = seg["display_name"]
-                docs.setdefault(doc, []).append(seg)
-
-            # ----- Write segments for each document -----
-            for doc_name, seg_list in docs.items():
-                body_parts.append(f"<h3>{escape(doc_name)}</h3>\n")
-
-                for seg in seg_list:
-                    path = seg["text_path"]
-                    start = seg["start_offset"]
-                    end = seg["end_offset"]
-
-                    try:
-                        content = Path(path).read_text(encoding="utf-8")
-                        snippet = escape(content[start:end].strip())
-                    except Exception as e:
-                        snippet = "[Error reading snippet]"
-                        logger.warning(f"Error reading snippet for {path}: {e}")
-
-                    body_parts.append(
-                        "<div class='segment'>\n"
-                        f"  <div class='segment-header'>Offsets: {start}–{end} | Path: {escape(path)}</div>\n"
-                        f"  <div class='snippet'>{snippet}</div>\n"
-                        "</div>\n"
-                    )
-
-            body_parts.append("</section>\n")
-
-            body_html = "".join(body_parts)
-            
-            # --------------------------------------------
-            # 2b. Fill PROJECT_NAME
-            # --------------------------------------------
-            project_name = getattr(self, "current_project_name", "Unknown Project")
-            template = template.replace("{{PROJECT_NAME}}", escape(project_name))
-
-            logo_path = (
-                Path(__file__).resolve().parent / "assets" / "mise.png"
-            ).as_uri()
-
-            template = template.replace("{{LOGO_PATH}}", logo_path)
-
-            # --------------------------------------------
-            # 3. Fill template (replace {{CONTENT}})
-            # --------------------------------------------
-            if "{{CONTENT}}" in template:
-                full_html = template.replace("{{CONTENT}}", body_html)
-            else:
-                # fallback: append at end
-                full_html = template + "\n" + body_html
-
-            # --------------------------------------------
-            # 4. Save report to project_root/reports/
-            # --------------------------------------------
-            reports_dir = self.current_project_root / "reports"
-            reports_dir.mkdir(exist_ok=True)
-
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            file_name = f"code-report-{timestamp}.html"
-
-            out_path = reports_dir / file_name
-            out_path.write_text(full_html, encoding="utf-8")
-
-            try:
-                webbrowser.open(out_path.as_uri())
-            except Exception as e:
-                logger.warning("Could not open report automatically: %s", e)
-
-            logger.info("Report successfully written to %r", out_path)
+        logger.info("Report successfully written to %r", out_path)
 
     # ---------- shutdown ------------------------------
 
@@ -0,0 +1,313 @@
+"""
+Command-line interface for working with projects without the GUI.
+
+Every subcommand opens one project through ProjectRepository, does its work
+without importing Qt and prints a JSON document on stdout; logging goes to
+stderr. The exit status is 0 on success, 1 when the command ran but found
+problems (failed imports, integrity problems) and 2 for usage errors or a
+project that cannot be opened or read, which also print a JSON error object
+({"ok": false, "command": ..., "error": ...}). Runs over many projects can
+be scripted and run in parallel.
+
+    mise                                   start the GUI
+    mise import PROJECT PATH...            import files or folders
+    mise report PROJECT --codes CODE...    write an HTML code report
+    mise export PROJECT [--output FILE]    export segments as CSV or JSON lines,
+                                           or --coverage the coverage matrix
+    mise stats PROJECT                     code and document counts
+    mise check PROJECT [--repair]          look for damage, rebuild statistics
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import multiprocessing
+import sqlite3
+import sys
+from pathlib import Path
+
+from .project_init import open_repository, project_name_of
+
+import logging
+logger = logging.getLogger(__name__)
+
+COMMANDS = ("import", "report", "export", "stats", "check")
+
+EXPORT_FIELDS = [
+    "segment_id",
+    "document_id",
+    "document",
+    "code_id",
+    "code",
+    "start_offset",
+    "end_offset",
+    "page_number",
+    "text",
+]
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point of the mise script; starts the GUI when no command is given."""
+    # Import conversion runs in a process pool; frozen builds need this
+    # before anything else so worker processes don't relaunch the app
+    multiprocessing.freeze_support()
+
+    if argv is None:
+        argv = sys.argv[1:]
+    if not _wants_cli(argv):
+        from .app import run
+        return run()
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+
+    try:
+        repo = open_repository(args.project)
+    except FileNotFoundError as e:
+        return _fail(args.command, e)
+    except (OSError, sqlite3.Error) as e:
+        # Damaged, locked or unreadable database
+        return _fail(args.command, e, unexpected=True)
+
+    try:
+        result, status = args.handler(repo, args)
+    except (KeyError, ValueError) as e:
+        return _fail(args.command, e)
+    except (OSError, sqlite3.Error) as e:
+        return _fail(args.command, e, unexpected=True)
+    finally:
+        repo.close()
+
+    if result is not None:
+        json.dump(result, sys.stdout, indent=2, default=str)
+        sys.stdout.write("\n")
+    return status
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mise", description="Mise qualitative data analysis.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    command = commands.add_parser("import", help="import documents into a project")
+    command.add_argument("project", type=Path, help="project directory (NAME.mise)")
+    command.add_argument("paths", type=Path, nargs="+", help="files, or folders searched recursively")
+    command.add_argument(
+        "--workers", type=int, default=1,
+        help="conversion processes (0 for one per core; default 1, for running many projects side by side)",
+    )
+    command.add_argument(
+        "--refresh", action="store_true",
+        help="replace the text of uncoded documents with changed files of the same name instead of adding them",
+    )
+    command.set_defaults(handler=cmd_import)
+
+    command = commands.add_parser("report", help="write an HTML report of codes")
+    command.add_argument("project", type=Path, help="project directory (NAME.mise)")
+    codes = command.add_mutually_exclusive_group(required=True)
+    codes.add_argument("--codes", nargs="+", metavar="CODE", help="code ids or labels")
+    codes.add_argument("--all-codes", action="store_true", help="report every code")
+    command.add_argument("--output", type=Path, help="report file (default: PROJECT/reports/code-report-TIME.html)")
+    command.set_defaults(handler=cmd_report)
+
+    command = commands.add_parser("export", help="export coded segments with their text")
+    command.add_argument("project", type=Path, help="project directory (NAME.mise)")
+    command.add_argument("--codes", nargs="+", metavar="CODE", help="code ids or labels (default: all)")
+    command.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    command.add_argument(
+        "--coverage", choices=("chars", "percent"),
+        help="export the document-by-code coverage matrix (CSV) instead of segments",
+    )
+    command.add_argument("--output", type=Path, help="output file (default: stdout)")
+    command.set_defaults(handler=cmd_export)
+
+    command = commands.add_parser("stats", help="code and document statistics")
+    command.add_argument("project", type=Path, help="project directory (NAME.mise)")
+    command.set_defaults(handler=cmd_stats)
+
+    command = commands.add_parser("check", help="check a project for damage")
+    command.add_argument("project", type=Path, help="project directory (NAME.mise)")
+    command.add_argument("--repair", action="store_true", help="rebuild statistics that disagree with the segments")
+    command.set_defaults(handler=cmd_check)
+
+    return parser
+
+# ---- commands --------------------------------------------------------------
+# Each returns (JSON-serialisable result or None, exit status)
+def cmd_import(repo, args) -> tuple[dict, int]:
+    from .utils.import_service import import_files
+
+    src_paths = _expand_import_paths(args.paths)
+    summary = import_files(
+        src_paths,
+        repo.texts_dir,
+        repo,
+        max_workers=args.workers or None,
+        refresh=args.refresh,
+    )
+    return summary, 1 if summary["errors"] else 0
+
+def cmd_report(repo, args) -> tuple[dict, int]:
+    from .utils.report_writer import default_report_path, write_code_report
+
+    code_ids = _all_code_ids(repo) if args.all_codes else _resolve_codes(repo, args.codes)
+    out_path = args.output or default_report_path(args.project)
+    summary = write_code_report(repo, code_ids, out_path, project_name_of(args.project))
+    return summary, 0
+
+def cmd_export(repo, args) -> tuple[dict | None, int]:
+    if args.coverage:
+        return _export_coverage(repo, args)
+
+    code_ids = _resolve_codes(repo, args.codes) if args.codes else _all_code_ids(repo)
+    labels = {code["id"]: code["label"] for code in repo.get_code_usage_overview()}
+
+    if args.output is None:
+        count = _write_export(repo, code_ids, labels, args.format, sys.stdout)
+        # stdout carries the export itself
+        logger.info("mise export: %d segments written", count)
+        return None, 0
+
+    with args.output.open("w", encoding="utf-8", newline="") as out:
+        count = _write_export(repo, code_ids, labels, args.format, out)
+    return {"path": args.output, "format": args.format, "segments": count}, 0
+
+def cmd_stats(repo, args) -> tuple[dict, int]:
+    codes = repo.get_code_usage_overview()
+    documents = repo.get_document_coding_overview()
+    return {
+        "project": project_name_of(args.project),
+        "totals": {
+            "codes": len(codes),
+            "documents": len(documents),
+            "segments": sum(document["segment_count"] for document in documents),
+        },
+        "codes": codes,
+        "documents": documents,
+    }, 0
+
+def cmd_check(repo, args) -> tuple[dict, int]:
+    problems = repo.check_integrity()
+    repaired = False
+    if args.repair and problems["stale_statistics"]:
+        repo.rebuild_statistics()
+        problems["stale_statistics"] = repo.check_integrity()["stale_statistics"]
+        repaired = True
+
+    ok = not any(problems.values())
+    return {"ok": ok, "repaired": repaired, "problems": problems}, 0 if ok else 1
+
+# ---- internal helpers ------------------------------------------------------
+def _fail(command: str, error: Exception, unexpected: bool = False) -> int:
+    """
+    Report a command that could not run: a JSON error object on stdout and
+    the message in the log (stderr), with a traceback only for unexpected
+    failures. Returns the exit status for errors.
+    """
+    # KeyError's str() adds quotes around the message
+    message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+    if unexpected:
+        logger.exception("mise %s failed", command)
+    else:
+        logger.error("mise %s: %s", command, message)
+
+    json.dump({"ok": False, "command": command, "error": message}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 2
+
+def _wants_cli(argv: list[str]) -> bool:
+    # Anything else (no arguments, or Qt's own options) goes to the GUI
+    if not argv:
+        return False
+    first = argv[0]
+    return first in COMMANDS or first in ("-h", "--help", "-v", "--verbose")
+
+def _expand_import_paths(paths: list[Path]) -> list[Path]:
+    """Files as given, folders replaced by the importable files below them."""
+    from .utils.import_service import ALLOWED_EXTENSIONS
+
+    src_paths = []
+    for path in paths:
+        if path.is_dir():
+            src_paths.extend(
+                sorted(p for p in path.rglob("*") if p.is_file() and p.suffix.lower() in ALLOWED_EXTENSIONS)
+            )
+        else:
+            src_paths.append(path)
+    return src_paths
+
+def _all_code_ids(repo) -> list[str]:
+    return [code["id"] for code in repo.get_code_usage_overview()]
+
+def _resolve_codes(repo, names: list[str]) -> list[str]:
+    """
+    Code ids for names that are code ids or labels, in the given order.
+
+    :raises KeyError: if a name matches no code
+    """
+    codes = repo.get_code_usage_overview()
+    by_id = {code["id"]: code["id"] for code in codes}
+    by_label = {}
+    for code in codes:
+        by_label.setdefault(code["label"], []).append(code["id"])
+
+    code_ids = []
+    for name in names:
+        if name in by_id:
+            matches = [name]
+        elif name in by_label:
+            # A label used by several codes selects all of them
+            matches = by_label[name]
+        else:
+            raise KeyError(f"no code with id or label {name!r}")
+        code_ids.extend(code_id for code_id in matches if code_id not in code_ids)
+    return code_ids
+
+def _export_coverage(repo, args) -> tuple[dict | None, int]:
+    from .analysis.coverage import load_coverage
+
+    matrix = load_coverage(repo)
+    frame = matrix.to_frame(args.coverage)
+    if args.output is None:
+        frame.to_csv(sys.stdout)
+        return None, 0
+
+    frame.to_csv(args.output)
+    return {
+        "path": args.output,
+        "coverage": args.coverage,
+        "documents": len(matrix.document_ids),
+        "codes": len(matrix.code_ids),
+    }, 0
+
+def _write_export(repo, code_ids: list[str], labels: dict, fmt: str, out) -> int:
+    """Write one record per segment to out, streaming from the database."""
+    text_service = repo.text_service
+    writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS) if fmt == "csv" else None
+    if writer is not None:
+        writer.writeheader()
+
+    count = 0
+    for seg in repo.iter_segments_for_codes(code_ids):
+        record = {
+            "segment_id": seg["segment_id"],
+            "document_id": seg["document_id"],
+            "document": seg["display_name"],
+            "code_id": seg["code_id"],
+            "code": labels.get(seg["code_id"]),
+            "start_offset": seg["start_offset"],
+            "end_offset": seg["end_offset"],
+            "page_number": seg["page_number"],
+            "text": text_service.get_window(seg["document_id"], seg["start_offset"], seg["end_offset"]),
+        }
+        if writer is not None:
+            writer.writerow(record)
+        else:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
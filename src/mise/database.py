@@ -34,6 +34,391 @@ CREATE TABLE coded_segments (
 );
 """
 
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version     INTEGER PRIMARY KEY,
+    applied_at  TEXT NOT NULL
+);
+"""
+
+# Recompute the statistics tables of migration 7 from coded_segments. Used
+# by ProjectRepository.rebuild_statistics to recover from counts that
+# drifted (e.g. segments written with triggers disabled). Migration 7 keeps
+# its own frozen copy of the backfill, so this may change with the schema.
+# The pair rows go in before the per-code and per-document rows exist, so
+# the code_document_stats triggers have nothing to update while refilling.
+STATISTICS_REBUILD = [
+    "DELETE FROM code_document_stats",
+    "DELETE FROM code_stats",
+    "DELETE FROM document_stats",
+    """
+    INSERT INTO code_document_stats (code_id, document_id, segment_count)
+    SELECT code_id, document_id, COUNT(*)
+    FROM coded_segments
+    GROUP BY code_id, document_id
+    """,
+    """
+    INSERT INTO code_stats (code_id, segment_count, document_count)
+    SELECT c.id, COALESCE(SUM(p.segment_count), 0), COUNT(p.document_id)
+    FROM codes AS c
+    LEFT JOIN code_document_stats AS p ON p.code_id = c.id
+    GROUP BY c.id
+    """,
+    """
+    INSERT INTO document_stats (document_id, segment_count, code_count)
+    SELECT d.id, COALESCE(SUM(p.segment_count), 0), COUNT(p.code_id)
+    FROM documents AS d
+    LEFT JOIN code_document_stats AS p ON p.document_id = d.id
+    GROUP BY d.id
+    """,
+]
+
+# Ordered list of (version, statements). Append new migrations to the end and
+# never edit one that has shipped: existing projects only run the versions
+# they have not recorded in schema_version yet.
+MIGRATIONS = [
+    (1, [
+        # Segment lookups by document (viewer highlights, hit-testing)
+        """
+        CREATE INDEX IF NOT EXISTS idx_coded_segments_document
+        ON coded_segments (document_id, start_offset, end_offset)
+        """,
+        # Segment lookups by code (analysis view, reports, code stats)
+        """
+        CREATE INDEX IF NOT EXISTS idx_coded_segments_code
+        ON coded_segments (code_id, document_id)
+        """,
+        # Document lookups by path (document browser)
+        """
+        CREATE INDEX IF NOT EXISTS idx_documents_text_path
+        ON documents (text_path)
+        """,
+    ]),
+    (2, [
+        # Interval index over segments for hit-testing and range queries.
+        # rtree_i32 keeps integer coordinates exact (the default rtree uses
+        # 32-bit floats); the document id is stored as a degenerate interval.
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS segment_index USING rtree_i32(
+            id,
+            document_min, document_max,
+            start_offset, end_offset
+        )
+        """,
+        """
+        INSERT OR REPLACE INTO segment_index
+        SELECT id, document_id, document_id,
+               MIN(start_offset, end_offset), MAX(start_offset, end_offset)
+        FROM coded_segments
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_index_insert
+        AFTER INSERT ON coded_segments
+        BEGIN
+            INSERT OR REPLACE INTO segment_index VALUES (
+                NEW.id, NEW.document_id, NEW.document_id,
+                MIN(NEW.start_offset, NEW.end_offset), MAX(NEW.start_offset, NEW.end_offset)
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_index_update
+        AFTER UPDATE OF document_id, start_offset, end_offset ON coded_segments
+        BEGIN
+            DELETE FROM segment_index WHERE id = OLD.id;
+            INSERT INTO segment_index VALUES (
+                NEW.id, NEW.document_id, NEW.document_id,
+                MIN(NEW.start_offset, NEW.end_offset), MAX(NEW.start_offset, NEW.end_offset)
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_index_delete
+        AFTER DELETE ON coded_segments
+        BEGIN
+            DELETE FROM segment_index WHERE id = OLD.id;
+        END
+        """,
+    ]),
+    (3, [
+        # Character offset where each page of a paginated source starts
+        """
+        CREATE TABLE IF NOT EXISTS document_pages (
+            document_id   INTEGER NOT NULL REFERENCES documents(id),
+            page_number   INTEGER NOT NULL,
+            start_offset  INTEGER NOT NULL,
+            PRIMARY KEY (document_id, page_number)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_document_pages_offset
+        ON document_pages (document_id, start_offset, page_number)
+        """,
+    ]),
+    (4, [
+        # Content hashes of the imported source file and the canonical text
+        "ALTER TABLE documents ADD COLUMN source_hash TEXT",
+        "ALTER TABLE documents ADD COLUMN text_hash TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_documents_text_hash ON documents (text_hash)",
+        # Every source hash known to produce a document, including sources
+        # linked to an existing document because their text was identical
+        """
+        CREATE TABLE IF NOT EXISTS document_sources (
+            source_hash        TEXT PRIMARY KEY,
+            document_id        INTEGER NOT NULL REFERENCES documents(id),
+            original_filename  TEXT,
+            linked_at          TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_document_sources_document
+        ON document_sources (document_id)
+        """,
+    ]),
+    (5, [
+        # Named counters; 'texts' numbers canonical text files (doc-0001.txt)
+        """
+        CREATE TABLE IF NOT EXISTS text_sequence (
+            name   TEXT PRIMARY KEY,
+            value  INTEGER NOT NULL
+        )
+        """,
+        # Start after the highest doc-N.txt already registered
+        """
+        INSERT OR IGNORE INTO text_sequence (name, value)
+        SELECT 'texts', COALESCE(MAX(CAST(substr(text_path, 5, length(text_path) - 8) AS INTEGER)), 0)
+        FROM documents
+        WHERE text_path GLOB 'doc-[0-9]*.txt'
+        """,
+    ]),
+    (6, [
+        # Segment list pages are read in (document_id, start_offset, id)
+        # order per code; extend the code index so each page is a range scan
+        "DROP INDEX IF EXISTS idx_coded_segments_code",
+        """
+        CREATE INDEX IF NOT EXISTS idx_coded_segments_code
+        ON coded_segments (code_id, document_id, start_offset)
+        """,
+    ]),
+    (7, [
+        # Segment counts kept current by triggers, so the analysis overviews
+        # read one row per code or document instead of aggregating segments.
+        # code_document_stats holds one row per (code, document) pair in use;
+        # a pair row appearing or disappearing moves the distinct counts.
+        """
+        CREATE TABLE IF NOT EXISTS code_document_stats (
+            code_id        TEXT NOT NULL,
+            document_id    INTEGER NOT NULL,
+            segment_count  INTEGER NOT NULL,
+            PRIMARY KEY (code_id, document_id)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_code_document_stats_document
+        ON code_document_stats (document_id, code_id)
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS code_stats (
+            code_id         TEXT PRIMARY KEY,
+            segment_count   INTEGER NOT NULL DEFAULT 0,
+            document_count  INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS document_stats (
+            document_id    INTEGER PRIMARY KEY,
+            segment_count  INTEGER NOT NULL DEFAULT 0,
+            code_count     INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS code_document_stats_insert
+        AFTER INSERT ON code_document_stats
+        BEGIN
+            UPDATE code_stats SET document_count = document_count + 1 WHERE code_id = NEW.code_id;
+            UPDATE document_stats SET code_count = code_count + 1 WHERE document_id = NEW.document_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS code_document_stats_delete
+        AFTER DELETE ON code_document_stats
+        BEGIN
+            UPDATE code_stats SET document_count = document_count - 1 WHERE code_id = OLD.code_id;
+            UPDATE document_stats SET code_count = code_count - 1 WHERE document_id = OLD.document_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_stats_insert
+        AFTER INSERT ON coded_segments
+        BEGIN
+            INSERT OR IGNORE INTO code_stats (code_id) VALUES (NEW.code_id);
+            INSERT OR IGNORE INTO document_stats (document_id) VALUES (NEW.document_id);
+            UPDATE code_stats SET segment_count = segment_count + 1 WHERE code_id = NEW.code_id;
+            UPDATE document_stats SET segment_count = segment_count + 1 WHERE document_id = NEW.document_id;
+            UPDATE code_document_stats SET segment_count = segment_count + 1
+            WHERE code_id = NEW.code_id AND document_id = NEW.document_id;
+            INSERT OR IGNORE INTO code_document_stats (code_id, document_id, segment_count)
+            VALUES (NEW.code_id, NEW.document_id, 1);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_stats_delete
+        AFTER DELETE ON coded_segments
+        BEGIN
+            UPDATE code_stats SET segment_count = segment_count - 1 WHERE code_id = OLD.code_id;
+            UPDATE document_stats SET segment_count = segment_count - 1 WHERE document_id = OLD.document_id;
+            UPDATE code_document_stats SET segment_count = segment_count - 1
+            WHERE code_id = OLD.code_id AND document_id = OLD.document_id;
+            DELETE FROM code_document_stats
+            WHERE code_id = OLD.code_id AND document_id = OLD.document_id AND segment_count <= 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_stats_update
+        AFTER UPDATE OF code_id, document_id ON coded_segments
+        BEGIN
+            UPDATE code_stats SET segment_count = segment_count - 1 WHERE code_id = OLD.code_id;
+            UPDATE document_stats SET segment_count = segment_count - 1 WHERE document_id = OLD.document_id;
+            UPDATE code_document_stats SET segment_count = segment_count - 1
+            WHERE code_id = OLD.code_id AND document_id = OLD.document_id;
+            DELETE FROM code_document_stats
+            WHERE code_id = OLD.code_id AND document_id = OLD.document_id AND segment_count <= 0;
+            INSERT OR IGNORE INTO code_stats (code_id) VALUES (NEW.code_id);
+            INSERT OR IGNORE INTO document_stats (document_id) VALUES (NEW.document_id);
+            UPDATE code_stats SET segment_count = segment_count + 1 WHERE code_id = NEW.code_id;
+            UPDATE document_stats SET segment_count = segment_count + 1 WHERE document_id = NEW.document_id;
+            UPDATE code_document_stats SET segment_count = segment_count + 1
+            WHERE code_id = NEW.code_id AND document_id = NEW.document_id;
+            INSERT OR IGNORE INTO code_document_stats (code_id, document_id, segment_count)
+            VALUES (NEW.code_id, NEW.document_id, 1);
+        END
+        """,
+        # Codes and documents without segments still get a row of zeros
+        """
+        CREATE TRIGGER IF NOT EXISTS codes_stats_insert
+        AFTER INSERT ON codes
+        BEGIN
+            INSERT OR IGNORE INTO code_stats (code_id) VALUES (NEW.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS codes_stats_delete
+        AFTER DELETE ON codes
+        BEGIN
+            DELETE FROM code_stats WHERE code_id = OLD.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS documents_stats_insert
+        AFTER INSERT ON documents
+        BEGIN
+            INSERT OR IGNORE INTO document_stats (document_id) VALUES (NEW.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS documents_stats_delete
+        AFTER DELETE ON documents
+        BEGIN
+            DELETE FROM document_stats WHERE document_id = OLD.id;
+        END
+        """,
+        # Backfill from existing segments (pair rows first, as in
+        # STATISTICS_REBUILD)
+        """
+        INSERT INTO code_document_stats (code_id, document_id, segment_count)
+        SELECT code_id, document_id, COUNT(*)
+        FROM coded_segments
+        GROUP BY code_id, document_id
+        """,
+        """
+        INSERT INTO code_stats (code_id, segment_count, document_count)
+        SELECT c.id, COALESCE(SUM(p.segment_count), 0), COUNT(p.document_id)
+        FROM codes AS c
+        LEFT JOIN code_document_stats AS p ON p.code_id = c.id
+        GROUP BY c.id
+        """,
+        """
+        INSERT INTO document_stats (document_id, segment_count, code_count)
+        SELECT d.id, COALESCE(SUM(p.segment_count), 0), COUNT(p.code_id)
+        FROM documents AS d
+        LEFT JOIN code_document_stats AS p ON p.document_id = d.id
+        GROUP BY d.id
+        """,
+    ]),
+    (8, [
+        # Characters covered per document and per (document, code), from the
+        # union of intervals. Computed in Python (analysis.coverage) and
+        # cached here; a document's rows are dropped whenever its segments or
+        # text change, and a missing coverage_documents row means "recompute".
+        """
+        CREATE TABLE IF NOT EXISTS coverage_documents (
+            document_id  INTEGER PRIMARY KEY,
+            text_length  INTEGER NOT NULL,
+            coded_chars  INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS coverage_codes (
+            document_id  INTEGER NOT NULL,
+            code_id      TEXT NOT NULL,
+            coded_chars  INTEGER NOT NULL,
+            PRIMARY KEY (document_id, code_id)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_coverage_insert
+        AFTER INSERT ON coded_segments
+        BEGIN
+            DELETE FROM coverage_documents WHERE document_id = NEW.document_id;
+            DELETE FROM coverage_codes WHERE document_id = NEW.document_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_coverage_delete
+        AFTER DELETE ON coded_segments
+        BEGIN
+            DELETE FROM coverage_documents WHERE document_id = OLD.document_id;
+            DELETE FROM coverage_codes WHERE document_id = OLD.document_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS coded_segments_coverage_update
+        AFTER UPDATE OF document_id, code_id, start_offset, end_offset ON coded_segments
+        BEGIN
+            DELETE FROM coverage_documents WHERE document_id IN (OLD.document_id, NEW.document_id);
+            DELETE FROM coverage_codes WHERE document_id IN (OLD.document_id, NEW.document_id);
+        END
+        """,
+        # A re-imported text changes the document's length
+        """
+        CREATE TRIGGER IF NOT EXISTS documents_coverage_update
+        AFTER UPDATE OF text_hash, text_path ON documents
+        BEGIN
+            DELETE FROM coverage_documents WHERE document_id = OLD.id;
+            DELETE FROM coverage_codes WHERE document_id = OLD.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS documents_coverage_delete
+        AFTER DELETE ON documents
+        BEGIN
+            DELETE FROM coverage_documents WHERE document_id = OLD.id;
+            DELETE FROM coverage_codes WHERE document_id = OLD.id;
+        END
+        """,
+    ]),
+    (9, [
+        # Segment lists and reports go through documents in display name
+        # order; lets keyset pages start at the right document
+        """
+        CREATE INDEX IF NOT EXISTS idx_documents_display_name
+        ON documents (display_name COLLATE NOCASE)
+        """,
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
 def initialize_database(project_root: Path):
     """
     Create project.db with all documnets, codes, and coded_segments tables.
@@ -44,5 +429,60 @@ def initialize_database(project_root: Path):
     try:
         conn.executescript(SCHEMA)
         conn.commit()
+        migrate_database(conn)
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Return the highest migration version recorded in the database,
+    0 for projects created before schema versioning existed.
+    """
+    conn.execute(SCHEMA_VERSION_TABLE)
+    row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()
+    return row[0]
+
+def migrate_database(conn: sqlite3.Connection) -> int:
+    """
+    Bring an open project database up to SCHEMA_VERSION in place.
+
+    Each pending migration runs in its own transaction together with the
+    schema_version row that records it, so an interrupted upgrade resumes
+    from the last completed version on the next open.
+
+    :param conn: Open connection to project.db
+    :type conn: sqlite3.Connection
+    :return: Schema version after migrating
+    :rtype: int
+    """
+    current = get_schema_version(conn)
+    conn.commit()
+
+    if current > SCHEMA_VERSION:
+        logger.warning(
+            "migrate_database: project schema version %d is newer than supported version %d",
+            current, SCHEMA_VERSION
+        )
+        return current
+
+    for version, statements in MIGRATIONS:
+        if version <= current:
+            continue
+
+        logger.info("migrate_database: applying migration %d", version)
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, applied_at) VALUES (?, datetime('now'))",
+                (version,),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("migrate_database: migration %d failed", version)
+            raise
+        current = version
+
+    return current
@@ -89,6 +89,10 @@ class MainWindow(QMainWindow):
         self.action_open_analysis.setShortcut("Ctrl+Shift+A")
         self.action_open_analysis.triggered.connect(self._handle_open_analysis_requested)
 
+        self.action_open_cooccurrence = QAction("Code Co-occurrence", self)
+        self.action_open_cooccurrence.setShortcut("Ctrl+Shift+O")
+        self.action_open_cooccurrence.triggered.connect(self._handle_open_cooccurrence_requested)
+
         self.action_open_project_view = QAction("Open Project View", self)
         self.action_open_project_view.setShortcut("Ctrl+Shift+P")
         self.action_open_project_view.triggered.connect(self._handle_project_view_requested)
@@ -130,6 +134,7 @@ class MainWindow(QMainWindow):
         # View
         view_menu = menu_bar.addMenu("View")
         view_menu.addAction(self.action_open_analysis)
+        view_menu.addAction(self.action_open_cooccurrence)
         view_menu.addAction(self.action_open_project_view)
         view_menu.addSeparator()
         view_menu.addAction(self.action_increase_font)
@@ -158,6 +163,7 @@ class MainWindow(QMainWindow):
 
         if not code_ids:
             QMessageBox.information(
+                self,
                 "No codes selected",
                 "Please select at least one code to include in the report.",
             )
@@ -165,23 +171,13 @@ class MainWindow(QMainWindow):
 
         if self.controller.current_repo is None:
             QMessageBox.warning(
+                self,
                 "No project open",
                 "Open a project before generating reports.",
             )
             return
 
-        report_data = []
-
-        for code_id in code_ids:
-            meta = self.controller.current_repo.get_code_metadata(code_id)
-            segments = self.controller.current_repo.get_segments_for_code(code_id)
-
-            report_data.append({
-                "code": meta,
-                "segments": segments
-            })        
-
-        self.controller.generate_report(report_data)
+        self.controller.generate_report(code_ids)
 
     def _handle_open_analysis_requested(self):
         """
@@ -189,6 +185,12 @@ class MainWindow(QMainWindow):
         """
         self.controller.show_analysis_view()
     
+    def _handle_open_cooccurrence_requested(self):
+        """
+        Open the code co-occurrence heatmap in the Analysis window
+        """
+        self.controller.show_cooccurrence_view()
+
     def _handle_project_view_requested(self):
         """
         Open Project Window
@@ -243,6 +245,7 @@ class MainWindow(QMainWindow):
             ("Create New Project", self.action_new_project),
             ("Open Project", self.action_open_project),
             ("Open Analysis View", self.action_open_analysis),
+            ("Code Co-occurrence", self.action_open_cooccurrence),
             ("Open Project View", self.action_open_project_view),
             ("Generate Code Report", self.action_generate_report),
             ("Increase Text Size", self.action_increase_font),
@@ -1,6 +1,7 @@
 from pathlib import Path
 from .database import initialize_database
 from .metadata import initialize_metadata
+from .utils.project_repository import ProjectRepository
 
 import logging
 logger = logging.getLogger(__name__)
@@ -20,6 +21,31 @@ def init_project(project_name: str, dirpath: str) -> Path:
 
     return project_root
 
+def is_project(project_root: Path) -> bool:
+    """True if project_root is a directory holding a Mise project."""
+    project_root = Path(project_root)
+    return project_root.is_dir() and (project_root / ".mise").exists()
+
+def open_repository(project_root: Path) -> ProjectRepository:
+    """
+    Open the repository of an existing project, without any UI.
+    The caller closes it, and reports any error.
+
+    :raises FileNotFoundError: if project_root is not a Mise project
+    """
+    project_root = Path(project_root)
+    if not is_project(project_root):
+        raise FileNotFoundError(f"Not a Mise project: {project_root}")
+
+    return ProjectRepository(project_root / "project.db", project_root / "texts")
+
+def project_name_of(project_root: Path) -> str:
+    """Project name from its directory, without the .mise suffix."""
+    name = Path(project_root).name
+    if name.endswith(".mise"):
+        name = name[:-5]
+    return name
+
 def create_project_directory(project_name: str, dirpath: str) -> Path:
     """
     Creates the directory for the project with subdirectories for metadata
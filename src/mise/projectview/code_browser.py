@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QPushButton, QTreeWidget, QTreeWidgetItem, QColorDialog,
+    QWidget, QVBoxLayout, QPushButton, QTreeView, QColorDialog,
     QDialog, QLineEdit, QComboBox, QDialogButtonBox, QPlainTextEdit, QFormLayout,
     QMenu
 )
@@ -7,31 +7,36 @@ from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QColor
 
 from ..utils.project_repository import ProjectRepository
+from ..ui.code_tree_model import (
+    CodeTreeModel, COLUMN_COLOR, COLUMN_SEGMENTS, COLUMN_DOCUMENTS
+)
 
 import logging
 logger = logging.getLogger(__name__)
 
 class CodeBrowserWidget(QWidget):
     codes_updated = Signal()
-    code_added = Signal(int)        # new_code_id
-    code_deleted = Signal(int)      # code_id
-    code_edited = Signal(int)       # code_id
-    code_selected = Signal(int)     # code_id
+    code_added = Signal(str)        # new_code_id
+    code_deleted = Signal(str)      # code_id
+    code_edited = Signal(str)       # code_id
+    code_selected = Signal(str)     # code_id
 
     def __init__(self, repo: ProjectRepository, parent=None):
         super().__init__(parent)
         self.repo = repo
+        self.model = CodeTreeModel.for_repository(repo)
         self.init_ui()
-        self.refresh()
         self.tree.codeSelected.connect(self._on_code_selected)
 
     def init_ui(self):
         layout = QVBoxLayout(self)
 
-        self.tree = CodeTreeWidget()
-        self.tree.setHeaderLabels(["Code", "Color"])
-        self.tree.setColumnCount(2)
-        self.tree.setColumnWidth(1, 40)  # narrow color column
+        self.tree = CodeTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setColumnHidden(COLUMN_SEGMENTS, True)
+        self.tree.setColumnHidden(COLUMN_DOCUMENTS, True)
+        self.tree.setColumnWidth(COLUMN_COLOR, 40)  # narrow color column
+        self.tree.expandAll()
         layout.addWidget(self.tree)
 
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -41,7 +46,7 @@ class CodeBrowserWidget(QWidget):
         add_button.clicked.connect(self.add_code_dialog)
         layout.addWidget(add_button)
 
-    def _on_code_selected(self, code_id: int):
+    def _on_code_selected(self, code_id: str):
         self.code_selected.emit(code_id)
 
     # --- DB helpers ---
@@ -49,7 +54,7 @@ class CodeBrowserWidget(QWidget):
         """
         Edit extant code attributes.
         """
-        updated = self.repo.update_code(
+        updated = self.model.update_code(
             code_id=code_id,
             label=label,
             parent_id=parent_id,
@@ -74,51 +79,17 @@ class CodeBrowserWidget(QWidget):
 
     def add_code(self, label, parent_id=None, description="", color=""):
         """
-        Insert a new code into the database.
+        Insert a new code into the database; the shared model adds its row.
         """
-        return self.repo.add_code(label=label, parent_id=parent_id, description=description, color=color)
+        return self.model.add_code(label=label, parent_id=parent_id, description=description, color=color)
 
     # --- Tree population ---
     def refresh(self):
         """
-        Refresh the tree widget from DB contents.
-        Builds a parent/child hierarchy based on parent_id.
+        Rebuild the shared code model from DB contents. Edits made through
+        this widget update single rows and do not need this.
         """
-        self.tree.clear()
-
-        codes = self.list_codes()
-        if not codes:
-            return
-
-        # Map id -> QTreeWidgetItem
-        items_by_id = {}
-
-        # First create items for all codes
-        for code in codes:
-            # two columns: label, color swatch
-            item = QTreeWidgetItem([code["label"], ""])
-            item.setData(0, Qt.UserRole, code["id"])
-            items_by_id[code["id"]] = item
-
-            color = code["color"]
-            if color:
-                qcolor = QColor(color)
-                if qcolor.isValid():
-                    # only color the second column’s background
-                    item.setBackground(1, qcolor)
-
-        # Attach them according to parent_id
-        for code in codes:
-            item = items_by_id[code["id"]]
-            parent_id = code["parent_id"]
-
-            if parent_id and parent_id in items_by_id:
-                # Add as child of its parent
-                items_by_id[parent_id].addChild(item)
-            else:
-                # No parent: top-level code
-                self.tree.addTopLevelItem(item)
-
+        self.model.reload()
         self.tree.expandAll()
 
     # --- UI actions ---
@@ -143,7 +114,8 @@ class CodeBrowserWidget(QWidget):
             color=data["color"],
         )
 
-        self.refresh()
+        # Show the new code even when it lands under a collapsed parent
+        self.tree.scrollTo(self.model.index_for_code(new_id))
         self.code_added.emit(new_id)
         self.codes_updated.emit()
 
@@ -154,11 +126,11 @@ class CodeBrowserWidget(QWidget):
 
         menu = QMenu(self)
 
-        item = self.tree.itemAt(pos)
-        if item is None:
+        index = self.tree.indexAt(pos)
+        if not index.isValid():
             return  # right-click on empty area
 
-        code_id = item.data(0, Qt.UserRole)  # or wherever you stored it
+        code_id = self.model.code_id(index)
 
         edit = menu.addAction("Edit Code…")
         edit.triggered.connect(lambda: self._on_edit_code_requested(code_id))
@@ -169,15 +141,13 @@ class CodeBrowserWidget(QWidget):
         global_pos = self.tree.viewport().mapToGlobal(pos)
         menu.exec(global_pos)
 
-    def _on_delete_code_requested(self, code_id: int):
+    def _on_delete_code_requested(self, code_id: str):
         """
         Send delete request to ProjectRepository
         """
-        self.repo.delete_code(code_id)
-        print(f"deleted code ID == {code_id}")
+        self.model.delete_code(code_id)
+        logger.info("Deleted code code_id=%s", code_id)
 
-        self.repo.delete_code(code_id)
-        self.refresh()
         self.code_deleted.emit(code_id)
         self.codes_updated.emit()
     
@@ -205,7 +175,6 @@ class CodeBrowserWidget(QWidget):
             color=data["color"],
         )
 
-        self.refresh()
         self.code_edited.emit(code_id)
         self.codes_updated.emit()
 
@@ -294,24 +263,29 @@ class CodeDialog(QDialog):
             "color": color,
         }
 
-class CodeTreeWidget(QTreeWidget):
-    codeSelected = Signal(int)  # code_id
+class CodeTreeView(QTreeView):
+    codeSelected = Signal(str)  # code_id
 
     def __init__(self, parent=None):
         super().__init__(parent)
+
+    def setModel(self, model):
+        super().setModel(model)
         # Whenever the selection changes, fire our own signal
-        self.itemSelectionChanged.connect(self._emit_code_selected)
+        self.selectionModel().currentChanged.connect(self._emit_code_selected)
+        # New child codes appear under an expanded parent
+        model.rowsInserted.connect(self._expand_parent)
 
     def mousePressEvent(self, event):
-        item = self.itemAt(event.pos())
-        if item is None:
+        if not self.indexAt(event.pos()).isValid():
             self.clearSelection()
         super().mousePressEvent(event)
 
-    def _emit_code_selected(self):
-        item = self.currentItem()
-        if not item:
-            return
-        code_id = item.data(0, Qt.UserRole)
+    def _expand_parent(self, parent, first, last):
+        if parent.isValid():
+            self.expand(parent)
+
+    def _emit_code_selected(self, current, previous):
+        code_id = self.model().code_id(current)
         if code_id is not None:
             self.codeSelected.emit(code_id)
\ No newline at end of file
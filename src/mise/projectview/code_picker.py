@@ -1,7 +1,9 @@
 from PySide6.QtWidgets import (
-    QDialog, QVBoxLayout, QDialogButtonBox, QTreeWidget, QTreeWidgetItem
+    QDialog, QVBoxLayout, QDialogButtonBox, QTreeView
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QSortFilterProxyModel
+
+from ..ui.code_tree_model import CodeTreeModel, CODE_ID_ROLE, COLUMN_LABEL, HEADERS
 
 import logging
 logger = logging.getLogger(__name__)
@@ -9,19 +11,27 @@ logger = logging.getLogger(__name__)
 class CodePickerDialog(QDialog):
     """
     Dialog for choosing an existing code to assign to a text selection.
-    Reads codes from the `codes` table via the given DB connection.
+    Shows the project's shared CodeTreeModel, sorted by label.
     """
-    def __init__(self, conn, parent=None):
+    def __init__(self, repo, parent=None):
         super().__init__(parent)
-        self.conn = conn
-        self._selected_code_id = None
+        self.repo = repo
 
         self.setWindowTitle("Assign Code")
 
         layout = QVBoxLayout(self)
 
-        self.tree = QTreeWidget()
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(CodeTreeModel.for_repository(repo))
+        self.proxy.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.sort(COLUMN_LABEL, Qt.AscendingOrder)
+
+        self.tree = QTreeView()
+        self.tree.setModel(self.proxy)
         self.tree.setHeaderHidden(True)  # just show labels
+        for column in range(1, len(HEADERS)):
+            self.tree.setColumnHidden(column, True)
+        self.tree.expandAll()
         layout.addWidget(self.tree)
 
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
@@ -29,43 +39,8 @@ class CodePickerDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
-        self.populate_codes()
-
-    def list_codes(self):
-        cur = self.conn.execute(
-            "SELECT id, label, parent_id, color FROM codes ORDER BY label COLLATE NOCASE"
-        )
-        cols = [c[0] for c in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
-
-    def populate_codes(self):
-        self.tree.clear()
-
-        codes = self.list_codes()
-        if not codes:
-            return
-
-        items_by_id = {}
-
-        # Create items
-        for code in codes:
-            item = QTreeWidgetItem([code["label"]])
-            item.setData(0, Qt.UserRole, code["id"])
-            items_by_id[code["id"]] = item
-
-        # Wire parent/child
-        for code in codes:
-            item = items_by_id[code["id"]]
-            parent_id = code["parent_id"]
-            if parent_id and parent_id in items_by_id:
-                items_by_id[parent_id].addChild(item)
-            else:
-                self.tree.addTopLevelItem(item)
-
-        self.tree.expandAll()
-
     def get_code_id(self):
-        item = self.tree.currentItem()
-        if not item:
+        index = self.tree.currentIndex()
+        if not index.isValid():
             return None
-        return item.data(0, Qt.UserRole)
\ No newline at end of file
+        return index.data(CODE_ID_ROLE)
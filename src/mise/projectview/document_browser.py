@@ -3,24 +3,25 @@ logger = logging.getLogger(__name__)
 from pathlib import Path
 
 from PySide6.QtWidgets import (
-    QVBoxLayout, QWidget, QListWidget,
-    QPushButton, QListWidgetItem, QFileDialog,
-    QMessageBox, QMenu, QInputDialog
+    QVBoxLayout, QWidget, QTreeView, QLineEdit,
+    QPushButton, QFileDialog, QHeaderView,
+    QMessageBox, QMenu, QInputDialog, QProgressDialog
 )
-from PySide6.QtGui import (
-    QIcon)
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QSortFilterProxyModel
 
-from ..utils.import_service import import_files
-from ..utils.paths import asset_path
-
-# for cursor info
-DOC_ID_ROLE = Qt.UserRole + 1
-PATH_ROLE = Qt.UserRole + 2
+from .import_worker import ImportWorker
+from .document_list_model import (
+    DocumentListModel, COLUMN_NAME, COLUMN_SEGMENTS, COLUMN_IMPORTED, SORT_ROLE,
+)
+from ..utils.text_store import index_path_for
+from ..utils.repository_events import DocumentTextChanged
 
 class DocumentBrowserWidget(QWidget):
-    document_activated = Signal(object)  # path
-    folder_activated = Signal(str)       # path
+    """
+    The project's documents, listed from the database with a filter box.
+    Columns sort on header click.
+    """
+    document_activated = Signal(int)       # doc_id
 
     document_deleted = Signal(int, str)    # doc_id, text_path
     document_renamed = Signal(int, str)    # doc_id, new_name
@@ -35,12 +36,37 @@ class DocumentBrowserWidget(QWidget):
         self.project_root = project_root
 
         # State
-        self.current_path = self.texts_dir
+        self._import_worker = None
+        self._import_progress = None
 
         layout = QVBoxLayout(self)
 
-        self.file_list = QListWidget()
-        self.populate_file_list(self.current_path)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter documents")
+        self.filter_edit.setClearButtonEnabled(True)
+        layout.addWidget(self.filter_edit)
+
+        self.model = DocumentListModel(self.repo, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(SORT_ROLE)
+        self.proxy.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.setSortLocaleAware(True)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.setFilterKeyColumn(COLUMN_NAME)
+        self.filter_edit.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.file_list = QTreeView()
+        self.file_list.setModel(self.proxy)
+        self.file_list.setRootIsDecorated(False)
+        self.file_list.setUniformRowHeights(True)
+        self.file_list.setSortingEnabled(True)
+        self.file_list.sortByColumn(COLUMN_NAME, Qt.AscendingOrder)
+        header = self.file_list.header()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(COLUMN_NAME, QHeaderView.Stretch)
+        header.setSectionResizeMode(COLUMN_SEGMENTS, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(COLUMN_IMPORTED, QHeaderView.ResizeToContents)
         layout.addWidget(self.file_list)
 
         # context menu for file list
@@ -51,96 +77,24 @@ class DocumentBrowserWidget(QWidget):
         self.upload_button.clicked.connect(self.handle_upload_clicked)
         layout.addWidget(self.upload_button)
 
-        self.file_list.itemClicked.connect(self.handle_item_click)
-        
-    def handle_item_click(self, item):
-        """
-        When clicking on items in the file browser emit path str if it is a file
-        Refactor to use doc_id so it is managed by the database? 
-        """
+        self.file_list.clicked.connect(self.handle_item_click)
         
-        path = item.data(PATH_ROLE)
-
-        if not path:
-            return  # Prevent None errors
-
-        path = Path(path)
-        logger.info("Item clicked in DocumentBrowserWidget: %r", path)
-
-		# IF DIRECTORY
-        if path.is_dir():
-            self.current_path = path
-            self.populate_file_list(self.current_path)
-        # OTHERWISE IT IS FILE
-        else:
-            doc_id = self.repo.lookup_document_id(path)
-            
-            if doc_id is None:
-                logger.warning("File not registered in documents: %r", path)
-            else:
-                logger.info("Clicked document: doc_id=%s path=%r", doc_id, path)
-            
-            self.document_activated.emit(path)
-            
-    def populate_file_list(self, directory: Path):
+    def handle_item_click(self, index):
         """
-        Populate the QListWidget with directories and files from the given directory.
+        Emit the id of the clicked document.
         """
-        directory = Path(directory)
-        self.current_path = directory
-
-        self.file_list.clear()
-
-        # Enable or disable the back button based on directory
-        # self.back_button.setEnabled(self.current_path != self.project_root)
-
-        folder_icon = QIcon(asset_path("folder.png"))
-        file_icon = QIcon(asset_path("document.png"))
+        doc_id = self.model.document_id(self.proxy.mapToSource(index))
+        if doc_id is None:
+            return
 
-        try:
-            # Sort: folders first, then files, both alphabetically
-            children = sorted(
-            self.current_path.iterdir(),
-            key=lambda p: (not p.is_dir(), p.name.lower())
-            )
+        logger.info("Clicked document: doc_id=%s", doc_id)
+        self.document_activated.emit(doc_id)
 
-            for child in children:
-                if child.is_dir():
-                    label = child.name
-                    icon = folder_icon
-                    doc_id = None
-                else:
-                    doc = self.repo.get_document_by_text_path(child)
-                    if doc is not None:
-                        label = doc["display_name"]
-                        doc_id = doc["id"]
-                    else:
-                        label = child.name
-                        doc_id = None
-                                                
-                    icon = file_icon
-
-                item = QListWidgetItem(label)
-                item.setIcon(icon)
-                item.setData(PATH_ROLE, str(child))   # always set path
-                item.setData(DOC_ID_ROLE, doc_id)     # None for folders / unregistered
-                self.file_list.addItem(item)
-
-        except Exception as e:
-            logger.error("Error accessing directory %r: %s", self.current_path,  e)
-
-    def go_back(self):
+    def refresh_documents(self):
         """
-        Navigate back to the parent directory, but never above project_root.
+        Re-read the document list from the database (one query).
         """
-        if self.current_path == self.project_root:
-            return  # already at root, nothing to do
-
-        parent = self.current_path.parent
-
-        # Only allow going back within the project tree
-        if parent == self.project_root or self.project_root in parent.parents:
-            self.populate_file_list(parent)
+        self.model.reload()
 
     def handle_upload_clicked(self):
         dialog_filter = (
@@ -157,30 +111,82 @@ class DocumentBrowserWidget(QWidget):
             return  # user cancelled
 
         src_paths = [Path(src) for src in file_paths]
-        imported_any, errors = import_files(src_paths, self.texts_dir, self.repo)
-
-        if imported_any:
-            self.populate_file_list(self.texts_dir)
+        self.start_import(src_paths)
 
-        if errors:
+    def start_import(self, src_paths: list[Path]):
+        """
+        Import documents in the background, showing a cancellable progress
+        dialog. The GUI stays responsive while files are converted.
+        """
+        if self._import_worker is not None:
+            return  # one import at a time
+
+        worker = ImportWorker(src_paths, self.texts_dir, self.repo.db_path)
+        worker.progress_changed.connect(self._on_import_progress)
+        worker.changes_committed.connect(self._on_import_changes)
+        worker.import_finished.connect(self._on_import_finished)
+
+        progress = QProgressDialog("Importing documents…", "Cancel", 0, len(src_paths), self)
+        progress.setWindowTitle("Import")
+        progress.setMinimumDuration(0)
+        # worker lives on another thread; call cancel() directly, not queued
+        progress.canceled.connect(lambda: worker.cancel())
+
+        self._import_worker = worker
+        self._import_progress = progress
+        self.upload_button.setEnabled(False)
+        worker.start()
+
+    def _on_import_progress(self, files_done: int, files_total: int, file_name: str):
+        if self._import_progress is not None:
+            self._import_progress.setLabelText(f"Imported {file_name} ({files_done}/{files_total})")
+            self._import_progress.setValue(files_done)
+
+    def _on_import_changes(self, events: list):
+        """
+        Republish what the worker's connection committed, so every view of
+        this repository picks up the new and refreshed documents.
+        """
+        for event in events:
+            if isinstance(event, DocumentTextChanged):
+                # The text was replaced on disk behind this connection's cache
+                self.repo.text_service.invalidate(event.document_id)
+            self.repo.events.publish(event)
+
+    def _on_import_finished(self, summary: dict):
+        if self._import_progress is not None:
+            self._import_progress.close()
+        self._import_progress = None
+        self._import_worker = None
+        self.upload_button.setEnabled(True)
+
+
+        notes = []
+        if summary["skipped"]:
+            notes.append(f"{len(summary['skipped'])} already imported, skipped:\n" + "\n".join(summary["skipped"]))
+        if summary["linked"]:
+            notes.append(f"{len(summary['linked'])} identical to an existing document, not duplicated:\n" + "\n".join(summary["linked"]))
+        if summary["refreshed"]:
+            notes.append(f"{len(summary['refreshed'])} changed, text updated:\n" + "\n".join(summary["refreshed"]))
+
+        if summary["errors"]:
             QMessageBox.warning(
                 self,
                 "Import issues",
-                "Some files could not be imported:\n\n" + "\n".join(errors),
+                "\n\n".join(["Some files could not be imported:", "\n".join(summary["errors"])] + notes),
             )
+        elif notes:
+            QMessageBox.information(self, "Import", "\n\n".join(notes))
 
     def open_file_context_menu(self, pos):
         """
         File list context menu for deleting and renaming files.
         """
-            # pos is in file_list's coordinate system
-        item = self.file_list.itemAt(pos)
-        if item is None:
-            return  # right-clicked on empty space, ignore or show generic menu
-        
-        doc_id = item.data(DOC_ID_ROLE)
+        # pos is in file_list's viewport coordinate system
+        index = self.file_list.indexAt(pos)
+        doc_id = self.model.document_id(self.proxy.mapToSource(index))
         if doc_id is None:
-            return  # not a registered document
+            return  # right-clicked on empty space
 
         menu = QMenu(self)
 
@@ -189,18 +195,18 @@ class DocumentBrowserWidget(QWidget):
         rename_action = menu.addAction("Rename")
         remove_action = menu.addAction("Remove from project")
         
-        action = menu.exec(self.file_list.mapToGlobal(pos))
+        action = menu.exec(self.file_list.viewport().mapToGlobal(pos))
 
         if action == open_action:
             # stub
             self.memo_view_requested.emit(doc_id)
         elif action == rename_action:
-            self.rename_document(item, doc_id)
+            self.rename_document(index, doc_id)
         elif action == remove_action:
-            self.delete_document_from_ui(item, doc_id)
+            self.delete_document_from_ui(doc_id)
 
-    def rename_document(self, item: QListWidgetItem, doc_id: int):
-        current_name = item.text()
+    def rename_document(self, index, doc_id: int):
+        current_name = index.siblingAtColumn(COLUMN_NAME).data()
 
         new_name, ok = QInputDialog.getText(
             self,
@@ -215,29 +221,25 @@ class DocumentBrowserWidget(QWidget):
         if not new_name or new_name == current_name:
             return
 
-        rows = self.repo.rename_document_db(new_name, doc_id)
+        rows = self.model.rename_document(doc_id, new_name)
         if rows:
-            item.setText(new_name)
             self.document_renamed.emit(doc_id, new_name)
 
-    def delete_document_from_ui(self, item, doc_id: int):
-        rows, text_path = self.repo.delete_document(doc_id)
+    def delete_document_from_ui(self, doc_id: int):
+        rows, text_path = self.model.delete_document(doc_id)
         logger.info("Repo deleted %s document(s) for id=%s, path=%r", rows, doc_id, text_path)
 
         if rows:
-            # 1) Remove file from disk
+            # Remove file from disk
             if text_path:
                 try:
                     Path(text_path).unlink(missing_ok=True)
+                    index_path_for(text_path).unlink(missing_ok=True)
                 except Exception as e:
                     logger.warning("Failed to delete file %r: %s", text_path, e)
 
-            # 2) Remove the item from the list
-            row_index = self.file_list.row(item)
-            self.file_list.takeItem(row_index)
-
             # Emit signal that document deleted
             self.document_deleted.emit(doc_id, text_path or "")
 
         else:
-            logger.warning("No document deleted for id=%s", doc_id)
\ No newline at end of file
+            logger.warning("No document deleted for id=%s", doc_id)
@@ -0,0 +1,170 @@
+# src/mise/projectview/document_list_model.py
+
+import logging
+logger = logging.getLogger(__name__)
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QIcon
+
+from ..utils.paths import asset_path
+from ..utils.repository_events import (
+    CodeDeleted, DocumentDeleted, DocumentRenamed, DocumentsAdded, SegmentsAdded, SegmentsRemoved,
+)
+
+# custom roles
+DOC_ID_ROLE = Qt.UserRole + 1
+# Raw value to sort a column by (the Imported column displays only the date)
+SORT_ROLE = Qt.UserRole + 2
+
+COLUMN_NAME = 0
+COLUMN_SEGMENTS = 1
+COLUMN_IMPORTED = 2
+
+HEADERS = ["Document", "Segments", "Imported"]
+
+class DocumentListModel(QAbstractTableModel):
+    """
+    The project's documents, read from the database with one query.
+
+    Follows the repository's change events: a rename, deletion or coding
+    action updates or removes just the affected rows. Sorting and filtering
+    are left to a QSortFilterProxyModel in the view.
+    """
+    def __init__(self, repo, parent=None):
+        super().__init__(parent)
+        self.repo = repo
+        self._rows: list[dict] = []
+        # document id -> row in _rows, for the per-document event handlers
+        self._row_by_id: dict[int, int] = {}
+        self._icon = QIcon(asset_path("document.png"))
+        self.reload()
+
+        repo.events.subscribe(self._on_segments_changed, SegmentsAdded, SegmentsRemoved)
+        repo.events.subscribe(self._on_bulk_change, DocumentsAdded, CodeDeleted)
+        repo.events.subscribe(self._on_document_renamed, DocumentRenamed)
+        repo.events.subscribe(self._on_document_deleted, DocumentDeleted)
+
+    # ---- loading -------------------------------------------------------
+    def reload(self) -> None:
+        """Re-read every document, e.g. after an import."""
+        self.beginResetModel()
+        self._rows = self.repo.list_documents()
+        self._row_by_id = {}
+        self._index_rows()
+        self.endResetModel()
+        logger.debug("DocumentListModel: loaded %d documents", len(self._rows))
+
+    def refresh_document(self, document_id: int) -> None:
+        """Re-read one document's row, e.g. after its segments changed."""
+        row = self._row_of(document_id)
+        if row is None:
+            return
+        listing = self.repo.list_documents(document_id)
+        if not listing:
+            return
+        self._rows[row] = listing[0]
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(HEADERS) - 1))
+
+    # ---- edits -----------------------------------------------------------
+    # Rows change in the event handlers below, once the write is committed
+    def rename_document(self, document_id: int, new_name: str) -> int:
+        """
+        Rename a document in the database.
+
+        :return: Rows changed in the database
+        :rtype: int
+        """
+        return self.repo.rename_document_db(new_name, document_id)
+
+    def delete_document(self, document_id: int) -> tuple[int, str | None]:
+        """
+        Delete a document (and its segments) from the database. The text
+        file is left to the caller.
+
+        :return: (rows deleted, text path) as from repo.delete_document
+        :rtype: tuple[int, str | None]
+        """
+        return self.repo.delete_document(document_id)
+
+    # ---- repository events -------------------------------------------------
+    def _on_segments_changed(self, event) -> None:
+        for document_id in event.document_ids:
+            self.refresh_document(document_id)
+
+    def _on_bulk_change(self, event) -> None:
+        # Bulk changes (an import batch, or a code's segments in any number
+        # of documents) are cheaper as the single listing query
+        self.reload()
+
+    def _on_document_renamed(self, event: DocumentRenamed) -> None:
+        row = self._row_of(event.document_id)
+        if row is not None:
+            self._rows[row]["display_name"] = event.display_name
+            self.dataChanged.emit(self.index(row, COLUMN_NAME), self.index(row, COLUMN_NAME))
+
+    def _on_document_deleted(self, event: DocumentDeleted) -> None:
+        row = self._row_of(event.document_id)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            del self._row_by_id[event.document_id]
+            self._index_rows(row)
+            self.endRemoveRows()
+
+    # ---- lookups ---------------------------------------------------------
+    def document_id(self, index: QModelIndex):
+        """Document id at index, or None for an invalid index."""
+        if not index.isValid():
+            return None
+        return self._rows[index.row()]["id"]
+
+    def _row_of(self, document_id: int) -> int | None:
+        return self._row_by_id.get(document_id)
+
+    def _index_rows(self, start: int = 0) -> None:
+        """Record the row of every document from row start on."""
+        for row in range(start, len(self._rows)):
+            self._row_by_id[self._rows[row]["id"]] = row
+
+    # ---- QAbstractTableModel ---------------------------------------------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        listing = self._rows[index.row()]
+        column = index.column()
+
+        if role == DOC_ID_ROLE:
+            return listing["id"]
+
+        if role in (Qt.DisplayRole, SORT_ROLE):
+            if column == COLUMN_NAME:
+                return listing["display_name"]
+            if column == COLUMN_SEGMENTS:
+                return listing["segment_count"]
+            if column == COLUMN_IMPORTED:
+                created_at = listing["created_at"] or ""
+                # "YYYY-MM-DD HH:MM:SS" sorts correctly as text
+                return created_at if role == SORT_ROLE else created_at[:10]
+            return None
+
+        if column == COLUMN_NAME:
+            if role == Qt.DecorationRole:
+                return self._icon
+            if role == Qt.ToolTipRole and listing["original_filename"] != listing["display_name"]:
+                return listing["original_filename"]
+
+        if column == COLUMN_SEGMENTS and role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(HEADERS):
+            return HEADERS[section]
+        return None
@@ -4,16 +4,14 @@ from pathlib import Path
 
 from PySide6.QtWidgets import (
     QVBoxLayout, QWidget,
-    QTextBrowser, QDialog
+    QDialog
 )
 
-from PySide6.QtGui import (
-    QTextCursor, QTextCharFormat, 
-    QColor, QFont)
-
 from PySide6.QtCore import Qt
 
 from ..utils.project_repository import ProjectRepository
+from ..utils.repository_events import DocumentDeleted
+from ..ui.windowed_text_view import WindowedTextView
 from .code_picker import CodePickerDialog
 from ..ui import theme
 
@@ -31,17 +29,22 @@ class DocumentViewerWidget(QWidget):
         # UI
         layout = QVBoxLayout(self)
 
-        self.document_viewer = QTextBrowser()
+        # Large documents are loaded a window at a time
+        self.document_viewer = WindowedTextView(self.repo)
         self.document_viewer.setFont(theme.serif_font)
-        self.document_viewer.setText("Select a document to view its content.")
+        self.document_viewer.show_text("Select a document to view its content.")
         layout.addWidget(self.document_viewer)
 
+        self.highlighter = self.document_viewer.highlighter
+
         # context menu for document viewer
         self.document_viewer.setContextMenuPolicy(Qt.CustomContextMenu)
         self.document_viewer.customContextMenuRequested.connect(
             self.open_text_context_menu
         )
 
+        self.repo.events.subscribe(self._on_document_deleted, DocumentDeleted)
+
     # UI Methods ------------------------------------------------------------
     def set_content_font_size(self, size_pt: int):
         font = self.document_viewer.font()
@@ -55,9 +58,24 @@ class DocumentViewerWidget(QWidget):
         try:
             # Use Path’s own API, not bare open(path, "r")
             content = path.read_text(encoding="utf-8")
-            self.document_viewer.setPlainText(content)
+            self.document_viewer.show_text(content)
+        except Exception as e:
+            self.document_viewer.show_text(f"Error reading file {path}: {e}")
+
+    def show_document(self, document_id: int):
+        """
+        Display a registered document and its highlights. Text comes from the
+        repository's shared text service, a window at a time for large
+        documents.
+        """
+        try:
+            self.document_viewer.show_document(document_id)
         except Exception as e:
-            self.document_viewer.setPlainText(f"Error reading file {path}: {e}")
+            # Nothing to code against, so no stale id for the context menu
+            self.current_document_id = None
+            self.document_viewer.show_text(f"Error reading document {document_id}: {e}")
+        else:
+            self.current_document_id = document_id
         
     def open_text_context_menu(self, pos):
         """
@@ -65,18 +83,22 @@ class DocumentViewerWidget(QWidget):
         right click in document viewer.
         """
         cursor = self.document_viewer.cursorForPosition(pos)
-        char_pos = cursor.position()
+        char_pos = self.document_viewer.to_offset(cursor.position())
 
-        segment = self.repo.get_segment_at_position(self.current_document_id, char_pos)
+        segments = []
+        if self.current_document_id is not None:
+            segments = self.repo.segments_at(self.current_document_id, char_pos)
 
         menu = self.document_viewer.createStandardContextMenu()
 
-        if segment is not None:
-            segment_id = segment["id"]
+        if segments:
             menu.addSeparator()
-            delete = menu.addAction("Delete Highlight")
+        # Overlapping segments each get their own delete action
+        for segment in segments:
+            label = segment["code_label"] or "Highlight"
+            delete = menu.addAction(f"Delete Highlight: {label}" if len(segments) > 1 else "Delete Highlight")
             delete.triggered.connect(
-                lambda _checked=False, seg_id=segment_id: self.delete_segment_and_refresh(seg_id)
+                lambda _checked=False, seg=segment: self.delete_segment_and_refresh(seg)
             )
 
         cursor = self.document_viewer.textCursor()
@@ -92,12 +114,15 @@ class DocumentViewerWidget(QWidget):
         Clear the viewer and reset current_document_id.
         """
         self.current_document_id = None
-        self.document_viewer.clear()
-        self.document_viewer.setText("Select a document to view its content.")
+        self.document_viewer.show_text("Select a document to view its content.")
+
+    def _on_document_deleted(self, event: DocumentDeleted):
+        if event.document_id == self.current_document_id:
+            self.clear_document()
 
-    def delete_segment_and_refresh(self, segment_id):
-        self.repo.delete_segment(segment_id)
-        self.refresh_highlights()
+    def delete_segment_and_refresh(self, segment):
+        # The view repaints the segment's range when the repository reports the removal
+        self.repo.delete_segment(segment["id"])
         
     def assign_code_to_selection(self):
         """
@@ -111,7 +136,7 @@ class DocumentViewerWidget(QWidget):
         if not cursor.hasSelection():
             return
 
-        dialog = CodePickerDialog(self.repo.connection, self)
+        dialog = CodePickerDialog(self.repo, self)
         if dialog.exec() != QDialog.Accepted:
             return
 
@@ -120,8 +145,8 @@ class DocumentViewerWidget(QWidget):
         if code_id is None:
             return
 
-        start = cursor.selectionStart()
-        end = cursor.selectionEnd()
+        start = self.document_viewer.to_offset(cursor.selectionStart())
+        end = self.document_viewer.to_offset(cursor.selectionEnd())
 
         self.repo.add_coded_segment(
             document_id=self.current_document_id,
@@ -131,34 +156,6 @@ class DocumentViewerWidget(QWidget):
             memo=None,  # or hook up a memo dialog later
         )
 
-        self.refresh_highlights()
-
     def refresh_highlights(self):
-        if self.current_document_id is None:
-            return
-
-        cursor = self.document_viewer.textCursor()
-        cursor.select(QTextCursor.Document)
-        default_format = QTextCharFormat()
-        cursor.setCharFormat(default_format)
-
-        rows = self.repo.get_coded_segments(self.current_document_id)
-        logger.debug("refresh_highlights: found %d segments", len(rows))
-
-        for seg in rows:
-            fmt = QTextCharFormat()
-
-            # use the code color if present, otherwise a default
-            code_color = seg["code_color"]
-            if code_color:
-                qcolor = QColor(code_color)
-                if qcolor.isValid():
-                    fmt.setBackground(qcolor)
-                else:
-                    fmt.setBackground(QColor("yellow"))
-            else:
-                fmt.setBackground(QColor("yellow"))
-
-            cursor.setPosition(seg["start_offset"])
-            cursor.setPosition(seg["end_offset"], QTextCursor.KeepAnchor)
-            cursor.setCharFormat(fmt)
\ No newline at end of file
+        """Re-render every highlight, e.g. after code colours changed."""
+        self.highlighter.refresh()
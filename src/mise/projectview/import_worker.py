@@ -0,0 +1,81 @@
+import threading
+from pathlib import Path
+import logging
+logger = logging.getLogger(__name__)
+
+from PySide6.QtCore import QThread, Signal
+
+from ..utils.import_service import import_files, new_import_summary
+from ..utils.project_repository import ProjectRepository
+
+# Workers that are still running, kept alive independently of the widget
+# that started them (which may be destroyed by a view switch mid-import)
+_ACTIVE_WORKERS = set()
+
+class ImportWorker(QThread):
+    """
+    Runs import_files off the GUI thread. Conversion fans out to a process
+    pool while this thread writes texts and registers them in batches through
+    its own ProjectRepository connection.
+
+    Usage:
+    worker = ImportWorker(src_paths, texts_dir, repo.db_path)
+    worker.import_finished.connect(...)
+    worker.start()
+
+    The worker object lives on the GUI thread, so its signals reach GUI
+    slots through queued connections and cancel() can be called directly.
+    Change events committed on the worker's connection are handed over in
+    changes_committed, just before import_finished, for the GUI to republish
+    on its own repository.
+    """
+    progress_changed = Signal(int, int, str)   # files_done, files_total, file_name
+    file_failed = Signal(str, str)             # file_name, message
+    changes_committed = Signal(list)           # repository_events published by the import
+    import_finished = Signal(dict)             # summary, see import_service.new_import_summary
+
+    def __init__(self, src_paths: list[Path], texts_dir: Path, db_path: Path, refresh: bool = False, parent=None):
+        super().__init__(parent)
+        self.src_paths = list(src_paths)
+        self.refresh = refresh
+        self.texts_dir = Path(texts_dir)
+        self.db_path = Path(db_path)
+        self._cancel_event = threading.Event()
+
+        _ACTIVE_WORKERS.add(self)
+        self.finished.connect(self._on_finished)
+
+    def cancel(self):
+        """Request cancellation; files already converted are still registered."""
+        self._cancel_event.set()
+
+    def run(self):
+        summary = new_import_summary()
+        events = []
+        repo = None
+        try:
+            # sqlite connections are bound to the thread that opened them
+            repo = ProjectRepository(self.db_path, self.texts_dir)
+            repo.events.subscribe(events.append)
+            summary = import_files(
+                self.src_paths,
+                self.texts_dir,
+                repo,
+                max_workers=None,
+                refresh=self.refresh,
+                on_progress=self.progress_changed.emit,
+                on_error=self.file_failed.emit,
+                is_cancelled=self._cancel_event.is_set,
+            )
+        except Exception as e:
+            logger.exception("ImportWorker: import failed")
+            summary["errors"].append(str(e))
+        finally:
+            if repo is not None:
+                repo.close()
+            self.changes_committed.emit(events)
+            self.import_finished.emit(summary)
+
+    def _on_finished(self):
+        _ACTIVE_WORKERS.discard(self)
+        self.deleteLater()
@@ -64,7 +64,6 @@ class ProjectView(QWidget):
         self.file_browser_widget.document_deleted.connect(self.on_document_deleted)
         self.file_browser_widget.document_renamed.connect(self.on_document_renamed)
         self.file_browser_widget.memo_view_requested.connect(self.open_memo_view_for_document)
-        self.code_browser_widget.codes_updated.connect(self.file_viewer_widget.refresh_highlights)
         # self.code_browser_widget.code_deleted.connect(self.on_code_deleted)
 
     # UI Methods ----------------------------------------
@@ -85,31 +84,7 @@ class ProjectView(QWidget):
             self.setWindowTitle(f"Mise — {new_name}")
             logger.info("Renamed active document_id=%s to %r", doc_id, new_name)
         
-    def on_document_activated(self, path: Path):
-        # Ensure we always work with Path inside
-        abs_path = self._resolve_text_path(path)
-
-        # Look up document id for this path
-        doc_id = self.repo.lookup_document_id(abs_path)
-        if doc_id is None:
-            logger.warning("No document id for path %r", abs_path)
-        else:
-            logger.info("Activated document_id=%s for %r", doc_id, abs_path)
-
-        # Push state into the viewer
-        self.file_viewer_widget.current_document_id = doc_id
-
+    def on_document_activated(self, doc_id: int):
+        logger.info("Activated document_id=%s", doc_id)
         # Show content and refresh highlights for that doc
-        self.file_viewer_widget.display_file_content(abs_path)
-        self.file_viewer_widget.refresh_highlights()
-
-    def _resolve_text_path(self, path: Path | str) -> Path:
-        """
-        Normalize a path coming from the UI / signals into an absolute path
-        under this project's texts_dir.
-        """
-        p = Path(path)
-        if p.is_absolute():
-            return p
-        # treat it as a DB-style relative path under texts_dir
-        return (self.texts_dir / p).resolve()
\ No newline at end of file
+        self.file_viewer_widget.show_document(doc_id)
@@ -0,0 +1,361 @@
+"""
+Shared item model over the code hierarchy.
+
+Every view of the codebook (the project view's code browser, the analysis
+view's code stats tree and the code picker dialog) shows the same
+CodeTreeModel, obtained with CodeTreeModel.for_repository(repo). The model
+follows the repository's change events and inserts, moves, removes or
+updates only the affected rows, so views keep their expansion and selection,
+a change to one code touches one row, and usage counts follow coding done
+anywhere in the application.
+"""
+from __future__ import annotations
+
+import weakref
+from bisect import bisect_left
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PySide6.QtGui import QColor
+
+from ..utils.repository_events import (
+    CodeAdded, CodeDeleted, CodeUpdated, DocumentDeleted, SegmentsAdded, SegmentsRemoved,
+)
+
+import logging
+logger = logging.getLogger(__name__)
+
+CODE_ID_ROLE = Qt.UserRole
+
+COLUMN_LABEL = 0
+COLUMN_COLOR = 1
+COLUMN_SEGMENTS = 2
+COLUMN_DOCUMENTS = 3
+
+HEADERS = ["Code", "Color", "Times Used", "Documents Used In"]
+
+class _CodeNode:
+    __slots__ = (
+        "code_id", "label", "parent_id", "description", "color", "sort_order",
+        "segment_count", "document_count", "parent", "children", "row",
+    )
+
+    def __init__(self, code_id=None):
+        self.code_id = code_id
+        self.label = ""
+        self.parent_id = None
+        self.description = ""
+        self.color = None
+        self.sort_order = 0
+        self.segment_count = 0
+        self.document_count = 0
+        self.parent = None
+        self.children = []
+        # Position among parent.children, kept current on every change
+        self.row = 0
+
+    def update(self, row) -> None:
+        self.label = row["label"]
+        self.parent_id = row["parent_id"]
+        self.description = row["description"] or ""
+        self.color = row["color"]
+        self.sort_order = row["sort_order"] or 0
+
+    def sort_key(self):
+        return (self.sort_order, self.label)
+
+class CodeTreeModel(QAbstractItemModel):
+    """
+    Tree of codes (label, colour swatch, usage counts) for one repository.
+
+    Use for_repository(repo) rather than the constructor so every view of a
+    project shares one instance. Codes whose parent no longer exists are shown
+    at the top level. Siblings are ordered by (sort_order, label).
+    """
+    _instances: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def __init__(self, repo, parent=None):
+        super().__init__(parent)
+        # A proxy, so the model cached per repository does not keep it alive
+        self.repo = weakref.proxy(repo)
+        self._root = _CodeNode()
+        self._nodes: dict[str, _CodeNode] = {}
+        self.reload()
+
+        repo.events.subscribe(self._on_code_added, CodeAdded)
+        repo.events.subscribe(self._on_code_updated, CodeUpdated)
+        repo.events.subscribe(self._on_code_deleted, CodeDeleted)
+        repo.events.subscribe(self._on_usage_changed, SegmentsAdded, SegmentsRemoved, DocumentDeleted)
+
+    @classmethod
+    def for_repository(cls, repo) -> CodeTreeModel:
+        model = cls._instances.get(repo)
+        if model is None:
+            model = cls(repo)
+            cls._instances[repo] = model
+        return model
+
+    # ---- loading -------------------------------------------------------
+    def reload(self) -> None:
+        """Rebuild the whole tree from the database (project open)."""
+        self.beginResetModel()
+        self._root.children = []
+        self._nodes = {}
+
+        for row in self.repo.list_codes():
+            node = _CodeNode(row["id"])
+            node.update(row)
+            self._nodes[node.code_id] = node
+
+        # list_codes is already in (sort_order, label) order
+        for node in self._nodes.values():
+            parent = self._nodes.get(node.parent_id, self._root)
+            if parent is node:
+                parent = self._root
+            node.parent = parent
+            node.row = len(parent.children)
+            parent.children.append(node)
+
+        self._load_usage()
+        self.endResetModel()
+
+    def refresh_usage(self, code_ids=None) -> None:
+        """
+        Re-read segment and document counts, emitting dataChanged only for
+        codes whose counts changed.
+
+        :param code_ids: Only re-read these codes (default: every code)
+        """
+        changed = self._load_usage(code_ids)
+        for node in changed:
+            self.dataChanged.emit(
+                self.createIndex(node.row, COLUMN_SEGMENTS, node),
+                self.createIndex(node.row, COLUMN_DOCUMENTS, node),
+            )
+
+    def _load_usage(self, code_ids=None) -> list[_CodeNode]:
+        if code_ids is None:
+            usage = {
+                row["id"]: (row["segment_count"], row["document_count"])
+                for row in self.repo.get_code_usage_overview()
+            }
+        else:
+            usage = self.repo.get_code_usage(code_ids)
+
+        changed = []
+        for code_id, counts in usage.items():
+            node = self._nodes.get(code_id)
+            if node is None:
+                continue
+            if counts != (node.segment_count, node.document_count):
+                node.segment_count, node.document_count = counts
+                changed.append(node)
+        return changed
+
+    # ---- edits -----------------------------------------------------------
+    # Rows change in the event handlers below, once the write is committed
+    def add_code(self, label, parent_id=None, description="", color=None) -> str:
+        """Insert a code in the database. Returns its id."""
+        return self.repo.add_code(label=label, parent_id=parent_id, description=description, color=color)
+
+    def update_code(self, code_id, label, parent_id, description, color) -> int:
+        """
+        Update a code in the database.
+
+        :return: Rows changed in the database
+        :rtype: int
+        """
+        return self.repo.update_code(
+            code_id=code_id,
+            label=label,
+            parent_id=parent_id,
+            description=description,
+            color=color,
+        )
+
+    def delete_code(self, code_id) -> None:
+        """Delete a code (and its segments) from the database."""
+        self.repo.delete_code(code_id)
+
+    # ---- repository events -------------------------------------------------
+    def _on_code_added(self, event: CodeAdded) -> None:
+        code_id = event.code_id
+        if code_id in self._nodes:
+            return
+        node = _CodeNode(code_id)
+        node.update(_row_with_id(self.repo.lookup_code(code_id), code_id))
+        self._nodes[code_id] = node
+        self._insert_node(node, self._nodes.get(node.parent_id, self._root))
+
+    def _on_code_updated(self, event: CodeUpdated) -> None:
+        """Move the code's row if its parent changed, otherwise repaint it."""
+        node = self._nodes.get(event.code_id)
+        if node is None:
+            return
+
+        node.update(_row_with_id(self.repo.lookup_code(event.code_id), event.code_id))
+        new_parent = self._nodes.get(node.parent_id, self._root)
+        if new_parent is node:
+            new_parent = self._root
+        if new_parent is not node.parent:
+            self._move_node(node, new_parent)
+        else:
+            self.dataChanged.emit(
+                self.createIndex(node.row, 0, node),
+                self.createIndex(node.row, len(HEADERS) - 1, node),
+            )
+
+    def _on_code_deleted(self, event: CodeDeleted) -> None:
+        """Remove the code's row; its children move to the top level, as after a reload."""
+        node = self._nodes.pop(event.code_id, None)
+        if node is None:
+            return
+
+        for child in list(node.children):
+            self._move_node(child, self._root)
+
+        parent = node.parent
+        self.beginRemoveRows(self._index_for_node(parent), node.row, node.row)
+        del parent.children[node.row]
+        self._renumber(parent, node.row)
+        node.parent = None
+        self.endRemoveRows()
+
+    def _on_usage_changed(self, event) -> None:
+        # A deleted document may have used any code
+        code_ids = None if isinstance(event, DocumentDeleted) else event.code_ids
+        self.refresh_usage(code_ids)
+
+    # ---- lookups ---------------------------------------------------------
+    def index_for_code(self, code_id, column: int = 0) -> QModelIndex:
+        node = self._nodes.get(code_id)
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(node.row, column, node)
+
+    def code_id(self, index: QModelIndex):
+        """Code id at index, or None for an invalid index."""
+        if not index.isValid():
+            return None
+        return index.internalPointer().code_id
+
+    # ---- QAbstractItemModel ------------------------------------------------
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        parent_node = parent.internalPointer() if parent.isValid() else self._root
+        if 0 <= row < len(parent_node.children) and 0 <= column < len(HEADERS):
+            return self.createIndex(row, column, parent_node.children[row])
+        return QModelIndex()
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            if parent.column() != 0:
+                return 0
+            return len(parent.internalPointer().children)
+        return len(self._root.children)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        column = index.column()
+
+        if role == CODE_ID_ROLE:
+            return node.code_id
+
+        if role == Qt.DisplayRole:
+            if column == COLUMN_LABEL:
+                return node.label
+            if column == COLUMN_SEGMENTS:
+                return node.segment_count
+            if column == COLUMN_DOCUMENTS:
+                return node.document_count
+            return None
+
+        if column == COLUMN_COLOR and node.color:
+            if role == Qt.BackgroundRole:
+                color = QColor(node.color)
+                return color if color.isValid() else None
+            if role == Qt.ToolTipRole:
+                return node.color
+
+        if column == COLUMN_LABEL and role == Qt.ToolTipRole and node.description:
+            return node.description
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(HEADERS):
+            return HEADERS[section]
+        return None
+
+    # ---- internal helpers --------------------------------------------------
+    def _index_for_node(self, node: _CodeNode) -> QModelIndex:
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def _insertion_row(self, parent: _CodeNode, node: _CodeNode) -> int:
+        keys = [child.sort_key() for child in parent.children]
+        return bisect_left(keys, node.sort_key())
+
+    def _insert_node(self, node: _CodeNode, parent: _CodeNode) -> None:
+        row = self._insertion_row(parent, node)
+        self.beginInsertRows(self._index_for_node(parent), row, row)
+        node.parent = parent
+        parent.children.insert(row, node)
+        self._renumber(parent, row)
+        self.endInsertRows()
+
+    def _move_node(self, node: _CodeNode, new_parent: _CodeNode) -> None:
+        old_parent = node.parent
+        old_row = node.row
+        siblings = [child for child in new_parent.children if child is not node]
+        keys = [child.sort_key() for child in siblings]
+        new_row = bisect_left(keys, node.sort_key())
+
+        # Qt expects the destination row as it is before the move
+        destination = new_row
+        if new_parent is old_parent and new_row >= old_row:
+            destination = new_row + 1
+        if new_parent is old_parent and destination in (old_row, old_row + 1):
+            return
+
+        if not self.beginMoveRows(
+            self._index_for_node(old_parent), old_row, old_row,
+            self._index_for_node(new_parent), destination,
+        ):
+            logger.warning("CodeTreeModel: refused to move code %s", node.code_id)
+            return
+
+        del old_parent.children[old_row]
+        self._renumber(old_parent, old_row)
+        new_parent.children.insert(new_row, node)
+        node.parent = new_parent
+        self._renumber(new_parent, new_row)
+        self.endMoveRows()
+
+    @staticmethod
+    def _renumber(parent: _CodeNode, start: int) -> None:
+        for row in range(start, len(parent.children)):
+            parent.children[row].row = row
+
+def _row_with_id(row, code_id) -> dict:
+    """lookup_code rows lack the id column; normalize them for _CodeNode.update."""
+    return {
+        "id": code_id,
+        "label": row["label"],
+        "parent_id": row["parent_id"],
+        "description": row["description"],
+        "color": row["color"],
+        "sort_order": row["sort_order"],
+    }
@@ -0,0 +1,217 @@
+"""
+Incremental segment highlighting for the document viewers.
+
+Both viewers used to reset the whole document's character format and
+re-apply a fresh QTextCharFormat per segment after every coding action.
+SegmentHighlighter renders a document's segments once when it is shown and
+afterwards re-renders only the range a segment was added to or removed
+from, asking the repository's R*Tree index which segments overlap it. All
+format writes of one pass happen inside a single edit block.
+
+Overlapping segments are split into disjoint runs (utils.intervals) and each
+run is painted once: a single code shows its colour, stacked codes show the
+average of their colours with a dashed underline. Formats are cached per
+colour combination, and the run list also answers hover tooltips naming
+every code under the pointer.
+
+A text edit may show only a window [start, end) of a large document (see
+ui.windowed_text_view). The highlighter then reads and paints just the
+segments overlapping that window, and translates offsets relative to it.
+"""
+from __future__ import annotations
+
+from html import escape
+
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtGui import QColor, QTextCharFormat, QTextCursor
+from PySide6.QtWidgets import QToolTip
+
+from ..utils.intervals import Run, run_at, splice_runs, split_into_runs
+from ..utils.offset_map import OffsetMap
+
+import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_HIGHLIGHT_COLOR = "yellow"
+
+class SegmentHighlighter(QObject):
+    """
+    Paints coded segments of one document as background colours on a text
+    edit's QTextDocument, and shows the codes under the pointer as a tooltip.
+
+    Usage:
+    highlighter = SegmentHighlighter(viewer, repo)
+    highlighter.set_document(document_id, offset_map)   # after setPlainText
+    highlighter.set_document(document_id, window_map, start, end)  # a window only
+    highlighter.refresh_range(start, end)               # after add/delete
+    highlighter.refresh()                               # after code colours change
+    """
+    def __init__(self, text_edit, repo):
+        super().__init__(text_edit)
+        self.text_edit = text_edit
+        self.repo = repo
+
+        self.document_id = None
+        self.offset_map = OffsetMap()
+        # Shown range of the document; window_end is None for the whole text
+        self.window_start = 0
+        self.window_end = None
+
+        # Disjoint painted runs of the current document, ordered by start
+        self._runs: list[Run] = []
+
+        # code colours -> format; QTextCharFormat is shared, not copied, by Qt
+        self._formats: dict[tuple, QTextCharFormat] = {}
+
+        # Formatting a read-only viewer should not fill an undo stack
+        self.text_edit.document().setUndoRedoEnabled(False)
+        self.text_edit.viewport().installEventFilter(self)
+
+    def set_document(self, document_id: int, offset_map: OffsetMap, start: int = 0, end: int | None = None) -> None:
+        """
+        Render every segment of freshly loaded text.
+
+        :param offset_map: Positions of the loaded text, which starts at start
+        :param start: Offset of the loaded text in the document
+        :param end: End of the loaded text, or None if it runs to the end of
+            the document and the document is loaded whole
+        """
+        self.document_id = document_id
+        self.offset_map = offset_map
+        self.window_start = start
+        self.window_end = end
+        # Freshly set plain text carries no formats, so nothing to clear
+        self._render_all(clear=False)
+
+    def clear(self) -> None:
+        """Forget the current document; its text is about to be replaced."""
+        self.document_id = None
+        self.offset_map = OffsetMap()
+        self.window_start = 0
+        self.window_end = None
+        self._runs = []
+
+    def refresh(self) -> None:
+        """Re-render the whole document, e.g. after a code's colour changed."""
+        if self.document_id is None:
+            return
+        self._render_all(clear=True)
+
+    def refresh_range(self, start: int, end: int) -> None:
+        """
+        Re-render [start, end) after a segment covering it was added or
+        removed. Only segments overlapping the range are read and painted.
+        """
+        if self.document_id is None:
+            return
+        # Nothing outside the loaded window is painted
+        start = max(start, self.window_start)
+        if self.window_end is not None:
+            end = min(end, self.window_end)
+        if end <= start:
+            return
+        segments = self.repo.segments_overlapping(self.document_id, start, end)
+        self._render(start, end, segments, clear=True)
+
+    def segments_at(self, offset: int) -> tuple:
+        """Segments covering a code point offset, read from the painted runs."""
+        run = run_at(self._runs, offset)
+        return run.segments if run is not None else ()
+
+    # ---- tooltips ------------------------------------------------------------
+    def eventFilter(self, watched, event) -> bool:
+        if event.type() != QEvent.ToolTip or self.document_id is None:
+            return super().eventFilter(watched, event)
+
+        cursor = self.text_edit.cursorForPosition(event.pos())
+        segments = self.segments_at(self.window_start + self.offset_map.from_qt(cursor.position()))
+        if not segments:
+            QToolTip.hideText()
+            event.ignore()
+            return True
+
+        # One line per code, in stacking order, even if it is applied twice
+        labels = dict.fromkeys(segment["code_label"] or "(unnamed code)" for segment in segments)
+        QToolTip.showText(event.globalPos(), "<br>".join(escape(label) for label in labels), watched)
+        return True
+
+    # ---- internal helpers --------------------------------------------------
+    def _render_all(self, clear: bool) -> None:
+        if self.window_end is None:
+            segments = self.repo.get_coded_segments(self.document_id)
+        else:
+            segments = self.repo.segments_overlapping(self.document_id, self.window_start, self.window_end)
+        logger.debug("SegmentHighlighter: rendering %d segments", len(segments))
+        self._runs = []
+        self._render(self.window_start, self.window_end, segments, clear=clear)
+
+    def _render(self, start: int, end: int | None, segments, clear: bool) -> None:
+        document = self.text_edit.document()
+        # The last position is the document's implicit final paragraph separator
+        last_position = max(document.characterCount() - 1, 0)
+
+        def qt_position(offset: int) -> int:
+            return min(self.offset_map.to_qt(offset - self.window_start), last_position)
+
+        range_start = qt_position(start)
+        range_end = last_position if end is None else qt_position(end)
+
+        runs = split_into_runs(segments, start, end)
+        if end is None:
+            self._runs = runs
+        else:
+            self._runs = splice_runs(self._runs, start, end, runs)
+
+        cursor = QTextCursor(document)
+        cursor.beginEditBlock()
+        try:
+            if clear:
+                cursor.setPosition(range_start)
+                cursor.setPosition(range_end, QTextCursor.KeepAnchor)
+                cursor.setCharFormat(QTextCharFormat())
+
+            # One format write per run, however many segments stack on it
+            for run in runs:
+                run_start = qt_position(run.start)
+                run_end = qt_position(run.end)
+                if run_start >= run_end:
+                    continue
+                cursor.setPosition(run_start)
+                cursor.setPosition(run_end, QTextCursor.KeepAnchor)
+                cursor.setCharFormat(self._format_for(run.segments))
+        finally:
+            cursor.endEditBlock()
+
+    def _format_for(self, segments) -> QTextCharFormat:
+        # Distinct colours in stacking order
+        colors = tuple(dict.fromkeys(_highlight_color(segment["code_color"]) for segment in segments))
+        fmt = self._formats.get(colors)
+        if fmt is None:
+            fmt = QTextCharFormat()
+            if len(colors) == 1:
+                fmt.setBackground(QColor(colors[0]))
+            else:
+                blend = _blend(colors)
+                fmt.setBackground(blend)
+                # Mark stacked codes so a blend is not mistaken for a single code
+                fmt.setUnderlineStyle(QTextCharFormat.DashUnderline)
+                fmt.setUnderlineColor(blend.darker(160))
+            self._formats[colors] = fmt
+        return fmt
+
+def _highlight_color(code_color: str | None) -> str:
+    # use the code color if present, otherwise a default
+    qcolor = QColor(code_color) if code_color else QColor()
+    if not qcolor.isValid():
+        qcolor = QColor(DEFAULT_HIGHLIGHT_COLOR)
+    return qcolor.name()
+
+def _blend(colors) -> QColor:
+    """Channel-wise average of colours."""
+    qcolors = [QColor(color) for color in colors]
+    n = len(qcolors)
+    return QColor(
+        sum(c.red() for c in qcolors) // n,
+        sum(c.green() for c in qcolors) // n,
+        sum(c.blue() for c in qcolors) // n,
+    )
@@ -0,0 +1,212 @@
+"""
+Read-only text view that keeps only part of a very large document loaded.
+
+Setting a 50-100 MB transcript on a QTextBrowser builds a rich-text document
+for all of it, which takes tens of seconds and gigabytes of memory.
+WindowedTextView is a QPlainTextEdit (laid out lazily, block by block) that
+shows documents up to LARGE_DOCUMENT_CHARS whole and, beyond that, only a
+window of WINDOW_CHARS around the viewport. The window is read from the
+memory-mapped text store through repo.text_service and slides when the
+viewport scrolls close to either edge; its SegmentHighlighter paints only the
+segments overlapping the window.
+
+Callers translate between Qt positions and document offsets with
+to_offset/to_position rather than an OffsetMap, since positions are relative
+to the loaded window.
+
+The view follows the repository's change events: segments coded or removed
+in the shown document are repainted where they lie, code edits repaint the
+window and a re-imported text is reloaded, wherever the change was made.
+"""
+from __future__ import annotations
+
+from PySide6.QtCore import QPoint, Qt
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+from ..utils.offset_map import OffsetMap
+from ..utils.repository_events import (
+    CodeDeleted, CodeUpdated, DocumentTextChanged, SegmentsAdded, SegmentsRemoved,
+)
+from .segment_highlighter import SegmentHighlighter
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Documents longer than this (in characters) are shown a window at a time
+LARGE_DOCUMENT_CHARS = 2_000_000
+
+# Characters loaded per window, and how close the viewport may get to a
+# window edge before the window moves
+WINDOW_CHARS = 400_000
+WINDOW_MARGIN_CHARS = WINDOW_CHARS // 8
+
+# Segments changed in one event beyond which their whole extent is repainted
+# with one query instead of one query per segment
+MAX_SEPARATE_REPAINTS = 16
+
+class WindowedTextView(QPlainTextEdit):
+    """
+    Shows a registered document (whole, or a sliding window of it for large
+    documents) or a plain message, with segment highlights.
+
+    Usage:
+    view = WindowedTextView(repo)
+    view.show_document(document_id)
+    offset = view.to_offset(view.textCursor().selectionStart())
+    view.reveal(start, end)
+    """
+    def __init__(self, repo, parent=None):
+        super().__init__(parent)
+        self.repo = repo
+        self.setReadOnly(True)
+        self.setTextInteractionFlags(Qt.TextSelectableByMouse | Qt.TextSelectableByKeyboard)
+
+        self.document_id = None
+        self.char_length = 0
+        # Loaded range of the document and the positions within it
+        self.window_start = 0
+        self.window_end = 0
+        self.offset_map = OffsetMap()
+        self.windowed = False
+        self._loading = False
+
+        self.highlighter = SegmentHighlighter(self, repo)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+        repo.events.subscribe(self._on_segments_changed, SegmentsAdded, SegmentsRemoved)
+        repo.events.subscribe(self._on_codes_changed, CodeUpdated, CodeDeleted)
+        repo.events.subscribe(self._on_text_changed, DocumentTextChanged)
+
+    def show_document(self, document_id: int) -> None:
+        """
+        Display a registered document and its highlights.
+
+        :raises KeyError: if the document is not registered
+        :raises OSError: if its text cannot be read
+        """
+        text_service = self.repo.text_service
+        self.highlighter.clear()
+        self.document_id = None
+
+        length = text_service.get_length(document_id)
+        self.document_id = document_id
+        self.char_length = length
+        self.windowed = length > LARGE_DOCUMENT_CHARS
+
+        if self.windowed:
+            logger.info("WindowedTextView: document_id=%s has %d chars, showing it in windows", document_id, length)
+            self._load_window(0)
+            return
+
+        self.window_start, self.window_end = 0, length
+        self.offset_map = text_service.get_offset_map(document_id)
+        self._set_text(text_service.get_text(document_id))
+        self.highlighter.set_document(document_id, self.offset_map)
+
+    def show_text(self, text: str) -> None:
+        """Display text that is not a registered document (messages, files)."""
+        self.highlighter.clear()
+        self.document_id = None
+        self.windowed = False
+        self.char_length = len(text)
+        self.window_start, self.window_end = 0, len(text)
+        self.offset_map = OffsetMap.from_text(text)
+        self._set_text(text)
+
+    # ---- positions -----------------------------------------------------------
+    def to_offset(self, position: int) -> int:
+        """Qt position in the view -> code point offset in the document."""
+        return self.window_start + self.offset_map.from_qt(position)
+
+    def to_position(self, offset: int) -> int:
+        """Document offset -> Qt position, clamped to the loaded window."""
+        offset = min(max(offset - self.window_start, 0), self.window_end - self.window_start)
+        return self.offset_map.to_qt(offset)
+
+    def reveal(self, start: int, end: int) -> None:
+        """Select [start, end) and scroll it into view, loading its window if needed."""
+        if self.windowed and not (self.window_start <= start and end <= self.window_end):
+            self._load_window(start - WINDOW_CHARS // 4)
+
+        cursor = self.textCursor()
+        cursor.setPosition(self.to_position(start))
+        cursor.setPosition(self.to_position(end), QTextCursor.KeepAnchor)
+        self.setTextCursor(cursor)
+        self.ensureCursorVisible()
+
+    # ---- repository events -------------------------------------------------
+    def _on_segments_changed(self, event) -> None:
+        ranges = [
+            (segment["start_offset"], segment["end_offset"])
+            for segment in event.segments
+            if segment["document_id"] == self.document_id
+        ]
+        if len(ranges) > MAX_SEPARATE_REPAINTS:
+            ranges = [(min(start for start, _ in ranges), max(end for _, end in ranges))]
+        # Repaint only what the segments covered, with whatever overlaps it now
+        for start, end in ranges:
+            self.highlighter.refresh_range(start, end)
+
+    def _on_codes_changed(self, event) -> None:
+        self.highlighter.refresh()
+
+    def _on_text_changed(self, event: DocumentTextChanged) -> None:
+        if event.document_id == self.document_id:
+            self.show_document(event.document_id)
+
+    # ---- windowing -----------------------------------------------------------
+    def _on_scrolled(self, _value: int) -> None:
+        if not self.windowed or self._loading:
+            return
+
+        viewport = self.viewport()
+        top = self.to_offset(self.cursorForPosition(QPoint(0, 0)).position())
+        bottom = self.to_offset(
+            self.cursorForPosition(QPoint(viewport.width() - 1, viewport.height() - 1)).position()
+        )
+
+        near_start = self.window_start > 0 and top - self.window_start < WINDOW_MARGIN_CHARS
+        near_end = self.window_end < self.char_length and self.window_end - bottom < WINDOW_MARGIN_CHARS
+        if not (near_start or near_end):
+            return
+
+        # Re-centre the window on the viewport and keep the same text at the top
+        self._load_window(top - WINDOW_CHARS // 2)
+        block = self.document().findBlock(self.to_position(top))
+        self._loading = True
+        try:
+            self.verticalScrollBar().setValue(block.firstLineNumber())
+        finally:
+            self._loading = False
+
+    def _load_window(self, start: int) -> None:
+        start = max(0, min(start, self.char_length - WINDOW_CHARS))
+        end = min(start + WINDOW_CHARS, self.char_length)
+        text = self.repo.text_service.get_window(self.document_id, start, end)
+
+        # Cut at line breaks so no line is split across windows
+        if start > 0:
+            cut = text.find("\n", 0, WINDOW_MARGIN_CHARS)
+            if cut >= 0:
+                text = text[cut + 1:]
+                start += cut + 1
+        if end < self.char_length:
+            cut = text.rfind("\n", max(0, len(text) - WINDOW_MARGIN_CHARS))
+            if cut >= 0:
+                text = text[:cut + 1]
+                end = start + len(text)
+
+        logger.debug("WindowedTextView: loading [%d, %d) of document_id=%s", start, end, self.document_id)
+        self.window_start, self.window_end = start, end
+        self.offset_map = OffsetMap.from_text(text)
+        self._set_text(text)
+        self.highlighter.set_document(self.document_id, self.offset_map, start, end)
+
+    def _set_text(self, text: str) -> None:
+        # setPlainText resets the scroll bar; that is not the user scrolling
+        self._loading = True
+        try:
+            self.setPlainText(text)
+        finally:
+            self._loading = False
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import sys
+from collections import OrderedDict
+
+from .offset_map import OffsetMap
+from .text_store import TextStoreReader
+
+import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_OPEN_READERS = 16
+
+class DocumentTextService:
+    """
+    Reads canonical document texts for snippet extraction, keeping recently
+    used texts decoded in a byte-bounded LRU cache keyed by document id.
+
+    Owned by ProjectRepository (repo.text_service), which invalidates entries
+    when a document is deleted or its text replaced. Anything that slices
+    segment text out of a document should go through here so a document is
+    read from disk once per operation rather than once per segment.
+
+    Snippets are read through memory-mapped TextStoreReaders, which decode
+    only the requested window; full texts are decoded only for get_text.
+    """
+    def __init__(self, repo, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.repo = repo
+        self.max_bytes = max_bytes
+
+        self._texts: OrderedDict[int, str] = OrderedDict()
+        self._sizes: dict[int, int] = {}
+        self._total_bytes = 0
+
+        # document_id -> TextStoreReader, or None when the text has no usable index
+        self._readers: OrderedDict[int, TextStoreReader | None] = OrderedDict()
+
+        # document_id -> OffsetMap; small (astral characters only), never evicted
+        self._offset_maps: dict[int, OffsetMap] = {}
+
+    def get_text(self, document_id: int) -> str:
+        """
+        Return the full canonical text of a document.
+
+        :raises KeyError: if the document is not registered
+        :raises OSError: if the text file cannot be read
+        """
+        text = self._texts.get(document_id)
+        if text is not None:
+            self._texts.move_to_end(document_id)
+            return text
+
+        path = self.repo.get_document_path(document_id)
+        text = path.read_text(encoding="utf-8")
+        self._store(document_id, text)
+        return text
+
+    def get_snippet(self, document_id: int, start_offset: int, end_offset: int) -> str:
+        """
+        Return the stripped text of [start_offset, end_offset) in a document.
+        """
+        return self.get_window(document_id, start_offset, end_offset).strip()
+
+    def get_window(self, document_id: int, start_offset: int, end_offset: int) -> str:
+        """
+        Return the exact text of [start_offset, end_offset) in a document
+        without decoding the rest of it.
+        """
+        text = self._texts.get(document_id)
+        if text is not None:
+            self._texts.move_to_end(document_id)
+            return text[start_offset:end_offset]
+
+        reader = self._get_reader(document_id)
+        if reader is None:
+            return self.get_text(document_id)[start_offset:end_offset]
+        return reader.read(start_offset, end_offset)
+
+    def get_length(self, document_id: int) -> int:
+        """
+        Return a document's length in code points. Indexed texts answer from
+        their offset index without being decoded.
+        """
+        text = self._texts.get(document_id)
+        if text is not None:
+            return len(text)
+
+        reader = self._get_reader(document_id)
+        if reader is None:
+            return len(self.get_text(document_id))
+        return reader.char_length
+
+    def get_offset_map(self, document_id: int) -> OffsetMap:
+        """
+        Return the Qt <-> code point OffsetMap for a document, building it on
+        first use.
+        """
+        offset_map = self._offset_maps.get(document_id)
+        if offset_map is None:
+            offset_map = OffsetMap.from_text(self.get_text(document_id))
+            self._offset_maps[document_id] = offset_map
+        return offset_map
+
+    def invalidate(self, document_id: int) -> None:
+        """Drop a document's cached text, e.g. after delete or re-import."""
+        self._offset_maps.pop(document_id, None)
+
+        if document_id in self._texts:
+            del self._texts[document_id]
+            self._total_bytes -= self._sizes.pop(document_id)
+
+        # Close the map so the file can be deleted or replaced (Windows)
+        reader = self._readers.pop(document_id, None)
+        if reader is not None:
+            reader.close()
+
+    def clear(self) -> None:
+        self._offset_maps.clear()
+        self._texts.clear()
+        self._sizes.clear()
+        self._total_bytes = 0
+
+        for reader in self._readers.values():
+            if reader is not None:
+                reader.close()
+        self._readers.clear()
+
+    def _get_reader(self, document_id: int) -> TextStoreReader | None:
+        if document_id in self._readers:
+            self._readers.move_to_end(document_id)
+            return self._readers[document_id]
+
+        path = self.repo.get_document_path(document_id)
+        reader = TextStoreReader.open(path)
+        self._readers[document_id] = reader
+
+        while len(self._readers) > MAX_OPEN_READERS:
+            _, evicted = self._readers.popitem(last=False)
+            if evicted is not None:
+                evicted.close()
+        return reader
+
+    def _store(self, document_id: int, text: str) -> None:
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            # Larger than the whole budget: serve it without caching
+            logger.debug("DocumentTextService: document_id=%s too large to cache (%d bytes)", document_id, size)
+            return
+
+        self._texts[document_id] = text
+        self._sizes[document_id] = size
+        self._total_bytes += size
+
+        while self._total_bytes > self.max_bytes:
+            evicted_id, _ = self._texts.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(evicted_id)
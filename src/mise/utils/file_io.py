@@ -1,15 +1,21 @@
 import os
 import csv
 import json
-from docx import Document as DocxDocument
-import markdown
 
 from pathlib import Path
-import pdfplumber
+
+# Converter libraries (pdfplumber, python-docx) are imported inside the
+# functions that use them, so opening the app or a project does not pay for
+# them until the first import.
+
+from .text_store import TextStoreWriter
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Separator written between PDF pages in the canonical text
+PAGE_SEPARATOR = "\n\n"
+
 def convert_to_canonical_text(src_path: Path) -> str:
     """
     Convert source document, uploaded by the user,
@@ -28,24 +34,62 @@ def convert_to_canonical_text(src_path: Path) -> str:
     else:
         raise ValueError(f"Unsupported extension: {ext}")
 
-def extract_text_from_pdf(path: Path) -> str:
+def write_canonical_text(src_path: Path, dest_path: Path) -> tuple[str, list[int]]:
     """
-    Extract text from PDF document and return as plaintext.
+    Convert a source document straight into a canonical text file (and its
+    offset index) at dest_path.
+
+    PDFs are streamed page by page, so memory is bounded by one page rather
+    than the whole document.
+
+    :return: (SHA-256 of the written text, character offset where each page
+        starts for paginated formats, empty otherwise)
+    :rtype: tuple[str, list[int]]
+    """
+    if src_path.suffix.lower() == ".pdf":
+        page_offsets = []
+        with TextStoreWriter(dest_path) as writer:
+            for page_number, page_text in enumerate(stream_text_from_pdf(src_path)):
+                if page_number:
+                    writer.write(PAGE_SEPARATOR)
+                page_offsets.append(writer.char_length)
+                writer.write(page_text)
+        logger.info("write_canonical_text: wrote %d pages from %r", len(page_offsets), src_path)
+        return writer.content_hash, page_offsets
+
+    text = convert_to_canonical_text(src_path)
+    with TextStoreWriter(dest_path) as writer:
+        writer.write(text)
+    return writer.content_hash, []
+
+def stream_text_from_pdf(path: Path):
+    """
+    Yield the normalized plaintext of each PDF page in order, releasing each
+    page's parsed layout before moving on to the next.
     """
-    chunks = []
+    import pdfplumber
+
     with pdfplumber.open(str(path)) as pdf:
         for page in pdf.pages:
             text = page.extract_text() or ""
-            chunks.append(text)
+            page.flush_cache()
+            # Normalize to Unix line endings
+            yield text.replace("\r\n", "\n").replace("\r", "\n")
 
-    logger.info("extract_text_from_pdf: extracted content from %r", path)
-    # Normalize to Unix line endings
-    return "\n\n".join(chunks).replace("\r\n", "\n").replace("\r", "\n")
+    logger.info("stream_text_from_pdf: extracted content from %r", path)
+
+def extract_text_from_pdf(path: Path) -> str:
+    """
+    Extract text from PDF document and return as plaintext.
+    """
+    return PAGE_SEPARATOR.join(stream_text_from_pdf(path))
 
 def extract_text_from_docx(path: Path) -> str:
     """
     Extract text from Docx document and return as plaintext.
     """
+    from docx import Document as DocxDocument
+
     doc = DocxDocument(str(path))
     paragraphs = [p.text for p in doc.paragraphs]
     text = "\n\n".join(paragraphs)
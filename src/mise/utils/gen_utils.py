@@ -1,4 +1,5 @@
 import errno, os
+import hashlib
 import sys
 
 import logging
@@ -82,4 +83,17 @@ def is_pathname_valid(pathname: str) -> bool:
     # If any other exception was raised, this is an unrelated fatal issue
     # (e.g., a bug). Permit this exception to unwind the call stack.
     #
-    # Did we mention this should be shipped with Python already?
\ No newline at end of file
+    # Did we mention this should be shipped with Python already?
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def hash_file(path) -> str:
+    """
+    SHA-256 hex digest of a file's bytes, read in chunks so memory stays
+    bounded for large sources.
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -1,36 +1,294 @@
+import multiprocessing
+import os
+import uuid
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from .file_io import convert_to_canonical_text
+
+from .file_io import write_canonical_text
+from .gen_utils import hash_file
+from .text_store import index_path_for, sync_text_files
 
 import logging
 logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc", ".md", ".markdown"}
 
-def import_files(src_paths: list[Path], texts_dir: Path, repo) -> tuple[bool, list[str]]:
-    imported_any = False
-    errors = []
+# Documents registered per transaction while an import is running
+IMPORT_BATCH_SIZE = 50
+
+# Conversions queued per worker process; bounds what a cancel has to wait for
+CONVERSIONS_IN_FLIGHT_PER_WORKER = 2
+
+def new_import_summary() -> dict[str, list[str]]:
+    """
+    Empty import summary: file names per outcome, plus error messages.
+
+    - added: converted and registered as a new document
+    - refreshed: changed source of an uncoded document; text replaced in place
+      (only when import_files is asked to refresh)
+    - linked: new source whose text matches an existing document
+    - skipped: source already imported, not converted again
+    """
+    return {"added": [], "refreshed": [], "linked": [], "skipped": [], "errors": []}
+
+def import_files(
+    src_paths: list[Path],
+    texts_dir: Path,
+    repo,
+    max_workers: int | None = 1,
+    refresh: bool = False,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_progress: Callable[[int, int, str], None] | None = None,
+    on_error: Callable[[str, str], None] | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+) -> dict[str, list[str]]:
+    """
+    Convert source documents to canonical texts and register them.
+
+    Sources are identified by content hash, so re-importing a folder only
+    converts new or changed files. A file whose hash is already known is
+    skipped. After conversion, a text identical to an existing document's is
+    linked to that document instead of duplicated. Other files are added as
+    new documents, unless refresh is set: then a file with the same name as
+    an uncoded document replaces that document's text in place. Names are
+    not unique across folders, so this is only done when the caller asks.
+    Coded documents are never refreshed, since their segment offsets would be
+    invalidated; changed versions are added alongside the original.
+
+    Conversion runs in a process pool when max_workers is not 1 (None means
+    one worker per core). Each conversion streams its text into a temporary
+    file in texts_dir; the calling thread renames finished files into place
+    and registers them (with their page offsets) in input order, batch_size
+    documents per transaction. repo must belong to the calling thread.
+
+    :param refresh: replace the text of uncoded documents with changed
+        sources of the same file name, instead of adding new documents
+    :param on_progress: called with (files_done, files_total, file_name)
+    :param on_error: called with (file_name, message) for each failed file
+    :param is_cancelled: polled between files; when it returns True,
+        pending conversions are cancelled and finished ones are kept
+    :return: Summary of outcomes, see new_import_summary
+    :rtype: dict[str, list[str]]
+    """
+    summary = new_import_summary()
+    batch = []
+    total = len(src_paths)
+    done = 0
 
+    def report_error(name: str, message: str):
+        summary["errors"].append(f"{name}: {message}")
+        if on_error is not None:
+            on_error(name, message)
+
+    def report_progress(name: str):
+        nonlocal done
+        done += 1
+        if on_progress is not None:
+            on_progress(done, total, name)
+
+    def next_text_path(files_left: int) -> Path:
+        # Names are reserved a batch at a time; unused ones are simply skipped
+        if not text_paths:
+            text_paths.extend(repo.allocate_text_paths(min(batch_size, files_left)))
+        return text_paths.pop(0)
+
+    def flush():
+        if batch:
+            # Texts must be durable before the database points at them
+            sync_text_files(dest_path for _, dest_path, _, _, _ in batch)
+            # One transaction per batch: documents and their page offsets
+            with repo.transaction():
+                document_ids = repo.register_documents(
+                    (name, dest_path, source_hash, text_hash)
+                    for name, dest_path, source_hash, text_hash, _ in batch
+                )
+                for document_id, entry in zip(document_ids, batch):
+                    name, _, _, text_hash, page_offsets = entry
+                    known_texts.setdefault(text_hash, document_id)
+                    if page_offsets:
+                        repo.add_document_pages(document_id, page_offsets)
+                    summary["added"].append(name)
+            batch.clear()
+
+    # ---- identify sources before converting anything
+    repo.backfill_text_hashes()
+    known_sources = repo.get_source_hashes()
+    known_texts = {}
+    documents_by_name = {}
+    for document in repo.get_document_hashes():
+        if document["text_hash"] is not None:
+            known_texts.setdefault(document["text_hash"], document["id"])
+        if refresh:
+            # Latest document wins when a name was imported more than once
+            documents_by_name[document["original_filename"]] = document
+
+    to_convert = []
     for src_path in src_paths:
         ext = src_path.suffix.lower()
         if ext not in ALLOWED_EXTENSIONS:
-            errors.append(f"{src_path.name}: unsupported extension '{ext}'")
+            report_error(src_path.name, f"unsupported extension '{ext}'")
+            report_progress(src_path.name)
+            continue
+        try:
+            source_hash = hash_file(src_path)
+        except OSError as e:
+            report_error(src_path.name, str(e))
+            report_progress(src_path.name)
+            continue
+        if source_hash in known_sources:
+            summary["skipped"].append(src_path.name)
+            report_progress(src_path.name)
             continue
+        # Duplicates within this import count as known from here on
+        known_sources[source_hash] = None
+        to_convert.append((src_path, source_hash))
+
+    if summary["skipped"]:
+        logger.info("import_files: skipping %d already imported files", len(summary["skipped"]))
+
+    # ---- convert and register the rest
+    pending_texts = set()
+    text_paths = []
+    converted = _iter_converted([src_path for src_path, _ in to_convert], texts_dir, max_workers)
+    try:
+        for position, ((src_path, source_hash), (_, result, error)) in enumerate(zip(to_convert, converted)):
+            if is_cancelled is not None and is_cancelled():
+                logger.info("import_files: cancelled after %d of %d files", done, total)
+                if result is not None:
+                    _discard_text(result[0])
+                break
+
+            if error is not None:
+                report_error(src_path.name, str(error))
+                report_progress(src_path.name)
+                continue
+
+            temp_path, text_hash, page_offsets = result
+            name = src_path.name
+            try:
+                if text_hash in pending_texts:
+                    # Identical text is waiting in this batch; register it first
+                    flush()
+                    pending_texts.clear()
+
+                existing = documents_by_name.get(name)
+                if text_hash in known_texts:
+                    _discard_text(temp_path)
+                    repo.link_document_source(known_texts[text_hash], source_hash, name)
+                    summary["linked"].append(name)
+                elif existing is not None and existing["segment_count"] == 0:
+                    dest_path = repo.get_document_path(existing["id"])
+                    repo.text_service.invalidate(existing["id"])
+                    _move_text(temp_path, dest_path)
+                    sync_text_files([dest_path])
+                    repo.refresh_document(existing["id"], source_hash, text_hash, page_offsets)
+                    if known_texts.get(existing["text_hash"]) == existing["id"]:
+                        del known_texts[existing["text_hash"]]
+                    known_texts.setdefault(text_hash, existing["id"])
+                    # Another file of this name in the same import is added, not refreshed again
+                    del documents_by_name[name]
+                    summary["refreshed"].append(name)
+                else:
+                    dest_path = next_text_path(len(to_convert) - position)
+                    _move_text(temp_path, dest_path)
+                    batch.append((name, dest_path, source_hash, text_hash, page_offsets))
+                    pending_texts.add(text_hash)
+            except Exception as e:
+                _discard_text(temp_path)
+                report_error(name, str(e))
+
+            report_progress(name)
+            if len(batch) >= batch_size:
+                flush()
+                pending_texts.clear()
+    finally:
+        # Stops the pool and cancels conversions that have not started
+        converted.close()
+        flush()
+
+    logger.info(
+        "import_files: %d added, %d refreshed, %d linked, %d skipped, %d errors",
+        *(len(summary[key]) for key in ("added", "refreshed", "linked", "skipped", "errors")),
+    )
+    return summary
+
+def _iter_converted(src_paths: list[Path], texts_dir: Path, max_workers: int | None):
+    """
+    Yield (src_path, (temp_path, text_hash, page_offsets), error) for each source in
+    input order, converting in a process pool unless a single worker is
+    requested.
+
+    The pool starts its workers with "spawn": imports run from a QThread in
+    a multithreaded process, where forking can copy locks held by other
+    threads. Only CONVERSIONS_IN_FLIGHT_PER_WORKER files per worker are
+    submitted ahead of the consumer, so closing the generator (cancel) waits
+    for those at most rather than for the whole import.
+    """
+    if max_workers == 1 or len(src_paths) <= 1:
+        for src_path in src_paths:
+            try:
+                yield src_path, _convert_to_temp(src_path, texts_dir), None
+            except Exception as e:
+                yield src_path, None, e
+        return
+
+    workers = min(max_workers or os.cpu_count() or 1, len(src_paths))
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    logger.info("import_files: converting %d files on %d processes", len(src_paths), workers)
+    remaining = iter(src_paths)
+    in_flight = deque()
+
+    def submit(count: int):
+        for src_path in islice(remaining, count):
+            in_flight.append((src_path, executor.submit(_convert_to_temp, src_path, texts_dir)))
+
+    try:
+        submit(workers * CONVERSIONS_IN_FLIGHT_PER_WORKER)
+        while in_flight:
+            src_path, future = in_flight.popleft()
+            submit(1)
+            try:
+                yield src_path, future.result(), None
+            except Exception as e:
+                yield src_path, None, e
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        # Conversions that finished after the consumer stopped (cancel)
+        for _, future in in_flight:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                temp_path = future.result()[0]
+                if temp_path.exists():
+                    _discard_text(temp_path)
+
+def _convert_to_temp(src_path: Path, texts_dir: Path) -> tuple[Path, str, list[int]]:
+    """
+    Convert one source into a uniquely named temporary text file (plus offset
+    index) in texts_dir. Runs in worker processes, so it must stay picklable.
+
+    :return: (temporary text path, text hash, page start offsets)
+    """
+    temp_path = texts_dir / f".import-{uuid.uuid4().hex}.tmp"
+    try:
+        text_hash, page_offsets = write_canonical_text(src_path, temp_path)
+    except Exception:
+        _discard_text(temp_path)
+        raise
+    return temp_path, text_hash, page_offsets
+
+def _move_text(temp_path: Path, dest_path: Path) -> None:
+    """
+    Move a converted text and its offset index into place. Both are renamed
+    within texts_dir, so readers never see a partially written file.
+    """
+    os.replace(index_path_for(temp_path), index_path_for(dest_path))
+    os.replace(temp_path, dest_path)
 
+def _discard_text(path: Path) -> None:
+    for leftover in (path, index_path_for(path)):
         try:
-            text = convert_to_canonical_text(src_path)
-            dest_path = allocate_text_name(texts_dir)
-            dest_path.write_text(text, encoding="utf-8")
-            repo.register_document(src_path.name, dest_path)
-            imported_any = True
-        except Exception as e:
-            errors.append(f"{src_path.name}: {e}")
-
-    return imported_any, errors
-
-def allocate_text_name(texts_dir: Path) -> Path:
-    existing = list(texts_dir.glob("doc-*.txt"))
-    print(existing)
-    next_id = len(existing) + 1
-
-    logger.info("allocate_text_name: allocating %s", f"doc-{next_id:04d}.txt")
-    return texts_dir / f"doc-{next_id:04d}.txt"
\ No newline at end of file
+            leftover.unlink(missing_ok=True)
+        except OSError:
+            logger.warning("import_files: could not remove %s", leftover)
@@ -0,0 +1,90 @@
+"""
+Interval helpers over coded segments, independent of Qt.
+
+Segments in a document may overlap. split_into_runs does a sweep over
+segment boundaries and cuts the text into disjoint runs, each carrying every
+segment active over it, so a viewer can paint each run once (compositing the
+codes that stack there) and answer "which codes are at this position" with a
+binary search instead of a query.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import NamedTuple
+
+import logging
+logger = logging.getLogger(__name__)
+
+class Run(NamedTuple):
+    """Half-open range [start, end) covered by the same set of segments."""
+    start: int
+    end: int
+    segments: tuple
+
+def split_into_runs(segments, start: int | None = None, end: int | None = None) -> list[Run]:
+    """
+    Split segments into disjoint, ordered runs of constant coverage.
+
+    Runs are only produced where at least one segment is active; uncovered
+    text between segments has no run. Each run's segments keep the input's
+    relative order, so callers control stacking by how they sort it.
+
+    :param segments: Mappings with start_offset and end_offset (sqlite Rows
+        or dicts); empty or inverted segments are ignored
+    :param start: Clip runs to begin at or after this offset
+    :param end: Clip runs to end at or before this offset
+    :return: Runs ordered by start
+    :rtype: list[Run]
+    """
+    # (position, is_start, order): ends sort before starts at the same
+    # position, so touching segments do not produce an empty run
+    events = []
+    for order, segment in enumerate(segments):
+        segment_start = segment["start_offset"]
+        segment_end = segment["end_offset"]
+        if start is not None:
+            segment_start = max(segment_start, start)
+        if end is not None:
+            segment_end = min(segment_end, end)
+        if segment_start >= segment_end:
+            continue
+        events.append((segment_start, 1, order, segment))
+        events.append((segment_end, 0, order, segment))
+    events.sort(key=lambda event: event[:3])
+
+    runs = []
+    active = {}
+    position = None
+    for event_position, is_start, order, segment in events:
+        if active and event_position > position:
+            runs.append(Run(position, event_position, tuple(active[key] for key in sorted(active))))
+        if is_start:
+            active[order] = segment
+        else:
+            del active[order]
+        position = event_position
+    return runs
+
+def run_at(runs: list[Run], offset: int) -> Run | None:
+    """Return the run covering offset, or None if no segment covers it."""
+    index = bisect_right(runs, offset, key=lambda run: run.start) - 1
+    if index >= 0 and runs[index].start <= offset < runs[index].end:
+        return runs[index]
+    return None
+
+def splice_runs(runs: list[Run], start: int, end: int, replacement: list[Run]) -> list[Run]:
+    """
+    Replace the coverage of [start, end) in runs with replacement (runs
+    already clipped to that range), trimming runs that cross its edges.
+
+    :return: New ordered run list
+    :rtype: list[Run]
+    """
+    before = []
+    after = []
+    for run in runs:
+        if run.start < start:
+            before.append(run if run.end <= start else run._replace(end=start))
+        if run.end > end:
+            after.append(run if run.start >= end else run._replace(start=end))
+    return before + list(replacement) + after
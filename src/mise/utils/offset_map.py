@@ -0,0 +1,48 @@
+"""
+Translation between Qt text positions and canonical segment offsets.
+
+Qt counts positions in UTF-16 code units, so every character outside the
+Basic Multilingual Plane (emoji, many CJK extensions, historic scripts) takes
+two positions in a QTextDocument but one in a Python string. Segment offsets
+in the database are always code point offsets into the canonical text; the
+viewers translate at the boundary with an OffsetMap.
+"""
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left
+
+import logging
+logger = logging.getLogger(__name__)
+
+_ASTRAL_RE = re.compile("[\U00010000-\U0010FFFF]")
+
+class OffsetMap:
+    """
+    Converts between Qt positions and code point offsets for one text in
+    O(log n), storing only the positions of astral characters. For texts
+    without any (the common case) both conversions are the identity.
+    """
+    def __init__(self, astral_offsets: array | None = None):
+        # code point offset of each astral character, ascending
+        self._astral_offsets = astral_offsets if astral_offsets is not None else array("q")
+        # Qt position of each astral character: offset + astral characters before it
+        self._astral_positions = array(
+            "q", (offset + i for i, offset in enumerate(self._astral_offsets))
+        )
+
+    @classmethod
+    def from_text(cls, text: str) -> OffsetMap:
+        return cls(array("q", (match.start() for match in _ASTRAL_RE.finditer(text))))
+
+    def to_qt(self, offset: int) -> int:
+        """Code point offset -> Qt (UTF-16) position."""
+        return offset + bisect_left(self._astral_offsets, offset)
+
+    def from_qt(self, position: int) -> int:
+        """
+        Qt (UTF-16) position -> code point offset. A position between the two
+        halves of a surrogate pair maps to the start of that character.
+        """
+        return position - bisect_left(self._astral_positions, position)
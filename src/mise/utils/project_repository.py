@@ -1,12 +1,41 @@
 from __future__ import annotations
 
 import sqlite3
+from contextlib import contextmanager
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 import uuid
 
+from ..database import STATISTICS_REBUILD, migrate_database
+from .document_text_service import DocumentTextService
+from .gen_utils import hash_file
+from .text_store import text_char_length
+from .repository_events import (
+    RepositoryEvents, SegmentsAdded, SegmentsRemoved, CodeAdded, CodeUpdated,
+    CodeDeleted, DocumentsAdded, DocumentRenamed, DocumentDeleted,
+    DocumentTextChanged,
+)
+
 import logging
 logger = logging.getLogger(__name__)
 
+# Canonical text file names, numbered by the text_sequence table
+TEXT_NAME_TEMPLATE = "doc-{:04d}.txt"
+
+# Ids per "IN (...)" query, well under SQLite's host parameter limit
+SQL_VARIABLE_CHUNK = 500
+
+# Applied to every connection. WAL lets readers run alongside a writer and
+# turns most commits into sequential appends; synchronous=NORMAL is safe
+# under WAL (a power loss can only drop the last commits, never corrupt).
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",   # 64 MiB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
 class ProjectRepository:
     """
     Docstring for ProjectRepository
@@ -26,13 +55,88 @@ class ProjectRepository:
 
         self.conn = sqlite3.connect(self.db_path)
         self.conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            self.conn.execute(pragma)
+
+        # Nesting depth of transaction() blocks; commits are deferred while > 0
+        self._transaction_depth = 0
+
+        # Shared, cached access to document texts for snippet consumers
+        self.text_service = DocumentTextService(self)
+
+        # Change notifications for views; see repository_events
+        self.events = RepositoryEvents()
+
+        # Upgrade projects created by older versions in place
+        self.schema_version = migrate_database(self.conn)
 
     @property
     def connection(self):
         return self.conn
 
+    # ---- transactions ----------------------------------------------
+    @contextmanager
+    def transaction(self):
+        """
+        Group repository writes into one unit of work.
+
+        Mutating methods commit on their own when called outside a
+        transaction; inside one, their commits are deferred until the
+        outermost block exits, so a batch pays for a single commit.
+        Nested blocks become savepoints: an exception rolls back only the
+        innermost block and propagates. Change events published inside are
+        delivered after the outermost commit, or dropped on rollback.
+
+        Usage:
+        with repo.transaction():
+            for path in paths:
+                repo.register_document(path.name, path)
+        """
+        depth = self._transaction_depth
+        savepoint = f"repo_tx_{depth}"
+
+        if depth == 0:
+            if self.conn.in_transaction:
+                # flush anything written through self.connection directly
+                self.conn.commit()
+            self.conn.execute("BEGIN")
+        else:
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+
+        self._transaction_depth += 1
+        self.events.begin()
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if depth == 0:
+                self.conn.rollback()
+            else:
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                self.conn.execute(f"RELEASE {savepoint}")
+            self.events.rollback()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if depth == 0:
+                self.conn.commit()
+            else:
+                self.conn.execute(f"RELEASE {savepoint}")
+            self.events.commit()
+
+    def _commit(self) -> None:
+        """Commit now unless an enclosing transaction() will do it."""
+        if self._transaction_depth == 0:
+            self.conn.commit()
+
     # ---- documents -------------------------------------------------
-    def register_document(self, original_filename: str, text_path: Path) -> int:
+    def register_document(
+        self,
+        original_filename: str,
+        text_path: Path,
+        source_hash: str | None = None,
+        text_hash: str | None = None,
+    ) -> int:
         """
         Creates new rows in documents table on file upload with
         - file's original string name
@@ -43,27 +147,64 @@ class ProjectRepository:
         :type original_filename: str
         :param text_path: path to doc in /texts dir, uses canonical name
         :type text_path: Path
+        :param source_hash: SHA-256 of the source file, if known
+        :param text_hash: SHA-256 of the canonical text, if known
         :return: Description
         :rtype: int
         """
-        logger.info(
-            "register_document: Registering %s with text_path=%r",
-            original_filename, text_path
-        )
+        return self.register_documents([(original_filename, text_path, source_hash, text_hash)])[0]
 
-        rel_path = self._to_rel_path(text_path)
+    def register_documents(self, documents: Iterable[tuple[str, Path]]) -> list[int]:
+        """
+        Bulk version of register_document, inserting every document with a
+        single executemany inside one transaction.
 
-        cur = self.conn.execute(
-            """
-            INSERT INTO documents (
-                original_filename, display_name, text_path, created_at, doc_uuid
+        :param documents: (original_filename, text_path) or
+            (original_filename, text_path, source_hash, text_hash) tuples
+        :type documents: Iterable[tuple]
+        :return: New document ids, in input order
+        :rtype: list[int]
+        """
+        rows = []
+        for document in documents:
+            original_filename, text_path, *rest = document
+            source_hash, text_hash = (rest + [None, None])[:2]
+            rows.append((
+                original_filename, original_filename, self._to_rel_path(text_path),
+                str(uuid.uuid4()), source_hash, text_hash,
+            ))
+        if not rows:
+            return []
+
+        logger.info("register_documents: Registering %d documents", len(rows))
+
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO documents (
+                    original_filename, display_name, text_path, created_at, doc_uuid,
+                    source_hash, text_hash
+                )
+                VALUES (?, ?, ?, datetime('now'), ?, ?, ?)
+                """,
+                rows,
             )
-            VALUES (?, ?, ?, datetime('now'), ?)
-            """,
-            (original_filename, original_filename, rel_path, str(uuid.uuid4())),
-        )
-        self.conn.commit()
-        return cur.lastrowid
+            document_ids = self._inserted_ids("documents", len(rows))
+            self.events.publish(DocumentsAdded(tuple(document_ids)))
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO document_sources (
+                    source_hash, document_id, original_filename, linked_at
+                )
+                VALUES (?, ?, ?, datetime('now'))
+                """,
+                [
+                    (row[4], document_id, row[0])
+                    for row, document_id in zip(rows, document_ids)
+                    if row[4] is not None
+                ],
+            )
+            return document_ids
 
     def lookup_document_id(self, text_path: Path) -> int | None:
         """
@@ -81,19 +222,35 @@ class ProjectRepository:
         ).fetchone()
         return row["id"] if row else None
     
-    def get_document_by_text_path(self, text_path: Path):
+    def list_documents(self, document_id: int | None = None) -> list[dict]:
         """
-        Method doesn't make any sense. Only used in
-        DocumentBrowserWidget.populate_file_list
-        :return: 
+        List documents with their segment counts in one query, for the
+        document browser. Nothing on disk is touched.
+
+        :param document_id: Only list this document
+        :return: Dicts with id, display_name, original_filename, text_path,
+            created_at and segment_count, ordered by display_name
+        :rtype: list[dict]
         """
-        rel = self._to_rel_path(text_path)
-        cur = self.conn.execute(
-            "SELECT id, display_name FROM documents WHERE text_path = ?",
-            (rel,),
-        )
-        row = cur.fetchone()
-        return row
+        where = "" if document_id is None else "WHERE d.id = ?"
+        params = () if document_id is None else (document_id,)
+        rows = self.conn.execute(
+            f"""
+            SELECT
+                d.id,
+                d.display_name,
+                d.original_filename,
+                d.text_path,
+                d.created_at,
+                COALESCE(st.segment_count, 0) AS segment_count
+            FROM documents AS d
+            LEFT JOIN document_stats AS st ON st.document_id = d.id
+            {where}
+            ORDER BY d.display_name COLLATE NOCASE, d.id
+            """,
+            params,
+        ).fetchall()
+        return [dict(row) for row in rows]
     
     def get_document_path(self, document_id: int) -> Path:
         row = self.conn.execute(
@@ -122,15 +279,231 @@ class ProjectRepository:
             "DELETE FROM coded_segments WHERE document_id = ?",
             (document_id,),
         )
+        self.conn.execute(
+            "DELETE FROM document_pages WHERE document_id = ?",
+            (document_id,),
+        )
+        self.conn.execute(
+            "DELETE FROM document_sources WHERE document_id = ?",
+            (document_id,),
+        )
         cur_docs = self.conn.execute(
             "DELETE FROM documents WHERE id = ?",
             (document_id,),
         )
-        self.conn.commit()
+        self._commit()
+        self.text_service.invalidate(document_id)
+        self.events.publish(DocumentDeleted(document_id))
 
         logger.info("[DB] Deleting document document_id=%s from database and texts_dir, %d coded_segments", document_id, cur_segments.rowcount)
         return cur_docs.rowcount, self.texts_dir / text_path
 
+    def allocate_text_paths(self, count: int = 1) -> list[Path]:
+        """
+        Reserve count unique canonical text paths (doc-0001.txt, ...) from
+        the project's text sequence. The counter is bumped in a write
+        transaction, so concurrent connections never receive the same name,
+        and numbers are never reused after a document is deleted. Names whose
+        file already exists (left behind by an interrupted import) are passed
+        over.
+
+        :return: Absolute paths under texts_dir, none of which exist yet
+        :rtype: list[Path]
+        """
+        paths = []
+        while len(paths) < count:
+            needed = count - len(paths)
+            with self.transaction():
+                self.conn.execute(
+                    "UPDATE text_sequence SET value = value + ? WHERE name = 'texts'",
+                    (needed,),
+                )
+                last = self.conn.execute(
+                    "SELECT value FROM text_sequence WHERE name = 'texts'"
+                ).fetchone()["value"]
+
+            for number in range(last - needed + 1, last + 1):
+                path = self.texts_dir / TEXT_NAME_TEMPLATE.format(number)
+                if path.exists():
+                    logger.warning("allocate_text_paths: %s already exists, skipping", path.name)
+                    continue
+                paths.append(path)
+        return paths
+
+    # ---- content hashes --------------------------------------------
+    def get_source_hashes(self) -> dict[str, int]:
+        """
+        Return every known source file hash mapped to its document id, for
+        skipping sources that were already imported.
+        """
+        rows = self.conn.execute("SELECT source_hash, document_id FROM document_sources").fetchall()
+        return {row["source_hash"]: row["document_id"] for row in rows}
+
+    def get_document_hashes(self) -> list[dict]:
+        """
+        Return id, original_filename, source_hash, text_hash and
+        segment_count for every document, in id order.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT
+                d.id,
+                d.original_filename,
+                d.source_hash,
+                d.text_hash,
+                (SELECT COUNT(*) FROM coded_segments s WHERE s.document_id = d.id) AS segment_count
+            FROM documents d
+            ORDER BY d.id
+            """
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_text_hash(self, document_id: int) -> str | None:
+        """
+        Return the SHA-256 of a document's canonical text, or None if it
+        was imported before hashes were recorded.
+
+        :raises KeyError: if the document is not registered
+        """
+        row = self.conn.execute(
+            "SELECT text_hash FROM documents WHERE id = ?",
+            (document_id,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No document with id {document_id}")
+        return row["text_hash"]
+
+    def link_document_source(self, document_id: int, source_hash: str, original_filename: str) -> None:
+        """
+        Record that a source file produces the same text as an existing
+        document, so later imports of it are skipped.
+        """
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO document_sources (
+                source_hash, document_id, original_filename, linked_at
+            )
+            VALUES (?, ?, ?, datetime('now'))
+            """,
+            (source_hash, document_id, original_filename),
+        )
+        self._commit()
+
+    def refresh_document(
+        self,
+        document_id: int,
+        source_hash: str,
+        text_hash: str,
+        page_offsets: Iterable[int] = (),
+    ) -> None:
+        """
+        Update a document whose text file was replaced by a re-import: new
+        hashes, page index and source mapping. Offsets of existing coded
+        segments are not adjusted, so callers only refresh uncoded documents.
+        """
+        with self.transaction():
+            self.conn.execute(
+                "UPDATE documents SET source_hash = ?, text_hash = ? WHERE id = ?",
+                (source_hash, text_hash, document_id),
+            )
+            self.conn.execute(
+                "DELETE FROM document_sources WHERE document_id = ?",
+                (document_id,),
+            )
+            row = self.conn.execute(
+                "SELECT original_filename FROM documents WHERE id = ?",
+                (document_id,),
+            ).fetchone()
+            self.link_document_source(document_id, source_hash, row["original_filename"])
+            self.add_document_pages(document_id, page_offsets)
+            self.events.publish(DocumentTextChanged(document_id))
+        self.text_service.invalidate(document_id)
+
+    def backfill_text_hashes(self) -> int:
+        """
+        Hash the canonical texts of documents imported before hashes were
+        recorded. Missing text files are left unhashed.
+
+        :return: Number of documents hashed
+        :rtype: int
+        """
+        rows = self.conn.execute(
+            "SELECT id, text_path FROM documents WHERE text_hash IS NULL"
+        ).fetchall()
+
+        hashed = []
+        for row in rows:
+            path = self._abs_from_db(row["text_path"])
+            try:
+                hashed.append((hash_file(path), row["id"]))
+            except OSError:
+                logger.warning("backfill_text_hashes: cannot read %s", path)
+
+        if hashed:
+            with self.transaction():
+                self.conn.executemany(
+                    "UPDATE documents SET text_hash = ? WHERE id = ?",
+                    hashed,
+                )
+            logger.info("backfill_text_hashes: hashed %d documents", len(hashed))
+        return len(hashed)
+
+    # ---- document pages --------------------------------------------
+    def add_document_pages(self, document_id: int, page_offsets: Iterable[int]) -> int:
+        """
+        Record where each page of a paginated source starts in the document's
+        canonical text, replacing any previous page index.
+
+        :param page_offsets: Start offset of page 1, 2, ... in order
+        :type page_offsets: Iterable[int]
+        :return: Number of pages recorded
+        :rtype: int
+        """
+        rows = [
+            (document_id, page_number, start_offset)
+            for page_number, start_offset in enumerate(page_offsets, start=1)
+        ]
+        with self.transaction():
+            self.conn.execute(
+                "DELETE FROM document_pages WHERE document_id = ?",
+                (document_id,),
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO document_pages (document_id, page_number, start_offset)
+                VALUES (?, ?, ?)
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def lookup_page_number(self, document_id: int, offset: int) -> int | None:
+        """
+        Return the page containing a character offset, or None when the
+        document has no page index.
+        """
+        row = self.conn.execute(
+            """
+            SELECT page_number FROM document_pages
+            WHERE document_id = ? AND start_offset <= ?
+            ORDER BY start_offset DESC, page_number DESC
+            LIMIT 1
+            """,
+            (document_id, offset),
+        ).fetchone()
+        return row["page_number"] if row else None
+
+    def lookup_page_offset(self, document_id: int, page_number: int) -> int | None:
+        """
+        Return the character offset where a page starts, e.g. to scroll a
+        viewer to it, or None if the page is unknown.
+        """
+        row = self.conn.execute(
+            "SELECT start_offset FROM document_pages WHERE document_id = ? AND page_number = ?",
+            (document_id, page_number),
+        ).fetchone()
+        return row["start_offset"] if row else None
+
     def rename_document_db(self, new_display_name, document_id):
         """
         Send new display name for document by document id in database
@@ -145,7 +518,9 @@ class ProjectRepository:
             """,
             (new_display_name, document_id),
         )
-        self.conn.commit()
+        self._commit()
+        if cur.rowcount:
+            self.events.publish(DocumentRenamed(document_id, new_display_name))
 
         logger.info("[DB] rename_document_db: %d rows changed by rename_document_db", cur.rowcount)
 
@@ -201,7 +576,8 @@ class ProjectRepository:
             """,
             (code_id, label, parent_id, description, color, sort_order),
         )
-        self.conn.commit()
+        self._commit()
+        self.events.publish(CodeAdded(code_id))
         return code_id
     
     def update_code(self, code_id, label, parent_id, description, color):
@@ -216,7 +592,9 @@ class ProjectRepository:
             """,
             (label, parent_id, description, color, code_id),
         )
-        self.conn.commit()
+        self._commit()
+        if cur.rowcount:
+            self.events.publish(CodeUpdated(code_id))
         return cur.rowcount
     
     def delete_code(self, code_id):
@@ -226,7 +604,8 @@ class ProjectRepository:
 
         # Delete the code from the codes table
         self.conn.execute("DELETE FROM codes WHERE id = ?", (code_id,))
-        self.conn.commit()
+        self._commit()
+        self.events.publish(CodeDeleted(code_id))
 
 
     # ---- coded_segments --------------------------------------------
@@ -235,12 +614,13 @@ class ProjectRepository:
             """
             SELECT
                 cs.*,
+                c.label AS code_label,
                 c.color AS code_color
             FROM coded_segments AS cs
             LEFT JOIN codes AS c
                 ON cs.code_id = c.id
             WHERE cs.document_id = ?
-            ORDER BY cs.start_offset
+            ORDER BY cs.start_offset, cs.id
             """,
             (document_id,),
         ).fetchall()
@@ -262,46 +642,160 @@ class ProjectRepository:
             """,
             (document_id, str(code_id), start_offset, end_offset, memo),
         )
-        self.conn.commit()
+        self._commit()
+        self.events.publish(SegmentsAdded((
+            _segment_dict(cur.lastrowid, document_id, str(code_id), start_offset, end_offset),
+        )))
         return cur.lastrowid
     
+    def add_coded_segments(self, segments: Iterable[tuple]) -> list[int]:
+        """
+        Bulk version of add_coded_segment, inserting every segment with a
+        single executemany inside one transaction.
+
+        :param segments: (document_id, code_id, start_offset, end_offset) or
+            (document_id, code_id, start_offset, end_offset, memo) tuples
+        :type segments: Iterable[tuple]
+        :return: New segment ids, in input order
+        :rtype: list[int]
+        """
+        rows = []
+        for segment in segments:
+            document_id, code_id, start_offset, end_offset, *rest = segment
+            memo = rest[0] if rest else None
+            rows.append((document_id, str(code_id), start_offset, end_offset, memo))
+        if not rows:
+            return []
+
+        with self.transaction():
+            self.conn.executemany(
+                """
+                INSERT INTO coded_segments (
+                    document_id, code_id, start_offset, end_offset, memo, created_at
+                )
+                VALUES (?, ?, ?, ?, ?, datetime('now'))
+                """,
+                rows,
+            )
+            segment_ids = self._inserted_ids("coded_segments", len(rows))
+            self.events.publish(SegmentsAdded(tuple(
+                _segment_dict(segment_id, *row[:4]) for segment_id, row in zip(segment_ids, rows)
+            )))
+            return segment_ids
+
     def get_segment_at_position(self, document_id, pos):
-        row = self.conn.execute(
+        """
+        Return the innermost (shortest) segment covering pos, or None.
+        Use segments_at when every overlapping segment is needed.
+        """
+        rows = self.segments_at(document_id, pos)
+        if not rows:
+            return None
+        return min(rows, key=lambda row: row["end_offset"] - row["start_offset"])
+
+    def segments_at(self, document_id: int, pos: int):
+        """
+        Return every segment in the document covering character position pos
+        (start_offset <= pos <= end_offset), ordered by start_offset.
+
+        :param document_id: Document to search
+        :type document_id: int
+        :param pos: Character offset in the document's canonical text
+        :type pos: int
+        :return: sqlite Row objects with id, document_id, code_id, start_offset,
+            end_offset, code_label and code_color
+        :rtype: list[sqlite3.Row]
+        """
+        return self.segments_overlapping(document_id, pos, pos)
+
+    def segments_overlapping(self, document_id: int, start: int, end: int):
+        """
+        Return every segment in the document that overlaps the closed range
+        [start, end], ordered by start_offset.
+
+        Answered from the segment_index R*Tree, so the cost grows with the
+        number of matches rather than the number of segments in the document.
+
+        :param document_id: Document to search
+        :type document_id: int
+        :param start: First character offset of the range
+        :type start: int
+        :param end: Last character offset of the range
+        :type end: int
+        :return: sqlite Row objects with id, document_id, code_id, start_offset,
+            end_offset, code_label and code_color
+        :rtype: list[sqlite3.Row]
+        """
+        return self.conn.execute(
             """
-            SELECT id, code_id, start_offset, end_offset
-            FROM coded_segments
-            WHERE document_id = ?
-            AND start_offset <= ?
-            AND end_offset >= ?
-            LIMIT 1;
+            SELECT
+                cs.id,
+                cs.document_id,
+                cs.code_id,
+                cs.start_offset,
+                cs.end_offset,
+                c.label AS code_label,
+                c.color AS code_color
+            FROM segment_index AS si
+            JOIN coded_segments AS cs
+                ON cs.id = si.id
+            LEFT JOIN codes AS c
+                ON c.id = cs.code_id
+            WHERE si.document_min <= ?
+            AND si.document_max >= ?
+            AND si.start_offset <= ?
+            AND si.end_offset >= ?
+            ORDER BY cs.start_offset, cs.id;
             """,
-            (document_id, pos, pos),
-        ).fetchone()
-        return row
+            (document_id, document_id, end, start),
+        ).fetchall()
     
     def delete_segment(self, segment_id):
+        # Read first: the removal event carries where the segment was
+        removed = self._segments_by_id([segment_id])
         # Delete the segment from the coded_segment by segment_id
         self.conn.execute("DELETE FROM coded_segments WHERE id = ?", (segment_id,))
-        self.conn.commit()
+        self._commit()
+        if removed:
+            self.events.publish(SegmentsRemoved(tuple(removed)))
+
+    def delete_segments(self, segment_ids: Iterable[int]) -> int:
+        """
+        Delete many segments in one transaction.
+
+        :return: Count of segments deleted
+        :rtype: int
+        """
+        rows = [(segment_id,) for segment_id in segment_ids]
+        if not rows:
+            return 0
+
+        with self.transaction():
+            removed = self._segments_by_id([row[0] for row in rows])
+            cur = self.conn.executemany("DELETE FROM coded_segments WHERE id = ?", rows)
+            if removed:
+                self.events.publish(SegmentsRemoved(tuple(removed)))
+        return cur.rowcount
 
     # ---- analysis -------------------------------------------------
 
     def get_code_usage_overview(self):
+        """
+        Segment and distinct document counts per code, read from the
+        code_stats table that triggers keep current (one row per code).
+        """
         cursor=self.conn.execute(
             """
             SELECT
             c.id AS id,
             c.label,
             c.color,
-            COUNT(s.id) AS segment_count,
-            COUNT(DISTINCT s.document_id) AS document_count
+            COALESCE(st.segment_count, 0) AS segment_count,
+            COALESCE(st.document_count, 0) AS document_count
             FROM codes c
-            LEFT JOIN coded_segments s ON s.code_id = c.id
-            GROUP BY c.id, c.label, c.color
+            LEFT JOIN code_stats st ON st.code_id = c.id
             ORDER BY c.label;
             """)
-        self.conn.commit()
-        
         rows = cursor.fetchall()
 
         result = []
@@ -315,22 +809,58 @@ class ProjectRepository:
             })
 
         return result
+
+    def get_code_usage(self, code_ids: Iterable[str]) -> dict[str, tuple[int, int]]:
+        """
+        Segment and distinct document counts of some codes, for updating
+        their rows after a coding action without reading every code.
+
+        :return: code_id -> (segment_count, document_count); unknown ids are
+            left out
+        :rtype: dict[str, tuple[int, int]]
+        """
+        code_ids = [str(code_id) for code_id in code_ids]
+        usage = {}
+        for i in range(0, len(code_ids), SQL_VARIABLE_CHUNK):
+            chunk = code_ids[i:i + SQL_VARIABLE_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(
+                f"""
+                SELECT
+                    c.id,
+                    COALESCE(st.segment_count, 0),
+                    COALESCE(st.document_count, 0)
+                FROM codes c
+                LEFT JOIN code_stats st ON st.code_id = c.id
+                WHERE c.id IN ({placeholders})
+                """,
+                chunk,
+            ):
+                usage[row[0]] = (row[1], row[2])
+        return usage
     
-    def get_document_coding_overview(self):
+    def get_document_coding_overview(self, document_id: int | None = None):
+        """
+        Segment and distinct code counts per document, read from the
+        document_stats table that triggers keep current.
+
+        :param document_id: Only report this document
+        """
+        where = "" if document_id is None else "WHERE d.id = ?"
+        params = () if document_id is None else (document_id,)
         cursor=self.conn.execute(
-            """
+            f"""
             SELECT
             d.id AS id,
             d.display_name AS name,
             d.text_path AS path,
-            COUNT(s.id) AS segment_count,
-            COUNT(DISTINCT s.code_id) AS unique_codes
+            COALESCE(st.segment_count, 0) AS segment_count,
+            COALESCE(st.code_count, 0) AS unique_codes
             FROM documents d
-            LEFT JOIN coded_segments s ON s.document_id = d.id
-            GROUP BY d.id, d.display_name
+            LEFT JOIN document_stats st ON st.document_id = d.id
+            {where}
             ORDER BY d.display_name;
-            """)
-        self.conn.commit()
+            """, params)
         rows = cursor.fetchall()
 
         result = []
@@ -343,6 +873,107 @@ class ProjectRepository:
                 "unique_codes": row[4],
             })
         return(result)
+
+    def rebuild_statistics(self) -> None:
+        """
+        Recompute the code and document statistics tables from
+        coded_segments. The triggers keep them current; this is for recovery
+        if they ever disagree with the segments.
+        """
+        with self.transaction():
+            for statement in STATISTICS_REBUILD:
+                self.conn.execute(statement)
+        logger.info("rebuild_statistics: recomputed code and document statistics")
+
+    def check_integrity(self) -> dict:
+        """
+        Look for damage a crash, a disabled trigger or an edit outside Mise
+        could leave behind. Nothing is changed.
+
+        :return: Dict of problem lists, all empty for a healthy project:
+            database (SQLite integrity_check messages), missing_texts
+            (document ids whose text file cannot be read), orphan_segments
+            (segment ids whose document or code is gone), invalid_offsets
+            (segment ids with an empty, inverted or out-of-range span) and
+            stale_statistics (code and document ids whose stored counts
+            differ from their segments)
+        :rtype: dict
+        """
+        problems = {
+            "database": [],
+            "missing_texts": [],
+            "orphan_segments": [],
+            "invalid_offsets": [],
+            "stale_statistics": [],
+        }
+
+        messages = [row[0] for row in self.conn.execute("PRAGMA integrity_check")]
+        if messages != ["ok"]:
+            problems["database"] = messages
+
+        problems["orphan_segments"] = [
+            row[0] for row in self.conn.execute(
+                """
+                SELECT s.id
+                FROM coded_segments s
+                LEFT JOIN documents d ON d.id = s.document_id
+                LEFT JOIN codes c ON c.id = s.code_id
+                WHERE d.id IS NULL OR c.id IS NULL
+                ORDER BY s.id
+                """
+            )
+        ]
+
+        invalid = [
+            row[0] for row in self.conn.execute(
+                "SELECT id FROM coded_segments WHERE start_offset < 0 OR end_offset <= start_offset ORDER BY id"
+            )
+        ]
+        for document_id, text_path in self.conn.execute(
+            "SELECT id, text_path FROM documents ORDER BY id"
+        ).fetchall():
+            try:
+                # Not through text_service, which would write missing sidecar indexes
+                length = text_char_length(self._abs_from_db(text_path))
+            except (OSError, UnicodeDecodeError):
+                problems["missing_texts"].append(document_id)
+                continue
+            invalid.extend(
+                row[0] for row in self.conn.execute(
+                    "SELECT id FROM coded_segments WHERE document_id = ? AND end_offset > ?",
+                    (document_id, length),
+                )
+            )
+        problems["invalid_offsets"] = sorted(set(invalid))
+
+        problems["stale_statistics"] = [
+            row[0] for row in self.conn.execute(
+                """
+                SELECT c.id
+                FROM codes c
+                LEFT JOIN code_stats st ON st.code_id = c.id
+                LEFT JOIN (
+                    SELECT code_id, COUNT(*) AS segments, COUNT(DISTINCT document_id) AS documents
+                    FROM coded_segments
+                    GROUP BY code_id
+                ) a ON a.code_id = c.id
+                WHERE COALESCE(st.segment_count, 0) != COALESCE(a.segments, 0)
+                   OR COALESCE(st.document_count, 0) != COALESCE(a.documents, 0)
+                UNION ALL
+                SELECT d.id
+                FROM documents d
+                LEFT JOIN document_stats st ON st.document_id = d.id
+                LEFT JOIN (
+                    SELECT document_id, COUNT(*) AS segments, COUNT(DISTINCT code_id) AS codes
+                    FROM coded_segments
+                    GROUP BY document_id
+                ) a ON a.document_id = d.id
+                WHERE COALESCE(st.segment_count, 0) != COALESCE(a.segments, 0)
+                   OR COALESCE(st.code_count, 0) != COALESCE(a.codes, 0)
+                """
+            )
+        ]
+        return problems
     
     def get_segments_for_code(self, code_id: int):
         cursor = self.conn.execute(
@@ -353,7 +984,13 @@ class ProjectRepository:
                 d.display_name AS name,
                 d.text_path AS path,
                 s.start_offset,
-                s.end_offset                                                                                        n
+                s.end_offset,
+                (
+                    SELECT p.page_number FROM document_pages p
+                    WHERE p.document_id = s.document_id AND p.start_offset <= s.start_offset
+                    ORDER BY p.start_offset DESC, p.page_number DESC
+                    LIMIT 1
+                ) AS page_number
             FROM coded_segments s
             JOIN documents d ON d.id = s.document_id
             WHERE s.code_id = ?
@@ -373,10 +1010,251 @@ class ProjectRepository:
                 "text_path": row[3],
                 "start_offset": row[4],
                 "end_offset": row[5],
+                "page_number": row[6],
                 # snippet can be computed later
             })
         return result
     
+    def get_segments_for_code_page(
+        self,
+        code_id: str,
+        after: tuple[str, int, int, int] | None = None,
+        limit: int = 200,
+    ) -> list[dict]:
+        """
+        One page of a code's segments, grouped by document in display name
+        order (as in reports) and by position within each document, using
+        keyset pagination so deep pages don't re-read the rows before them.
+
+        :param after: (display_name, document_id, start_offset, id) of the
+            last segment of the previous page, or None for the first page
+        :return: Dicts with segment_id, document_id, display_name,
+            start_offset, end_offset and page_number
+        :rtype: list[dict]
+        """
+        # The name bound lets the documents index skip earlier documents;
+        # the row value picks up within the last page's document
+        where = "" if after is None else (
+            "AND d.display_name >= ? COLLATE NOCASE"
+            " AND (d.display_name COLLATE NOCASE, s.document_id, s.start_offset, s.id) > (?, ?, ?, ?)"
+        )
+        params = (str(code_id), *((after[0], *after) if after is not None else ()), limit)
+
+        rows = self.conn.execute(
+            f"""
+            SELECT
+                s.id AS segment_id,
+                s.document_id,
+                d.display_name,
+                s.start_offset,
+                s.end_offset,
+                (
+                    SELECT p.page_number FROM document_pages p
+                    WHERE p.document_id = s.document_id AND p.start_offset <= s.start_offset
+                    ORDER BY p.start_offset DESC, p.page_number DESC
+                    LIMIT 1
+                ) AS page_number
+            FROM documents d
+            CROSS JOIN coded_segments s ON s.document_id = d.id
+            WHERE s.code_id = ?
+              {where}
+            ORDER BY d.display_name COLLATE NOCASE, d.id, s.start_offset, s.id
+            LIMIT ?
+            """,
+            params,
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_segments_for_codes(self, code_ids: Iterable[str]) -> Iterator[dict]:
+        """
+        Stream the segments of several codes from one query, grouped by
+        document (ordered by display name) and by position within each, so
+        a reader can go through every document once.
+
+        Rows are yielded as SQLite produces them rather than fetched into a
+        list; the generator must be exhausted or closed before the
+        connection is used for writes.
+
+        :return: Dicts with segment_id, document_id, display_name,
+            text_path, code_id, start_offset, end_offset and page_number
+        :rtype: Iterator[dict]
+        """
+        code_ids = [str(code_id) for code_id in code_ids]
+        if not code_ids:
+            return
+
+        placeholders = ", ".join("?" for _ in code_ids)
+        cursor = self.conn.execute(
+            f"""
+            SELECT
+                s.id AS segment_id,
+                s.document_id,
+                d.display_name,
+                d.text_path,
+                s.code_id,
+                s.start_offset,
+                s.end_offset,
+                (
+                    SELECT p.page_number FROM document_pages p
+                    WHERE p.document_id = s.document_id AND p.start_offset <= s.start_offset
+                    ORDER BY p.start_offset DESC, p.page_number DESC
+                    LIMIT 1
+                ) AS page_number
+            FROM coded_segments s
+            JOIN documents d ON d.id = s.document_id
+            WHERE s.code_id IN ({placeholders})
+            ORDER BY d.display_name COLLATE NOCASE, s.document_id, s.start_offset, s.id
+            """,
+            code_ids,
+        )
+        try:
+            for row in cursor:
+                yield dict(row)
+        finally:
+            cursor.close()
+
+    def get_segment_spans(self, document_id: int | None = None) -> list[tuple]:
+        """
+        Every segment as a plain (document_id, code_id, start_offset,
+        end_offset) tuple, ordered by document and start, for the
+        vectorised analyses. Tuples skip the sqlite3.Row wrapper, which
+        matters at a million segments.
+
+        :param document_id: Only this document's segments
+        :rtype: list[tuple]
+        """
+        where = "" if document_id is None else "WHERE document_id = ?"
+        params = () if document_id is None else (document_id,)
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        try:
+            return cursor.execute(
+                f"""
+                SELECT document_id, code_id, start_offset, end_offset
+                FROM coded_segments
+                {where}
+                ORDER BY document_id, start_offset
+                """,
+                params,
+            ).fetchall()
+        finally:
+            cursor.close()
+
+    def get_document_segment_spans(self, document_ids: Iterable[int]) -> list[tuple]:
+        """
+        get_segment_spans for some documents only, queried in chunks of
+        ids so the cost follows the documents asked for, not the project.
+
+        :rtype: list[tuple]
+        """
+        document_ids = sorted(set(document_ids))
+        spans = []
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        try:
+            for i in range(0, len(document_ids), SQL_VARIABLE_CHUNK):
+                chunk = document_ids[i:i + SQL_VARIABLE_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                spans.extend(cursor.execute(
+                    f"""
+                    SELECT document_id, code_id, start_offset, end_offset
+                    FROM coded_segments
+                    WHERE document_id IN ({placeholders})
+                    ORDER BY document_id, start_offset
+                    """,
+                    chunk,
+                ))
+        finally:
+            cursor.close()
+        return spans
+
+    def get_stale_coverage_documents(self, document_id: int | None = None) -> list[int]:
+        """
+        Ids of documents whose cached coverage was invalidated (or never
+        computed); see analysis.coverage.
+
+        :param document_id: Only check this document
+        :rtype: list[int]
+        """
+        where = "" if document_id is None else "AND d.id = ?"
+        params = () if document_id is None else (document_id,)
+        rows = self.conn.execute(
+            f"""
+            SELECT d.id
+            FROM documents d
+            LEFT JOIN coverage_documents cd ON cd.document_id = d.id
+            WHERE cd.document_id IS NULL {where}
+            ORDER BY d.id
+            """,
+            params,
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def store_coverage(self, documents: list[tuple], codes: Iterable[tuple]) -> None:
+        """
+        Cache computed coverage, replacing whatever is stored for the
+        documents given.
+
+        :param documents: (document_id, text_length, coded_chars) per document
+        :param codes: (document_id, code_id, coded_chars) per code used in them
+        """
+        with self.transaction():
+            self.conn.executemany(
+                "DELETE FROM coverage_codes WHERE document_id = ?",
+                ((document_id,) for document_id, _, _ in documents),
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO coverage_documents (document_id, text_length, coded_chars) VALUES (?, ?, ?)",
+                documents,
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO coverage_codes (document_id, code_id, coded_chars) VALUES (?, ?, ?)",
+                codes,
+            )
+
+    def get_document_coverage(self, document_id: int | None = None) -> list[dict]:
+        """
+        Cached coverage per document, ordered by display name. text_length
+        and coded_chars are None for documents not computed yet.
+
+        :param document_id: Only this document
+        :return: Dicts with doc_id, display_name, text_length and coded_chars
+        :rtype: list[dict]
+        """
+        where = "" if document_id is None else "WHERE d.id = ?"
+        params = () if document_id is None else (document_id,)
+        rows = self.conn.execute(
+            f"""
+            SELECT
+                d.id AS doc_id,
+                d.display_name,
+                cd.text_length,
+                cd.coded_chars
+            FROM documents d
+            LEFT JOIN coverage_documents cd ON cd.document_id = d.id
+            {where}
+            ORDER BY d.display_name COLLATE NOCASE, d.id
+            """,
+            params,
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_code_coverage(self) -> list[tuple]:
+        """
+        Cached characters covered per (document, code) pair in use.
+
+        :return: (document_id, code_id, coded_chars) tuples
+        :rtype: list[tuple]
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        try:
+            return cursor.execute(
+                "SELECT document_id, code_id, coded_chars FROM coverage_codes"
+            ).fetchall()
+        finally:
+            cursor.close()
+
     def get_code_metadata(self, code_id: int):
         cursor = self.conn.execute(
             """
@@ -384,12 +1262,11 @@ class ProjectRepository:
                 c.id          AS id,
                 c.label       AS label,
                 c.color       AS color,
-                COUNT(s.id)   AS segment_count,
-                COUNT(DISTINCT s.document_id) AS document_count
+                COALESCE(st.segment_count, 0)  AS segment_count,
+                COALESCE(st.document_count, 0) AS document_count
             FROM codes c
-            LEFT JOIN coded_segments s ON s.code_id = c.id
+            LEFT JOIN code_stats st ON st.code_id = c.id
             WHERE c.id = ?
-            GROUP BY c.id, c.label, c.color
             """,
             (code_id,)
         )
@@ -398,6 +1275,35 @@ class ProjectRepository:
             return None
         return dict(row)
     
+    # ---- internal helpers -----------------------------------------
+    def _segments_by_id(self, segment_ids: list[int]) -> list[dict]:
+        """Event payloads for existing segments, queried in chunks."""
+        found = []
+        for i in range(0, len(segment_ids), SQL_VARIABLE_CHUNK):
+            chunk = segment_ids[i:i + SQL_VARIABLE_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(
+                f"""
+                SELECT id, document_id, code_id, start_offset, end_offset
+                FROM coded_segments
+                WHERE id IN ({placeholders})
+                """,
+                chunk,
+            ):
+                found.append(_segment_dict(*row))
+        return found
+
+    def _inserted_ids(self, table: str, count: int) -> list[int]:
+        """
+        Ids of the last `count` rows inserted into table by executemany.
+
+        Only valid inside the transaction that did the insert: the write lock
+        is held, and SQLite assigns max(id) + 1 to each new row, so the batch
+        occupies the top `count` ids.
+        """
+        last_id = self.conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0]
+        return list(range(last_id - count + 1, last_id + 1))
+
     # ---- internal path helpers ------------------------------------
     def _to_rel_path(self, path: Path) -> str:
         """Store paths as POSIX-style relative paths under texts_dir."""
@@ -426,4 +1332,15 @@ class ProjectRepository:
 
     # ---- lifecycle -------------------------------------------------
     def close(self) -> None:
-        self.conn.close()
\ No newline at end of file
+        self.text_service.clear()
+        self.conn.close()
+
+def _segment_dict(segment_id, document_id, code_id, start_offset, end_offset) -> dict:
+    """Payload of SegmentsAdded / SegmentsRemoved for one segment."""
+    return {
+        "id": segment_id,
+        "document_id": document_id,
+        "code_id": code_id,
+        "start_offset": start_offset,
+        "end_offset": end_offset,
+    }
@@ -0,0 +1,159 @@
+"""
+Streaming HTML code reports.
+
+A report lists, for each selected code, its segments grouped by document.
+write_code_report reads the segments of every selected code from one query
+ordered by document, so each document's text is opened once (the text
+service keeps it mapped or cached while its segments are read). Segments
+arrive in document order but the report is laid out by code, so each code's
+section is written as it goes to its own spooled temporary file, which stays
+in memory while small and moves to disk when it grows. The sections are then
+copied one after another into the single output file between the two halves
+of the template. Memory use is bounded by the spool size per code, not by
+the number of segments.
+
+Usage:
+summary = write_code_report(repo, code_ids, out_path, project_name)
+"""
+from __future__ import annotations
+
+import shutil
+from datetime import datetime
+from html import escape
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+from .paths import ASSETS_DIR
+
+import logging
+logger = logging.getLogger(__name__)
+
+TEMPLATE_PATH = ASSETS_DIR / "templates" / "template.html"
+LOGO_PATH = ASSETS_DIR / "mise.png"
+
+# A code's section is kept in memory up to this many characters before it is
+# spooled to a temporary file
+SPOOL_MAX_CHARS = 1 << 20
+
+DEFAULT_CODE_COLOR = "#cccccc"
+
+def write_code_report(repo, code_ids, out_path: Path, project_name: str) -> dict:
+    """
+    Write an HTML report of the given codes' segments to out_path.
+
+    :param repo: Open ProjectRepository
+    :param code_ids: Codes to report, in the order their sections appear;
+        unknown ids are skipped
+    :param out_path: File to write (overwritten)
+    :param project_name: Shown in the report header
+    :return: Dict with path, codes, documents and segments written
+    :rtype: dict
+    :raises OSError: if the template cannot be read or the report written
+    """
+    head, tail = _template_parts(project_name)
+
+    codes = []
+    for code_id in code_ids:
+        meta = repo.get_code_metadata(code_id)
+        if meta is None:
+            logger.warning("write_code_report: no code with id %r, skipping", code_id)
+            continue
+        codes.append(meta)
+
+    spools = {
+        code["id"]: SpooledTemporaryFile(max_size=SPOOL_MAX_CHARS, mode="w+", encoding="utf-8")
+        for code in codes
+    }
+    try:
+        counts = _spool_segments(repo, spools)
+
+        out_path = Path(out_path)
+        with out_path.open("w", encoding="utf-8") as out:
+            out.write(head)
+            for code in codes:
+                out.write(_code_header(code, project_name))
+                spool = spools[code["id"]]
+                spool.seek(0)
+                shutil.copyfileobj(spool, out)
+                out.write("</section>\n")
+            out.write(tail)
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+    logger.info(
+        "write_code_report: %d codes, %d segments from %d documents written to %r",
+        len(codes), counts["segments"], counts["documents"], out_path,
+    )
+    return {"path": out_path, "codes": len(codes), **counts}
+
+def default_report_path(project_root: Path) -> Path:
+    """A new timestamped report file in project_root/reports/ (created if needed)."""
+    reports_dir = Path(project_root) / "reports"
+    reports_dir.mkdir(exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return reports_dir / f"code-report-{timestamp}.html"
+
+# ---- internal helpers ------------------------------------------------------
+def _template_parts(project_name: str) -> tuple[str, str]:
+    """Template text before and after {{CONTENT}}, with the header filled in."""
+    template = TEMPLATE_PATH.read_text(encoding="utf-8")
+    template = template.replace("{{PROJECT_NAME}}", escape(project_name))
+    template = template.replace("{{LOGO_PATH}}", LOGO_PATH.as_uri())
+
+    head, marker, tail = template.partition("{{CONTENT}}")
+    if not marker:
+        # fallback: append at end
+        return template + "\n", ""
+    return head, tail
+
+def _spool_segments(repo, spools: dict) -> dict:
+    """Write every segment of the spooled codes to its code's spool."""
+    text_service = repo.text_service
+    # Document whose heading each code's spool last received
+    current_document = {}
+    documents = set()
+    segments = 0
+
+    for seg in repo.iter_segments_for_codes(spools):
+        code_id = seg["code_id"]
+        document_id = seg["document_id"]
+        spool = spools[code_id]
+
+        if current_document.get(code_id) != document_id:
+            current_document[code_id] = document_id
+            spool.write(f"<h3>{escape(seg['display_name'])}</h3>\n")
+        documents.add(document_id)
+
+        start = seg["start_offset"]
+        end = seg["end_offset"]
+        try:
+            snippet = escape(text_service.get_snippet(document_id, start, end))
+        except (KeyError, OSError) as e:
+            snippet = "[Error reading snippet]"
+            logger.warning("Error reading snippet for %s: %s", seg["text_path"], e)
+
+        page = f" | Page: {seg['page_number']}" if seg["page_number"] is not None else ""
+        spool.write(
+            "<div class='segment'>\n"
+            f"  <div class='segment-header'>Offsets: {start}–{end}{page} | Path: {escape(seg['text_path'])}</div>\n"
+            f"  <div class='snippet'>{snippet}</div>\n"
+            "</div>\n"
+        )
+        segments += 1
+
+    return {"documents": len(documents), "segments": segments}
+
+def _code_header(code: dict, project_name: str) -> str:
+    code_label = escape(code["label"])
+    code_color = escape(code["color"] or DEFAULT_CODE_COLOR)
+    document_count = code["document_count"]
+    return (
+        f"<section>\n"
+        f"<h2><span class='code-badge' "
+        f"style='border-color:{code_color};background:{code_color}22;'>"
+        f"{code_label}</span></h2>\n"
+        f"<p>Project: {escape(project_name)}</p>\n"
+        f"<p>Segments: {code['segment_count']}"
+        + (f" | Documents: {document_count}</p>\n" if document_count else "</p>\n")
+    )
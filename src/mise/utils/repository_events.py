@@ -0,0 +1,142 @@
+"""
+Change notifications published by ProjectRepository.
+
+Mutating repository methods publish a typed event naming what changed
+(segment, code or document ids) on repo.events. Views subscribe to the event
+types they display and apply the change to the rows or ranges it touches
+instead of reloading everything.
+
+Events published inside repo.transaction() are held until the outermost
+block commits and dropped if it (or the savepoint they were published in)
+rolls back, so subscribers only ever see committed state.
+
+Usage:
+repo.events.subscribe(self._on_segments_changed, SegmentsAdded, SegmentsRemoved)
+"""
+from __future__ import annotations
+
+import weakref
+from collections.abc import Callable
+from typing import NamedTuple
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ---- events ----------------------------------------------------------------
+class SegmentsAdded(NamedTuple):
+    """Segments were coded. Each is a dict with id, document_id, code_id, start_offset and end_offset."""
+    segments: tuple
+
+    @property
+    def document_ids(self) -> frozenset:
+        return frozenset(segment["document_id"] for segment in self.segments)
+
+    @property
+    def code_ids(self) -> frozenset:
+        return frozenset(segment["code_id"] for segment in self.segments)
+
+class SegmentsRemoved(NamedTuple):
+    """Segments were deleted; same payload as SegmentsAdded, read before deletion."""
+    segments: tuple
+
+    document_ids = SegmentsAdded.document_ids
+    code_ids = SegmentsAdded.code_ids
+
+class CodeAdded(NamedTuple):
+    code_id: str
+
+class CodeUpdated(NamedTuple):
+    """Label, parent, description or colour of a code changed."""
+    code_id: str
+
+class CodeDeleted(NamedTuple):
+    """A code and every segment coded with it were deleted."""
+    code_id: str
+
+class DocumentsAdded(NamedTuple):
+    document_ids: tuple
+
+class DocumentRenamed(NamedTuple):
+    document_id: int
+    display_name: str
+
+class DocumentDeleted(NamedTuple):
+    """A document and its segments were deleted."""
+    document_id: int
+
+class DocumentTextChanged(NamedTuple):
+    """A document's canonical text was replaced by a re-import."""
+    document_id: int
+
+# ---- bus -------------------------------------------------------------------
+class RepositoryEvents:
+    """
+    Synchronous publish/subscribe for one repository.
+
+    Bound methods are held weakly, so a subscribed view does not outlive its
+    widget because of the bus; other callables are held strongly until
+    unsubscribed. An exception in one subscriber is logged and does not stop
+    delivery to the others.
+    """
+    def __init__(self):
+        # (event types or None for all, callable or WeakMethod, is_weak)
+        self._subscribers: list[tuple[tuple | None, object, bool]] = []
+        self._pending: list = []
+        # len(_pending) when each open transaction level began
+        self._marks: list[int] = []
+
+    def subscribe(self, callback: Callable, *event_types: type) -> Callable[[], None]:
+        """
+        Call callback(event) for every committed event of the given types
+        (all events if none are given).
+
+        :return: A function that removes this subscription
+        :rtype: Callable[[], None]
+        """
+        is_weak = hasattr(callback, "__self__") and hasattr(callback, "__func__")
+        ref = weakref.WeakMethod(callback) if is_weak else callback
+        entry = (event_types or None, ref, is_weak)
+        self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+        return unsubscribe
+
+    def publish(self, event) -> None:
+        """Deliver an event now, or when the enclosing transaction commits."""
+        if self._marks:
+            self._pending.append(event)
+        else:
+            self._deliver(event)
+
+    # ---- transaction hooks (called by ProjectRepository.transaction) --------
+    def begin(self) -> None:
+        self._marks.append(len(self._pending))
+
+    def commit(self) -> None:
+        self._marks.pop()
+        if self._marks:
+            return
+        pending, self._pending = self._pending, []
+        for event in pending:
+            self._deliver(event)
+
+    def rollback(self) -> None:
+        del self._pending[self._marks.pop():]
+
+    # ---- internal helpers --------------------------------------------------
+    def _deliver(self, event) -> None:
+        for entry in list(self._subscribers):
+            event_types, ref, is_weak = entry
+            if event_types is not None and not isinstance(event, event_types):
+                continue
+            callback = ref() if is_weak else ref
+            if callback is None:
+                # Subscriber was garbage collected
+                self._subscribers.remove(entry)
+                continue
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("RepositoryEvents: subscriber %r failed on %r", callback, event)
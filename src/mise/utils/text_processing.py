@@ -1,5 +1,11 @@
-import pandas as pd
-# from nltk.tokenize import sent_tokenize, word_tokenize
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .tokenizer import GRANULARITIES, tokenize
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 import logging
 logger = logging.getLogger(__name__)
@@ -13,26 +19,31 @@ def documentTokenizer(text: str, granularity: str = "sentence") -> pd.DataFrame:
         granularity (str): Granularity level for tokenization ("sentence" or "word").
 
     Returns:
-        pd.DataFrame: A DataFrame with 'index', 'tokens', and 'Codes' columns.
+        pd.DataFrame: A DataFrame with 'index', 'tokens', 'start', 'end' and
+        'Codes' columns; start and end are character offsets into text.
+
+    For large texts prefer tokenizer.tokenize or token_cache.TokenCache,
+    which keep only the offsets.
     """
     # Validate input
     if not isinstance(text, str):
         raise TypeError("Text must be of type str.")
     if not text.strip():
         raise ValueError("Text must not be empty or whitespace.")
-    if granularity not in ["sentence", "word"]:
+    if granularity not in GRANULARITIES:
         raise ValueError('Granularity must be "sentence" or "word".')
 
-    # Tokenize text based on granularity
-    if granularity == "sentence":
-        tokens = sent_tokenize(text)
-    else:
-        tokens = word_tokenize(text)
+    spans = tokenize(text, granularity)
+
+    # pandas is heavy; load it on first use
+    import pandas as pd
 
     # Construct the DataFrame
     data = {
-        'index': list(range(len(tokens))),
-        'tokens': tokens,
-        'Codes': [[] for _ in range(len(tokens))]
+        'index': range(spans.size),
+        'tokens': list(spans.strings(text)),
+        'start': spans.starts,
+        'end': spans.ends,
+        'Codes': [[] for _ in range(spans.size)]
     }
     return pd.DataFrame(data)
\ No newline at end of file
@@ -0,0 +1,295 @@
+"""
+Canonical text files with a character-to-byte offset sidecar.
+
+Segment offsets are character positions, but UTF-8 is variable width, so
+finding character N normally means decoding everything before it. Each text in
+texts/ gets a sidecar index (doc-0001.txt -> doc-0001.idx) recording the byte
+offset of every OFFSET_INDEX_STRIDE-th character. TextStoreReader memory-maps
+the text and decodes only the stride blocks covering a requested window, so a
+200 character excerpt costs the same in a 20 MB transcript as in a 2 KB one.
+
+Sidecar layout (little-endian):
+    header   magic b"MIDX", version u32, stride u32, char_length u64, byte_length u64
+    offsets  u64 byte offset of character k * stride, for k in 0..ceil(char_length / stride)
+"""
+from __future__ import annotations
+
+import codecs
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+import logging
+logger = logging.getLogger(__name__)
+
+OFFSET_INDEX_STRIDE = 1024
+OFFSET_INDEX_SUFFIX = ".idx"
+
+_INDEX_MAGIC = b"MIDX"
+_INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sIIQQ")
+_READ_CHUNK_BYTES = 1024 * 1024
+
+def index_path_for(text_path: Path) -> Path:
+    """Sidecar index path for a canonical text file."""
+    return Path(text_path).with_suffix(OFFSET_INDEX_SUFFIX)
+
+class OffsetIndexBuilder:
+    """
+    Builds the offset index incrementally from text fed in order, so writers
+    can index a document while streaming it to disk.
+    """
+    def __init__(self, stride: int = OFFSET_INDEX_STRIDE):
+        self.stride = stride
+        self.offsets = array("Q")
+        self.char_length = 0
+        self.byte_length = 0
+
+    def feed(self, text: str) -> None:
+        i = 0
+        n = len(text)
+        while i < n:
+            position_in_block = self.char_length % self.stride
+            if position_in_block == 0:
+                self.offsets.append(self.byte_length)
+            take = min(n - i, self.stride - position_in_block)
+            piece = text[i:i + take]
+            self.byte_length += len(piece.encode("utf-8"))
+            self.char_length += take
+            i += take
+
+    def write(self, index_path: Path) -> None:
+        offsets = self.offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+
+        header = _INDEX_HEADER.pack(
+            _INDEX_MAGIC, _INDEX_VERSION, self.stride, self.char_length, self.byte_length
+        )
+        with open(index_path, "wb") as f:
+            f.write(header)
+            offsets.tofile(f)
+
+class TextStoreWriter:
+    """
+    Write a canonical text file and its offset index in one pass.
+
+    Usage:
+    with TextStoreWriter(dest_path) as writer:
+        for page in pages:
+            writer.write(page)
+    """
+    def __init__(self, text_path: Path):
+        self.text_path = Path(text_path)
+        self._builder = OffsetIndexBuilder()
+        self._hasher = hashlib.sha256()
+        # newline="" keeps "\n" as one byte on every platform, so character
+        # offsets and byte offsets describe the same file
+        self._file = open(self.text_path, "w", encoding="utf-8", newline="")
+
+    @property
+    def char_length(self) -> int:
+        return self._builder.char_length
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 hex digest of the bytes written so far (same as hash_file)."""
+        return self._hasher.hexdigest()
+
+    def write(self, text: str) -> None:
+        self._file.write(text)
+        self._builder.feed(text)
+        self._hasher.update(text.encode("utf-8"))
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        self._builder.write(index_path_for(self.text_path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+def write_text_file(text_path: Path, text: str) -> None:
+    """Write a whole canonical text and its offset index."""
+    with TextStoreWriter(text_path) as writer:
+        writer.write(text)
+
+def sync_text_files(text_paths) -> None:
+    """
+    Flush texts and their offset indexes to disk, then the directories that
+    hold them, so renamed files survive a crash. Called once per import batch
+    before the batch is registered, rather than once per file.
+    """
+    directories = set()
+    for text_path in text_paths:
+        text_path = Path(text_path)
+        for path in (text_path, index_path_for(text_path)):
+            with open(path, "rb") as f:
+                os.fsync(f.fileno())
+        directories.add(text_path.parent)
+
+    # Directory entries (the renames) can only be synced on POSIX
+    if os.name == "nt":
+        return
+    for directory in directories:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def build_offset_index(text_path: Path) -> bool:
+    """
+    (Re)build the sidecar index for an existing text file, decoding it in
+    chunks so memory stays bounded.
+
+    Files with carriage returns (written by older versions on Windows) are
+    not indexed: their character offsets assume newline translation, which
+    raw byte offsets cannot express.
+
+    :return: True if an index was written
+    :rtype: bool
+    """
+    text_path = Path(text_path)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    builder = OffsetIndexBuilder()
+
+    with open(text_path, "rb") as f:
+        while True:
+            chunk = f.read(_READ_CHUNK_BYTES)
+            if b"\r" in chunk:
+                logger.info("build_offset_index: %r has CR line endings, not indexing", text_path)
+                return False
+            text = decoder.decode(chunk, final=not chunk)
+            builder.feed(text)
+            if not chunk:
+                break
+
+    builder.write(index_path_for(text_path))
+    logger.info("build_offset_index: indexed %r (%d chars)", text_path, builder.char_length)
+    return True
+
+def text_char_length(text_path: Path) -> int:
+    """
+    Length of a canonical text in characters, as DocumentTextService reads
+    it, without writing anything: from a valid sidecar index if there is
+    one, otherwise by decoding the file in chunks.
+
+    :raises OSError: if the text file cannot be read
+    :raises UnicodeDecodeError: if it is not valid UTF-8
+    """
+    text_path = Path(text_path)
+    loaded = _load_index(text_path)
+    if loaded is not None:
+        return loaded[1]
+
+    length = 0
+    # Universal newlines, like the unindexed get_text path
+    with open(text_path, encoding="utf-8") as f:
+        while chunk := f.read(_READ_CHUNK_BYTES):
+            length += len(chunk)
+    return length
+
+class TextStoreReader:
+    """
+    Random access to character windows of a canonical text file through a
+    memory map and its offset index.
+
+    Use TextStoreReader.open(), which builds a missing or stale index and
+    returns None for files that cannot be indexed.
+    """
+    def __init__(self, text_path: Path, stride: int, char_length: int, byte_length: int, offsets: array):
+        self.text_path = Path(text_path)
+        self.stride = stride
+        self.char_length = char_length
+        self.byte_length = byte_length
+        self._offsets = offsets
+
+        self._file = None
+        self._map = None
+        if byte_length:
+            self._file = open(self.text_path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def open(cls, text_path: Path) -> TextStoreReader | None:
+        text_path = Path(text_path)
+        loaded = _load_index(text_path)
+        if loaded is None:
+            if not build_offset_index(text_path):
+                return None
+            loaded = _load_index(text_path)
+            if loaded is None:
+                return None
+        return cls(text_path, *loaded)
+
+    def read(self, start: int, end: int) -> str:
+        """Return the characters in [start, end)."""
+        start = max(0, min(start, self.char_length))
+        end = max(start, min(end, self.char_length))
+        if start == end:
+            return ""
+
+        first_block = start // self.stride
+        last_block = -(-end // self.stride)  # ceil
+
+        byte_start = self._offsets[first_block]
+        if last_block < len(self._offsets):
+            byte_end = self._offsets[last_block]
+        else:
+            byte_end = self.byte_length
+
+        window = self._map[byte_start:byte_end].decode("utf-8")
+        base = first_block * self.stride
+        return window[start - base:end - base]
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def _load_index(text_path: Path):
+    """
+    Read the sidecar index for text_path.
+    Returns (stride, char_length, byte_length, offsets) or None if the
+    index is missing, unreadable or does not match the text file.
+    """
+    index_path = index_path_for(text_path)
+    try:
+        data = index_path.read_bytes()
+        file_size = text_path.stat().st_size
+    except OSError:
+        return None
+
+    if len(data) < _INDEX_HEADER.size:
+        return None
+
+    magic, version, stride, char_length, byte_length = _INDEX_HEADER.unpack_from(data)
+    if magic != _INDEX_MAGIC or version != _INDEX_VERSION or byte_length != file_size:
+        logger.info("TextStoreReader: stale or unknown index for %r", text_path)
+        return None
+
+    offsets = array("Q")
+    offsets.frombytes(data[_INDEX_HEADER.size:])
+    if sys.byteorder != "little":
+        offsets.byteswap()
+
+    if len(offsets) != -(-char_length // stride):
+        return None
+
+    return stride, char_length, byte_length, offsets
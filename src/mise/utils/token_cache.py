@@ -0,0 +1,179 @@
+"""
+Per-document token spans cached on disk, keyed by content hash.
+
+Tokenizing a transcript is cheap but not free, and every analysis that works
+on words or sentences needs the same spans. TokenCache tokenizes a document
+once and keeps the spans in the project's cache/tokens/ folder, named by the
+document's text_hash. The key changes whenever the text does, so re-imported
+documents are tokenized again, documents with identical text share one file
+and no invalidation is needed; prune() removes files no document uses.
+
+File layout (little-endian), cache/tokens/<text_hash>-<granularity>.tok:
+    header  magic b"MTOK", version u32, tokenizer version u32, count u64
+    starts  i64 start offset of each token
+    ends    i64 end offset of each token
+
+Usage:
+cache = TokenCache(repo)
+spans = cache.get(document_id, "sentence")
+for document_id, spans in cache.iter_corpus("word"):
+    ...
+"""
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterator
+
+from .tokenizer import GRANULARITIES, TOKENIZER_VERSION, TokenSpans, tokenize
+
+import logging
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_DIR = Path("cache") / "tokens"
+TOKEN_CACHE_SUFFIX = ".tok"
+
+_CACHE_MAGIC = b"MTOK"
+_CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct("<4sIIQ")
+_CACHE_ITEM_BYTES = array("q").itemsize
+
+class TokenCache:
+    """
+    Token spans of a project's documents, tokenized on first request and
+    read back from disk afterwards.
+
+    :param repo: Open ProjectRepository
+    :param cache_dir: Where to keep span files (default: PROJECT/cache/tokens)
+    """
+    def __init__(self, repo, cache_dir: Path | None = None):
+        self.repo = repo
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else repo.db_path.parent / TOKEN_CACHE_DIR
+
+    def get(self, document_id: int, granularity: str = "word") -> TokenSpans:
+        """
+        Token spans of one document.
+
+        :raises KeyError: if the document is not registered
+        :raises OSError: if its text cannot be read
+        :raises ValueError: for a granularity not in GRANULARITIES
+        """
+        return self._get(document_id, self.repo.get_text_hash(document_id), granularity)
+
+    def iter_corpus(self, granularity: str = "word") -> Iterator[tuple[int, TokenSpans]]:
+        """
+        Yield (document_id, spans) for every document in id order, tokenizing
+        only documents not cached yet. Documents whose text cannot be read are
+        logged and skipped.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+        # Old projects may have unhashed texts, which could not be cached
+        self.repo.backfill_text_hashes()
+
+        for document in self.repo.get_document_hashes():
+            try:
+                spans = self._get(document["id"], document["text_hash"], granularity)
+            except OSError as e:
+                logger.warning("TokenCache: cannot tokenize document_id=%s: %s", document["id"], e)
+                continue
+            yield document["id"], spans
+
+    def prune(self) -> int:
+        """
+        Delete cached spans of texts no document has any more.
+
+        :return: Number of files deleted
+        :rtype: int
+        """
+        if not self.cache_dir.is_dir():
+            return 0
+        live = {document["text_hash"] for document in self.repo.get_document_hashes()}
+
+        removed = 0
+        for path in self.cache_dir.glob(f"*{TOKEN_CACHE_SUFFIX}"):
+            text_hash = path.stem.rpartition("-")[0]
+            if text_hash in live:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError as e:
+                logger.warning("TokenCache: cannot delete %s: %s", path, e)
+        logger.info("TokenCache: pruned %d files", removed)
+        return removed
+
+    def _get(self, document_id: int, text_hash: str | None, granularity: str) -> TokenSpans:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of {GRANULARITIES}")
+
+        path = None
+        if text_hash is not None:
+            path = self.cache_dir / f"{text_hash}-{granularity}{TOKEN_CACHE_SUFFIX}"
+            spans = _read_spans(path)
+            if spans is not None:
+                return spans
+
+        spans = tokenize(self.repo.text_service.get_text(document_id), granularity)
+        if path is not None:
+            try:
+                _write_spans(path, spans)
+            except OSError as e:
+                # The spans are still good; they just get computed again next time
+                logger.warning("TokenCache: cannot write %s: %s", path, e)
+        logger.debug("TokenCache: tokenized document_id=%s (%d %ss)", document_id, spans.size, granularity)
+        return spans
+
+# ---- internal helpers ------------------------------------------------------
+def _write_spans(path: Path, spans: TokenSpans) -> None:
+    """Write spans to path atomically, so concurrent readers never see half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    starts, ends = spans.starts, spans.ends
+    if sys.byteorder != "little":
+        starts, ends = array("q", starts), array("q", ends)
+        starts.byteswap()
+        ends.byteswap()
+
+    header = _CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, TOKENIZER_VERSION, len(starts))
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            starts.tofile(f)
+            ends.tofile(f)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def _read_spans(path: Path) -> TokenSpans | None:
+    """
+    Spans cached at path, or None if the file is missing, unreadable or
+    was written by another tokenizer version.
+    """
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if len(data) < _CACHE_HEADER.size:
+        return None
+
+    magic, version, tokenizer_version, count = _CACHE_HEADER.unpack_from(data)
+    if (
+        magic != _CACHE_MAGIC
+        or version != _CACHE_VERSION
+        or tokenizer_version != TOKENIZER_VERSION
+    ):
+        logger.info("TokenCache: stale or unknown cache file %r", path)
+        return None
+    if len(data) - _CACHE_HEADER.size != 2 * count * _CACHE_ITEM_BYTES:
+        return None
+
+    columns = array("q")
+    columns.frombytes(data[_CACHE_HEADER.size:])
+    if sys.byteorder != "little":
+        columns.byteswap()
+    return TokenSpans(columns[:count], columns[count:])
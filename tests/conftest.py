@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from mise.database import initialize_database
+from mise.utils.project_repository import ProjectRepository
+
+@pytest.fixture(scope="session")
+def qapp():
+    """One QApplication for the whole run; Qt aborts if it is recreated."""
+    pytest.importorskip("PySide6")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+@pytest.fixture
+def repo(tmp_path):
+    """An empty project in tmp_path, with its texts/ folder."""
+    initialize_database(tmp_path)
+    texts_dir = tmp_path / "texts"
+    texts_dir.mkdir()
+    repo = ProjectRepository(tmp_path / "project.db", texts_dir)
+    yield repo
+    repo.close()
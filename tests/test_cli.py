@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from mise.cli import main
+from mise.project_init import init_project, open_repository
+
+@pytest.fixture
+def project(tmp_path):
+    project_root = init_project("demo", tmp_path)
+    repo = open_repository(project_root)
+    try:
+        path = repo.texts_dir / "doc-0001.txt"
+        path.write_text("alpha beta gamma", encoding="utf-8")
+        doc_id = repo.register_document("interview.md", path)
+        theme = repo.add_code("Theme")
+        other = repo.add_code("Other")
+        repo.add_coded_segments([(doc_id, theme, 0, 5), (doc_id, theme, 6, 10), (doc_id, other, 11, 16)])
+    finally:
+        repo.close()
+    return project_root
+
+def _run(capsys, *argv):
+    status = main(list(argv))
+    return status, capsys.readouterr().out
+
+def test_stats_are_printed_as_json(project, capsys):
+    status, out = _run(capsys, "stats", str(project))
+    stats = json.loads(out)
+
+    assert status == 0
+    assert stats["project"] == "demo"
+    assert stats["totals"] == {"codes": 2, "documents": 1, "segments": 3}
+    assert {code["label"]: code["segment_count"] for code in stats["codes"]} == {"Theme": 2, "Other": 1}
+
+def test_export_streams_segments_with_text(project, capsys):
+    status, out = _run(capsys, "export", str(project), "--codes", "Theme", "--format", "jsonl")
+    records = [json.loads(line) for line in out.splitlines()]
+
+    assert status == 0
+    assert [record["text"] for record in records] == ["alpha", "beta"]
+    assert {record["code"] for record in records} == {"Theme"}
+
+def test_export_coverage_matrix(project, capsys):
+    status, out = _run(capsys, "export", str(project), "--coverage", "chars")
+    header, row = out.splitlines()
+
+    assert status == 0
+    assert header == "document,Other,Theme,(text length),(any code)"
+    assert row == "interview.md,5,9,16,14"
+
+def test_report_writes_one_file(project, tmp_path, capsys):
+    out_path = tmp_path / "report.html"
+    status, out = _run(capsys, "report", str(project), "--all-codes", "--output", str(out_path))
+
+    assert status == 0
+    assert json.loads(out)["segments"] == 3
+    assert out_path.read_text(encoding="utf-8").count("<section>") == 2
+
+def test_check_reports_and_repairs_statistics(project, capsys):
+    status, out = _run(capsys, "check", str(project))
+    assert status == 0 and json.loads(out)["ok"]
+
+    repo = open_repository(project)
+    try:
+        repo.conn.execute("UPDATE code_stats SET segment_count = 7")
+        repo.conn.commit()
+    finally:
+        repo.close()
+
+    status, out = _run(capsys, "check", str(project))
+    assert status == 1
+    assert len(json.loads(out)["problems"]["stale_statistics"]) == 2
+
+    status, out = _run(capsys, "check", str(project), "--repair")
+    assert status == 0 and json.loads(out)["repaired"]
+
+def test_check_leaves_texts_untouched(project, capsys):
+    texts_dir = project / "texts"
+    for index_path in texts_dir.glob("*.idx"):
+        index_path.unlink()
+    before = {path.name: path.read_bytes() for path in texts_dir.iterdir()}
+
+    status, out = _run(capsys, "check", str(project))
+
+    assert status == 0 and json.loads(out)["ok"]
+    assert {path.name: path.read_bytes() for path in texts_dir.iterdir()} == before
+
+def test_unknown_code_or_project_is_a_usage_error(project, tmp_path, capsys, caplog):
+    status, out = _run(capsys, "report", str(project), "--codes", "Nope")
+    assert status == 2
+    assert json.loads(out) == {"ok": False, "command": "report", "error": "no code with id or label 'Nope'"}
+    # A usage error is logged without a traceback
+    assert all(record.exc_info is None for record in caplog.records)
+
+    caplog.clear()
+    status, out = _run(capsys, "stats", str(tmp_path / "missing.mise"))
+    assert status == 2 and "error" in json.loads(out)
+    # Logged once, by the command rather than also by open_repository
+    assert len(caplog.records) == 1
+
+def test_damaged_database_is_an_error(project, capsys):
+    (project / "project.db").write_bytes(b"not a database" * 100)
+
+    status, out = _run(capsys, "check", str(project))
+    assert status == 2
+    assert json.loads(out)["ok"] is False
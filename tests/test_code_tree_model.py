@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QModelIndex
+
+from mise.ui.code_tree_model import CodeTreeModel, COLUMN_SEGMENTS
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+def _labels(model, parent=QModelIndex()):
+    return [model.index(row, 0, parent).data() for row in range(model.rowCount(parent))]
+
+def test_model_is_shared_per_repository(repo):
+    assert CodeTreeModel.for_repository(repo) is CodeTreeModel.for_repository(repo)
+
+def test_edits_touch_single_rows(repo):
+    model = CodeTreeModel.for_repository(repo)
+    events = []
+    model.modelReset.connect(lambda: events.append("reset"))
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("insert", first)))
+    model.rowsMoved.connect(lambda *args: events.append("move"))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("remove", first)))
+    model.dataChanged.connect(lambda top_left, bottom_right: events.append(("changed", top_left.row())))
+
+    themes = model.add_code("Themes")
+    pain = model.add_code("Pain")
+    model.update_code(pain, "Pain", themes, "", "#ff0000")
+    model.update_code(pain, "Chronic pain", themes, "", "#ff0000")
+    model.delete_code(themes)
+
+    assert "reset" not in events
+    assert events == [
+        ("insert", 0), ("insert", 1), "move", ("changed", 0), "move", ("remove", 0),
+    ]
+    assert _labels(model) == ["Chronic pain"]
+
+def test_refresh_usage_updates_counts(repo):
+    model = CodeTreeModel.for_repository(repo)
+    code_id = model.add_code("Theme")
+    doc_id = repo.register_document("a.md", repo.texts_dir / "doc-0001.txt")
+    repo.add_coded_segments([(doc_id, code_id, 0, 5), (doc_id, code_id, 10, 20)])
+
+    model.refresh_usage()
+    assert model.index_for_code(code_id, COLUMN_SEGMENTS).data() == 2
+
+def test_coding_updates_only_the_affected_code(repo, monkeypatch):
+    model = CodeTreeModel.for_repository(repo)
+    first = model.add_code("First")
+    second = model.add_code("Second")
+    doc_id = repo.register_document("a.md", repo.texts_dir / "doc-0001.txt")
+
+    def full_scan():
+        raise AssertionError("every code was re-read")
+    monkeypatch.setattr(repo, "get_code_usage_overview", full_scan)
+    changed = []
+    model.dataChanged.connect(lambda top_left, bottom_right: changed.append(model.code_id(top_left)))
+
+    repo.add_coded_segment(doc_id, second, 0, 5)
+    assert changed == [second]
+    assert model.index_for_code(second, COLUMN_SEGMENTS).data() == 1
+    assert model.index_for_code(first, COLUMN_SEGMENTS).data() == 0
@@ -0,0 +1,78 @@
+from mise.utils.gen_utils import hash_file
+from mise.utils.import_service import import_files
+from mise.utils.text_store import TextStoreWriter
+
+def test_writer_hash_matches_file_hash(tmp_path):
+    path = tmp_path / "doc-0001.txt"
+    with TextStoreWriter(path) as writer:
+        writer.write("café \U0001F600\n")
+        writer.write("second line")
+    assert writer.content_hash == hash_file(path)
+
+def test_sources_map_to_documents(repo):
+    doc_id = repo.register_document("a.md", repo.texts_dir / "doc-0001.txt", "src-a", "text-a")
+    repo.link_document_source(doc_id, "src-a-resaved", "a copy.md")
+
+    assert repo.get_source_hashes() == {"src-a": doc_id, "src-a-resaved": doc_id}
+
+    repo.refresh_document(doc_id, "src-a2", "text-a2", [0, 50])
+    assert repo.get_source_hashes() == {"src-a2": doc_id}
+    [document] = repo.get_document_hashes()
+    assert (document["text_hash"], document["segment_count"]) == ("text-a2", 0)
+    assert repo.lookup_page_number(doc_id, 60) == 2
+
+    repo.delete_document(doc_id)
+    assert repo.get_source_hashes() == {}
+
+def test_backfill_hashes_existing_texts(repo):
+    text_path = repo.texts_dir / "doc-0001.txt"
+    text_path.write_text("old project text", encoding="utf-8")
+    repo.register_document("old.md", text_path)
+    repo.register_document("missing.md", repo.texts_dir / "doc-0002.txt")
+
+    assert repo.backfill_text_hashes() == 1
+    hashes = [document["text_hash"] for document in repo.get_document_hashes()]
+    assert hashes == [hash_file(text_path), None]
+
+def test_same_named_files_from_different_folders_are_both_added(repo, tmp_path):
+    first = tmp_path / "site-a" / "notes.md"
+    second = tmp_path / "site-b" / "notes.md"
+    for path, text in ((first, "Interview at site A."), (second, "Interview at site B.")):
+        path.parent.mkdir()
+        path.write_text(text, encoding="utf-8")
+
+    summary = import_files([first], repo.texts_dir, repo)
+    assert summary["added"] == ["notes.md"]
+    summary = import_files([second], repo.texts_dir, repo)
+    assert (summary["added"], summary["refreshed"]) == (["notes.md"], [])
+
+    texts = [repo.text_service.get_text(document["id"]) for document in repo.get_document_hashes()]
+    assert texts == ["Interview at site A.", "Interview at site B."]
+
+def test_refresh_replaces_the_text_of_an_uncoded_document(repo, tmp_path):
+    source = tmp_path / "notes.md"
+    source.write_text("First draft.", encoding="utf-8")
+    import_files([source], repo.texts_dir, repo)
+    source.write_text("Second draft.", encoding="utf-8")
+
+    summary = import_files([source], repo.texts_dir, repo, refresh=True)
+    assert (summary["added"], summary["refreshed"]) == ([], ["notes.md"])
+    [document] = repo.get_document_hashes()
+    assert repo.text_service.get_text(document["id"]) == "Second draft."
+
+def test_parallel_import_keeps_order_and_cleans_up_on_cancel(repo, tmp_path):
+    sources = []
+    for i in range(12):
+        path = tmp_path / f"doc{i:02}.md"
+        path.write_text(f"Document number {i}.", encoding="utf-8")
+        sources.append(path)
+
+    summary = import_files(sources[:6], repo.texts_dir, repo, max_workers=2)
+    assert summary["added"] == [path.name for path in sources[:6]]
+
+    summary = import_files(
+        sources[6:], repo.texts_dir, repo, max_workers=2,
+        is_cancelled=lambda: True,
+    )
+    assert summary["added"] == []
+    assert list(repo.texts_dir.glob(".import-*")) == []
@@ -0,0 +1,83 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mise.analysis.cooccurrence import compute_cooccurrence
+from mise.analysis.segments import load_segments, merge_code_intervals
+
+@pytest.fixture
+def coded(repo):
+    doc_a, doc_b = repo.register_documents([(f"{name}.md", repo.texts_dir / f"{name}.txt") for name in "ab"])
+    # Labels sort as Apple, Berry, Cherry
+    apple = repo.add_code("Apple")
+    berry = repo.add_code("Berry")
+    cherry = repo.add_code("Cherry")
+    repo.add_coded_segments([
+        (doc_a, apple, 0, 10),
+        (doc_a, apple, 5, 15),    # overlaps the first Apple segment
+        (doc_a, berry, 8, 20),    # overlaps both Apple segments by 7 chars of their union
+        (doc_a, cherry, 30, 40),  # 10 chars after Berry
+        (doc_b, berry, 0, 5),
+        (doc_b, cherry, 0, 5),
+    ])
+    return repo
+
+def test_overlaps_are_counted_per_segment_pair(coded):
+    matrix = compute_cooccurrence(coded)
+    apple, berry, cherry = range(3)
+
+    assert matrix.labels == ["Apple", "Berry", "Cherry"]
+    assert matrix.counts[apple, berry] == matrix.counts[berry, apple] == 2
+    assert matrix.counts[berry, cherry] == 1
+    assert matrix.counts[apple, cherry] == 0
+    # Diagonal: each code's own segment count
+    assert list(np.diag(matrix.counts)) == [2, 2, 2]
+
+def test_characters_use_the_union_of_each_code(coded):
+    matrix = compute_cooccurrence(coded)
+    apple, berry, cherry = range(3)
+
+    # Apple covers [0, 15) and Berry [8, 20) in a plus 5 chars in b:
+    # 7 shared, 15 + 17 - 7 = 25 coded with either
+    assert matrix.overlap_chars[apple, berry] == 7
+    assert matrix.overlap_chars[apple, apple] == 15
+    assert matrix.jaccard[apple, berry] == pytest.approx(7 / 25)
+    assert matrix.jaccard[berry, cherry] == pytest.approx(5 / (17 + 15 - 5))
+
+def test_window_counts_nearby_segments(coded):
+    apple, berry, cherry = range(3)
+    assert compute_cooccurrence(coded, window=9).counts[berry, cherry] == 1
+    assert compute_cooccurrence(coded, window=10).counts[berry, cherry] == 2
+    # Proximity never adds shared characters
+    assert compute_cooccurrence(coded, window=10).overlap_chars[berry, cherry] == 5
+
+def test_merge_code_intervals(coded):
+    merged = merge_code_intervals(load_segments(coded))
+    spans = sorted(zip(merged.code.tolist(), merged.start.tolist(), merged.end.tolist()))
+    assert (0, 0, 15) in spans
+    assert merged.size == 5
+
+def test_frame_is_labelled(coded):
+    pytest.importorskip("pandas")
+    frame = compute_cooccurrence(coded).to_frame("jaccard")
+    assert list(frame.columns) == ["Apple", "Berry", "Cherry"]
+    assert frame.loc["Apple", "Apple"] == 1.0
+    with pytest.raises(ValueError):
+        compute_cooccurrence(coded).to_frame("nonsense")
+
+def test_heatmap_model_shades_by_value(coded, qapp):
+    from PySide6.QtCore import Qt
+    from mise.analysisview.cooccurrence_view import CooccurrenceModel
+
+    model = CooccurrenceModel()
+    model.set_matrix(compute_cooccurrence(coded), "counts")
+
+    assert model.rowCount() == model.columnCount() == 3
+    assert model.headerData(1, Qt.Vertical) == "Berry"
+    assert model.index(0, 1).data() == "2"
+    strongest = model.index(0, 1).data(Qt.BackgroundRole)
+    weaker = model.index(1, 2).data(Qt.BackgroundRole)
+    assert strongest.green() < weaker.green()
+
+    model.set_measure("jaccard")
+    assert model.index(0, 1).data() == "0.28"
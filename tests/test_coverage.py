@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mise.analysis.coverage import document_coverage, load_coverage, refresh_coverage
+
+@pytest.fixture
+def coded(repo):
+    for name in "ab":
+        (repo.texts_dir / f"{name}.txt").write_text("x" * 50, encoding="utf-8")
+    doc_a, doc_b = repo.register_documents([(f"{name}.md", repo.texts_dir / f"{name}.txt") for name in "ab"])
+    apple = repo.add_code("Apple")
+    berry = repo.add_code("Berry")
+    repo.add_coded_segments([
+        (doc_a, apple, 0, 10),
+        (doc_a, apple, 5, 15),    # overlaps the first Apple segment
+        (doc_a, berry, 10, 20),
+        (doc_b, berry, 0, 5),
+    ])
+    return {"a": doc_a, "b": doc_b, "apple": apple, "berry": berry}
+
+def test_coverage_counts_the_union_of_intervals(repo, coded):
+    matrix = load_coverage(repo)
+    a = matrix.document_ids.index(coded["a"])
+    apple = matrix.code_ids.index(coded["apple"])
+    berry = matrix.code_ids.index(coded["berry"])
+
+    assert matrix.chars[a, apple] == 15
+    assert matrix.chars[a, berry] == 10
+    # Any code: [0, 20) once, not 15 + 10
+    assert matrix.coded_chars[a] == 20
+    assert matrix.text_length[a] == 50
+    assert matrix.document_percent()[a] == pytest.approx(40.0)
+    assert matrix.percent()[a, apple] == pytest.approx(30.0)
+
+def test_only_changed_documents_are_recomputed(repo, coded):
+    assert refresh_coverage(repo) == 2
+    assert refresh_coverage(repo) == 0
+
+    repo.add_coded_segment(coded["b"], coded["apple"], 20, 30)
+    assert repo.get_stale_coverage_documents() == [coded["b"]]
+    assert document_coverage(repo, coded["b"]) == {
+        "text_length": 50,
+        "coded_chars": 15,
+        "percent": 30.0,
+    }
+    assert refresh_coverage(repo) == 0
+
+def test_frame_has_totals_and_rejects_unknown_measures(repo, coded):
+    frame = load_coverage(repo).to_frame("percent")
+
+    assert list(frame.columns) == ["Apple", "Berry", "(text length)", "(any code)"]
+    assert frame.loc["a.md", "(any code)"] == pytest.approx(40.0)
+    with pytest.raises(ValueError):
+        load_coverage(repo).to_frame("jaccard")
+
+def test_refresh_reads_only_stale_documents_segments(repo, coded, monkeypatch):
+    refresh_coverage(repo)
+    repo.add_coded_segment(coded["b"], coded["apple"], 20, 30)
+
+    def whole_project(document_id=None):
+        raise AssertionError("every segment was loaded")
+    monkeypatch.setattr(repo, "get_segment_spans", whole_project)
+    requested = []
+    read = repo.get_document_segment_spans
+    monkeypatch.setattr(repo, "get_document_segment_spans", lambda ids: requested.append(list(ids)) or read(ids))
+
+    assert refresh_coverage(repo) == 1
+    assert requested == [[coded["b"]]]
+
+def test_documents_are_listed_by_name_ignoring_case(repo):
+    repo.register_documents([(name, repo.texts_dir / f"{name}.txt") for name in ("beta.md", "Gamma.md", "alpha.md")])
+    names = [row["display_name"] for row in repo.get_document_coverage()]
+    assert names == ["alpha.md", "beta.md", "Gamma.md"]
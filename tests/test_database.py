@@ -0,0 +1,107 @@
+import sqlite3
+
+from mise.database import SCHEMA, SCHEMA_VERSION, initialize_database
+from mise.utils.project_repository import ProjectRepository
+
+def _index_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+    finally:
+        conn.close()
+    return {row[0] for row in rows}
+
+def test_new_project_is_at_current_schema_version(tmp_path):
+    initialize_database(tmp_path)
+    repo = ProjectRepository(tmp_path / "project.db", tmp_path / "texts")
+    try:
+        assert repo.schema_version == SCHEMA_VERSION
+    finally:
+        repo.close()
+
+def test_unversioned_project_is_upgraded_in_place(tmp_path):
+    db_path = tmp_path / "project.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.execute(
+        "INSERT INTO documents (original_filename, display_name, text_path, created_at, doc_uuid) "
+        "VALUES ('a.md', 'a.md', 'doc-0001.txt', datetime('now'), 'uuid-1')"
+    )
+    conn.commit()
+    conn.close()
+
+    repo = ProjectRepository(db_path, tmp_path / "texts")
+    try:
+        assert repo.schema_version == SCHEMA_VERSION
+        assert repo.lookup_document_id(tmp_path / "texts" / "doc-0001.txt") == 1
+    finally:
+        repo.close()
+
+    indexes = _index_names(db_path)
+    assert {
+        "idx_coded_segments_document",
+        "idx_coded_segments_code",
+        "idx_documents_text_path",
+    } <= indexes
+
+    # Reopening does not re-run migrations
+    repo = ProjectRepository(db_path, tmp_path / "texts")
+    try:
+        rows = repo.connection.execute("SELECT version FROM schema_version").fetchall()
+        assert [row["version"] for row in rows] == list(range(1, SCHEMA_VERSION + 1))
+    finally:
+        repo.close()
+
+def test_list_documents_is_a_single_query(tmp_path):
+    initialize_database(tmp_path)
+    repo = ProjectRepository(tmp_path / "project.db", tmp_path / "texts")
+    try:
+        ids = repo.register_documents([(f"doc{i}.md", tmp_path / "texts" / f"doc-{i:04d}.txt") for i in range(50)])
+        code = repo.add_code("Theme")
+        repo.add_coded_segments([(ids[3], code, 0, 5), (ids[3], code, 6, 9)])
+
+        statements = []
+        repo.conn.set_trace_callback(statements.append)
+        listing = repo.list_documents()
+        repo.conn.set_trace_callback(None)
+
+        assert len(statements) == 1
+        assert len(listing) == 50
+        assert {row["id"]: row["segment_count"] for row in listing}[ids[3]] == 2
+        assert repo.list_documents(ids[3])[0]["display_name"] == "doc3.md"
+    finally:
+        repo.close()
+
+def _overview_counts(repo):
+    codes = {row["id"]: (row["segment_count"], row["document_count"]) for row in repo.get_code_usage_overview()}
+    documents = {row["doc_id"]: (row["segment_count"], row["unique_codes"]) for row in repo.get_document_coding_overview()}
+    return codes, documents
+
+def test_statistics_follow_segment_changes(tmp_path):
+    initialize_database(tmp_path)
+    repo = ProjectRepository(tmp_path / "project.db", tmp_path / "texts")
+    try:
+        doc_a, doc_b = repo.register_documents([(f"{name}.md", tmp_path / "texts" / f"{name}.txt") for name in "ab"])
+        theme = repo.add_code("Theme")
+        other = repo.add_code("Other")
+        repo.add_coded_segments([(doc_a, theme, 0, 5), (doc_a, theme, 6, 9), (doc_b, theme, 0, 3), (doc_a, other, 2, 4)])
+
+        codes, documents = _overview_counts(repo)
+        assert codes == {theme: (3, 2), other: (1, 1)}
+        assert documents == {doc_a: (3, 2), doc_b: (1, 1)}
+
+        # Removing the only Theme segment in b drops b from Theme's documents
+        segment_b = [s["id"] for s in repo.get_coded_segments(doc_b)]
+        repo.delete_segments(segment_b)
+        repo.delete_code(other)
+        codes, documents = _overview_counts(repo)
+        assert codes == {theme: (2, 1)}
+        assert documents == {doc_a: (2, 1), doc_b: (0, 0)}
+        assert repo.get_code_metadata(theme)["document_count"] == 1
+
+        # A rebuild from the segments agrees with the trigger-kept counts
+        repo.conn.execute("UPDATE code_stats SET segment_count = 99")
+        repo.rebuild_statistics()
+        assert _overview_counts(repo) == (codes, documents)
+    finally:
+        repo.close()
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from mise.projectview.document_list_model import DocumentListModel, COLUMN_SEGMENTS
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+def test_rows_follow_renames_deletes_and_coding(repo):
+    first, second = repo.register_documents([
+        ("b.pdf", repo.texts_dir / "doc-0001.txt"),
+        ("a.pdf", repo.texts_dir / "doc-0002.txt"),
+    ])
+    model = DocumentListModel(repo)
+    assert [model.index(row, 0).data() for row in range(model.rowCount())] == ["a.pdf", "b.pdf"]
+
+    resets = []
+    model.modelReset.connect(lambda: resets.append(True))
+
+    model.rename_document(second, "Interview")
+    assert model.index(0, 0).data() == "Interview"
+
+    code = repo.add_code("Theme")
+    repo.add_coded_segments([(first, code, 0, 5)])
+    model.refresh_document(first)
+    assert model.index(1, COLUMN_SEGMENTS).data() == 1
+
+    model.delete_document(second)
+    assert model.rowCount() == 1
+    assert model.document_id(model.index(0, 0)) == first
+
+    # Rows after a removed one are found at their new position
+    model.rename_document(first, "Survey")
+    assert model.index(0, 0).data() == "Survey"
+    assert resets == []
@@ -0,0 +1,30 @@
+def test_page_lookup_by_offset(repo):
+    doc_id = repo.register_document("report.pdf", repo.texts_dir / "doc-0001.txt")
+    assert repo.add_document_pages(doc_id, [0, 120, 480]) == 3
+
+    assert repo.lookup_page_number(doc_id, 0) == 1
+    assert repo.lookup_page_number(doc_id, 119) == 1
+    assert repo.lookup_page_number(doc_id, 120) == 2
+    assert repo.lookup_page_number(doc_id, 10_000) == 3
+    assert repo.lookup_page_offset(doc_id, 3) == 480
+    assert repo.lookup_page_offset(doc_id, 4) is None
+
+    # Re-recording replaces the previous index
+    repo.add_document_pages(doc_id, [0, 200])
+    assert repo.lookup_page_number(doc_id, 480) == 2
+
+def test_segments_for_code_carry_page_number(repo):
+    pdf_id = repo.register_document("report.pdf", repo.texts_dir / "doc-0001.txt")
+    md_id = repo.register_document("notes.md", repo.texts_dir / "doc-0002.txt")
+    repo.add_document_pages(pdf_id, [0, 100])
+    code_id = repo.add_code("Theme")
+    repo.add_coded_segments([
+        (pdf_id, code_id, 150, 160),
+        (md_id, code_id, 5, 10),
+    ])
+
+    pages = {seg["document_id"]: seg["page_number"] for seg in repo.get_segments_for_code(code_id)}
+    assert pages == {pdf_id: 2, md_id: None}
+
+    repo.delete_document(pdf_id)
+    assert repo.lookup_page_number(pdf_id, 150) is None
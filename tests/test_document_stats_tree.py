@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("numpy")
+
+from mise.analysisview.document_stats_tree import DocumentStatsTreeWidget
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+def test_current_document_and_coverage_columns(repo):
+    path = repo.texts_dir / "doc-0001.txt"
+    path.write_text("x" * 40, encoding="utf-8")
+    doc_id = repo.register_document("a.md", path)
+    code_id = repo.add_code("Theme")
+    repo.add_coded_segment(doc_id, code_id, 0, 10)
+
+    tree = DocumentStatsTreeWidget(repo)
+    assert tree.current_document_id() is None
+    tree.setCurrentItem(tree.topLevelItem(0))
+    assert tree.current_document_id() == doc_id
+
+    # Coding updates the row's coverage in place
+    repo.add_coded_segment(doc_id, code_id, 5, 20)
+    item = tree.topLevelItem(0)
+    assert (item.text(4), item.text(5)) == ("20", "50.0")
@@ -0,0 +1,38 @@
+def _add_document(repo, name, text):
+    path = repo.texts_dir / name
+    path.write_text(text, encoding="utf-8")
+    return repo.register_document(name, path)
+
+def test_snippets_are_served_from_cache(repo):
+    doc_id = _add_document(repo, "doc-0001.txt", "Hello brave new world")
+    service = repo.text_service
+
+    assert service.get_snippet(doc_id, 6, 12) == "brave"
+
+    # A second read must not touch the file
+    repo.get_document_path(doc_id).unlink()
+    assert service.get_snippet(doc_id, 12, 21) == "new world"
+
+def test_cache_is_bounded_and_invalidated(repo):
+    first = _add_document(repo, "doc-0001.txt", "a" * 1000)
+    second = _add_document(repo, "doc-0002.txt", "b" * 1000)
+    service = repo.text_service
+    service.max_bytes = 1500
+
+    service.get_text(first)
+    service.get_text(second)
+    assert first not in service._texts
+    assert second in service._texts
+
+    repo.delete_document(second)
+    assert second not in service._texts
+    assert service._total_bytes == 0
+
+def test_length_comes_from_the_offset_index(repo):
+    text = "é😀 line\n" * 500
+    doc_id = _add_document(repo, "doc-0001.txt", text)
+    service = repo.text_service
+
+    assert service.get_length(doc_id) == len(text)
+    assert doc_id not in service._texts
+    assert service.get_window(doc_id, 9, 18) == text[9:18]
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from mise.utils.text_store import write_text_file
+from mise.projectview.document_viewer import DocumentViewerWidget
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+@pytest.fixture
+def viewer(repo):
+    return DocumentViewerWidget(repo)
+
+def _add_document(repo, name, text):
+    path = repo.texts_dir / f"{name}.txt"
+    write_text_file(path, text)
+    return repo.register_document(name, path)
+
+def test_deleting_the_shown_document_clears_the_viewer(repo, viewer):
+    shown = _add_document(repo, "shown", "shown text")
+    other = _add_document(repo, "other", "other text")
+    viewer.show_document(shown)
+
+    repo.delete_document(other)
+    assert viewer.current_document_id == shown
+
+    repo.delete_document(shown)
+    assert viewer.current_document_id is None
+    assert viewer.document_viewer.toPlainText() == "Select a document to view its content."
+
+def test_a_document_that_fails_to_load_is_not_current(repo, viewer):
+    shown = _add_document(repo, "shown", "shown text")
+    missing = _add_document(repo, "missing", "gone soon")
+    viewer.show_document(shown)
+    repo.get_document_path(missing).unlink()
+
+    viewer.show_document(missing)
+
+    assert viewer.current_document_id is None
+    assert viewer.document_viewer.toPlainText().startswith("Error reading document")
@@ -0,0 +1,50 @@
+from mise.utils.intervals import Run, run_at, splice_runs, split_into_runs
+
+def _segment(segment_id, start, end):
+    return {"id": segment_id, "start_offset": start, "end_offset": end}
+
+def _ids(run):
+    return [segment["id"] for segment in run.segments]
+
+def test_overlapping_segments_split_into_disjoint_runs():
+    segments = [_segment(1, 0, 10), _segment(2, 5, 15), _segment(3, 20, 25)]
+    runs = split_into_runs(segments)
+
+    assert [(run.start, run.end, _ids(run)) for run in runs] == [
+        (0, 5, [1]),
+        (5, 10, [1, 2]),
+        (10, 15, [2]),
+        (20, 25, [3]),
+    ]
+
+def test_touching_and_empty_segments():
+    segments = [_segment(1, 0, 5), _segment(2, 5, 8), _segment(3, 8, 8)]
+    runs = split_into_runs(segments)
+    assert [(run.start, run.end, _ids(run)) for run in runs] == [(0, 5, [1]), (5, 8, [2])]
+
+def test_nested_segments_keep_input_order():
+    segments = [_segment(2, 0, 10), _segment(1, 2, 4)]
+    runs = split_into_runs(segments)
+    assert [_ids(run) for run in runs] == [[2], [2, 1], [2]]
+
+def test_runs_are_clipped_to_range():
+    segments = [_segment(1, 0, 10), _segment(2, 8, 30)]
+    runs = split_into_runs(segments, start=5, end=20)
+    assert [(run.start, run.end, _ids(run)) for run in runs] == [(5, 8, [1]), (8, 10, [1, 2]), (10, 20, [2])]
+
+def test_run_at():
+    runs = split_into_runs([_segment(1, 0, 10), _segment(2, 5, 15), _segment(3, 20, 25)])
+    assert _ids(run_at(runs, 7)) == [1, 2]
+    assert _ids(run_at(runs, 10)) == [2]
+    assert run_at(runs, 15) is None
+    assert run_at(runs, 30) is None
+    assert run_at([], 0) is None
+
+def test_splice_replaces_range_and_trims_crossing_runs():
+    runs = [Run(0, 10, ("a",)), Run(10, 30, ("b",))]
+    spliced = splice_runs(runs, 5, 20, [Run(8, 12, ("c",))])
+    assert spliced == [Run(0, 5, ("a",)), Run(8, 12, ("c",)), Run(20, 30, ("b",))]
+
+def test_splice_inside_single_run():
+    runs = [Run(0, 30, ("a",))]
+    assert splice_runs(runs, 10, 20, []) == [Run(0, 10, ("a",)), Run(20, 30, ("a",))]
@@ -0,0 +1,24 @@
+from mise.utils.offset_map import OffsetMap
+
+def _utf16_position(text, offset):
+    return len(text[:offset].encode("utf-16-le")) // 2
+
+def test_round_trip_with_astral_characters():
+    text = "a😀b 𝒳y\n漢😀😀z"
+    offset_map = OffsetMap.from_text(text)
+
+    for offset in range(len(text) + 1):
+        position = _utf16_position(text, offset)
+        assert offset_map.to_qt(offset) == position
+        assert offset_map.from_qt(position) == offset
+
+def test_position_inside_surrogate_pair_maps_to_character_start():
+    text = "a😀b"
+    offset_map = OffsetMap.from_text(text)
+    # Qt positions: a=0, 😀=1..2, b=3
+    assert offset_map.from_qt(2) == 1
+
+def test_bmp_text_is_identity():
+    offset_map = OffsetMap.from_text("plain ascii and ünïcödé")
+    assert offset_map.to_qt(7) == 7
+    assert offset_map.from_qt(7) == 7
@@ -0,0 +1,39 @@
+from mise.utils.report_writer import write_code_report
+
+def _add_document(repo, name, text):
+    path = repo.texts_dir / name
+    path.write_text(text, encoding="utf-8")
+    return repo.register_document(name, path)
+
+def test_report_groups_segments_by_code_then_document(repo, tmp_path):
+    doc_b = _add_document(repo, "doc-0002.txt", "beta <gamma> delta")
+    doc_a = _add_document(repo, "doc-0001.txt", "alpha and omega")
+    theme = repo.add_code("Theme", color="#ff0000")
+    other = repo.add_code("Other")
+    repo.add_coded_segments([
+        (doc_b, theme, 5, 12),
+        (doc_a, theme, 10, 15),
+        (doc_a, other, 0, 5),
+        (doc_a, theme, 0, 5),
+    ])
+
+    out_path = tmp_path / "report.html"
+    summary = write_code_report(repo, [theme, other], out_path, "Demo & Co")
+    html = out_path.read_text(encoding="utf-8")
+
+    assert summary == {"path": out_path, "codes": 2, "documents": 2, "segments": 4}
+    assert html.count("<section>") == 2
+    assert html.index(">Theme<") < html.index(">Other<")
+    assert "Demo &amp; Co" in html and "{{CONTENT}}" not in html
+
+    theme_section = html[html.index(">Theme<"):html.index(">Other<")]
+    # Documents in name order, segments in text order within each
+    assert theme_section.index("doc-0001.txt") < theme_section.index("doc-0002.txt")
+    assert theme_section.index(">alpha<") < theme_section.index(">omega<")
+    assert "&lt;gamma&gt;" in theme_section
+    assert "Segments: 3 | Documents: 2" in theme_section
+
+def test_unknown_codes_are_skipped(repo, tmp_path):
+    summary = write_code_report(repo, ["missing"], tmp_path / "report.html", "Demo")
+    assert summary["codes"] == 0
+    assert summary["segments"] == 0
@@ -0,0 +1,59 @@
+import gc
+
+import pytest
+
+from mise.utils.repository_events import (
+    CodeAdded, CodeDeleted, CodeUpdated, DocumentRenamed, DocumentsAdded,
+    SegmentsAdded, SegmentsRemoved,
+)
+
+def test_mutations_publish_typed_events(repo):
+    events = []
+    repo.events.subscribe(events.append)
+
+    [doc_id] = repo.register_documents([("a.md", repo.texts_dir / "doc-0001.txt")])
+    code = repo.add_code("Theme")
+    repo.update_code(code, "Theme 2", None, "", "#ff0000")
+    [segment_id] = repo.add_coded_segments([(doc_id, code, 3, 9)])
+    repo.rename_document_db("Interview", doc_id)
+    repo.delete_segment(segment_id)
+    repo.delete_code(code)
+
+    assert [type(event) for event in events] == [
+        DocumentsAdded, CodeAdded, CodeUpdated, SegmentsAdded, DocumentRenamed, SegmentsRemoved, CodeDeleted,
+    ]
+    removed = events[5]
+    assert removed.document_ids == {doc_id}
+    assert removed.segments[0]["start_offset"] == 3
+
+def test_events_wait_for_commit_and_drop_on_rollback(repo):
+    added = []
+    repo.events.subscribe(added.append, CodeAdded)
+
+    with repo.transaction():
+        repo.add_code("kept")
+        with pytest.raises(RuntimeError):
+            with repo.transaction():
+                repo.add_code("rolled back")
+                raise RuntimeError
+        assert added == []
+
+    assert len(added) == 1
+    assert repo.lookup_code(added[0].code_id)["label"] == "kept"
+
+def test_bound_method_subscribers_are_weak(repo):
+    class View:
+        def __init__(self):
+            self.seen = 0
+        def on_event(self, event):
+            self.seen += 1
+
+    view = View()
+    repo.events.subscribe(view.on_event)
+    repo.add_code("a")
+    assert view.seen == 1
+
+    del view
+    gc.collect()
+    repo.add_code("b")
+    assert repo.events._subscribers == []
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QColor, QTextCursor
+from PySide6.QtWidgets import QTextBrowser
+
+from mise.database import initialize_database
+from mise.utils.offset_map import OffsetMap
+from mise.utils.project_repository import ProjectRepository
+from mise.ui.segment_highlighter import SegmentHighlighter
+
+TEXT = "The quick brown fox jumps over the lazy dog"
+
+@pytest.fixture
+def viewer_and_repo(tmp_path, qapp):
+    initialize_database(tmp_path)
+    repo = ProjectRepository(tmp_path / "project.db", tmp_path / "texts")
+    viewer = QTextBrowser()
+    viewer.setPlainText(TEXT)
+    yield viewer, repo
+    repo.close()
+
+def _background_at(viewer, position):
+    cursor = QTextCursor(viewer.document())
+    # charFormat() describes the character before the cursor
+    cursor.setPosition(position + 1)
+    return cursor.charFormat().background().color()
+
+def test_add_and_remove_repaint_only_their_range(viewer_and_repo):
+    viewer, repo = viewer_and_repo
+    doc_id = repo.register_document("a.md", repo.texts_dir / "doc-0001.txt")
+    red = repo.add_code("Red", color="#ff0000")
+    blue = repo.add_code("Blue", color="#0000ff")
+    [red_segment] = repo.add_coded_segments([(doc_id, red, 4, 9)])
+
+    highlighter = SegmentHighlighter(viewer, repo)
+    highlighter.set_document(doc_id, OffsetMap.from_text(TEXT))
+    assert _background_at(viewer, 5) == QColor("#ff0000")
+
+    repo.add_coded_segments([(doc_id, blue, 16, 19)])
+    highlighter.refresh_range(16, 19)
+    assert _background_at(viewer, 17) == QColor("#0000ff")
+    assert _background_at(viewer, 5) == QColor("#ff0000")
+
+    repo.delete_segment(red_segment)
+    highlighter.refresh_range(4, 9)
+    assert _background_at(viewer, 5) != QColor("#ff0000")
+    assert _background_at(viewer, 17) == QColor("#0000ff")
+
+def test_overlapping_segments_are_composited(viewer_and_repo):
+    viewer, repo = viewer_and_repo
+    doc_id = repo.register_document("a.md", repo.texts_dir / "doc-0001.txt")
+    red = repo.add_code("Red", color="#ff0000")
+    blue = repo.add_code("Blue", color="#0000ff")
+    repo.add_coded_segments([(doc_id, red, 4, 15), (doc_id, blue, 10, 19)])
+
+    highlighter = SegmentHighlighter(viewer, repo)
+    highlighter.set_document(doc_id, OffsetMap.from_text(TEXT))
+    assert _background_at(viewer, 5) == QColor("#ff0000")
+    assert _background_at(viewer, 12) == QColor(127, 0, 127)
+    assert _background_at(viewer, 17) == QColor("#0000ff")
+
+    assert [s["code_label"] for s in highlighter.segments_at(12)] == ["Red", "Blue"]
+    assert highlighter.segments_at(2) == ()
@@ -0,0 +1,32 @@
+def test_segments_at_returns_every_overlapping_segment(repo):
+    doc_id = repo.register_document("a.md", repo.texts_dir / "doc-0001.txt")
+    other_doc = repo.register_document("b.md", repo.texts_dir / "doc-0002.txt")
+    code_a = repo.add_code("a")
+    code_b = repo.add_code("b")
+
+    outer = repo.add_coded_segment(doc_id, code_a, 0, 100)
+    inner = repo.add_coded_segment(doc_id, code_b, 40, 60)
+    repo.add_coded_segment(doc_id, code_b, 200, 300)
+    repo.add_coded_segment(other_doc, code_a, 0, 100)
+
+    assert [row["id"] for row in repo.segments_at(doc_id, 50)] == [outer, inner]
+    assert [row["id"] for row in repo.segments_at(doc_id, 10)] == [outer]
+    assert repo.segments_at(doc_id, 150) == []
+    assert repo.get_segment_at_position(doc_id, 50)["id"] == inner
+
+    rows = repo.segments_overlapping(doc_id, 90, 250)
+    assert [row["id"] for row in rows] == [outer, 3]
+    assert rows[0]["code_label"] == "a"
+
+def test_segment_index_follows_deletes(repo):
+    doc_id = repo.register_document("a.md", repo.texts_dir / "doc-0001.txt")
+    code_id = repo.add_code("a")
+    seg_id = repo.add_coded_segment(doc_id, code_id, 5, 10)
+
+    repo.delete_segment(seg_id)
+    assert repo.segments_at(doc_id, 7) == []
+
+    repo.add_coded_segment(doc_id, code_id, 5, 10)
+    repo.delete_document(doc_id)
+    count = repo.connection.execute("SELECT COUNT(*) FROM segment_index").fetchone()[0]
+    assert count == 0
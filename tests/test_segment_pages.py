@@ -0,0 +1,37 @@
+from mise.database import initialize_database
+from mise.utils.project_repository import ProjectRepository
+
+def test_keyset_pages_cover_every_segment_once(tmp_path):
+    initialize_database(tmp_path)
+    repo = ProjectRepository(tmp_path / "project.db", tmp_path / "texts")
+    try:
+        texts = tmp_path / "texts"
+        # Name order (case-insensitive) differs from id order
+        doc_ids = repo.register_documents(
+            [(name, texts / f"doc-{i:04d}.txt") for i, name in enumerate(["c.md", "a.md", "B.md"], 1)]
+        )
+        code_id = repo.add_code("Theme")
+        other_id = repo.add_code("Other")
+        # Several segments share a start offset, so the id breaks ties
+        repo.add_coded_segments(
+            [(doc_id, code_id, start, start + 5) for doc_id in doc_ids for start in (30, 0, 10, 10)]
+            + [(doc_ids[0], other_id, 0, 5)]
+        )
+
+        seen = []
+        after = None
+        while True:
+            page = repo.get_segments_for_code_page(code_id, after=after, limit=5)
+            if not page:
+                break
+            seen.extend(page)
+            last = page[-1]
+            after = (last["display_name"], last["document_id"], last["start_offset"], last["segment_id"])
+
+        keys = [(s["display_name"].lower(), s["document_id"], s["start_offset"], s["segment_id"]) for s in seen]
+        assert len(keys) == 12
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+        assert [s["display_name"] for s in seen[::4]] == ["a.md", "B.md", "c.md"]
+    finally:
+        repo.close()
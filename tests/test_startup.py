@@ -0,0 +1,109 @@
+"""
+Cold-start budget for the mise entry point.
+
+Each check runs in a fresh interpreter so earlier imports in the test session
+don't hide the cost. Budgets can be overridden on slow machines with
+MISE_IMPORT_BUDGET and MISE_FIRST_PAINT_BUDGET (seconds).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+# Must not be loaded before the user imports a document or runs an analysis
+HEAVY_MODULES = ("pdfplumber", "pdfminer", "docx", "markdown", "pandas", "numpy")
+
+IMPORT_BUDGET_SECONDS = float(os.environ.get("MISE_IMPORT_BUDGET", "1.0"))
+FIRST_PAINT_BUDGET_SECONDS = float(os.environ.get("MISE_FIRST_PAINT_BUDGET", "3.0"))
+
+# Time from interpreter start to the welcome window's first paint
+FIRST_PAINT_PROBE = """
+import time
+start = time.perf_counter()
+
+import sys
+from PySide6.QtCore import QEvent, QObject, QTimer
+from PySide6.QtWidgets import QApplication
+from mise.main_window import MainWindow
+
+class PaintProbe(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and not self.painted:
+            self.painted = True
+            print(time.perf_counter() - start, flush=True)
+            QTimer.singleShot(0, app.quit)
+        return False
+
+app = QApplication(sys.argv)
+window = MainWindow()
+probe = PaintProbe()
+probe.painted = False
+window.installEventFilter(probe)
+QTimer.singleShot(30000, lambda: app.exit(1))
+window.show()
+sys.exit(app.exec())
+"""
+
+def _run_python(args, code, tmp_path, **env):
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(SRC_DIR),
+        # Keep QSettings away from the real user config
+        XDG_CONFIG_HOME=str(tmp_path),
+        **env,
+    )
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        capture_output=True, text=True, env=env, timeout=120,
+    )
+
+def _import_times(module, tmp_path):
+    """Import module under -X importtime; return {module: cumulative seconds}."""
+    result = _run_python(["-X", "importtime"], f"import {module}", tmp_path)
+    assert result.returncode == 0, result.stderr
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        times[name.strip()] = int(cumulative_us) / 1_000_000
+    return times
+
+def _heavy_modules_loaded(times):
+    return sorted(
+        name for name in times
+        if name.split(".")[0] in HEAVY_MODULES
+    )
+
+@pytest.mark.parametrize("module", [
+    "mise.utils.project_repository",
+    "mise.utils.import_service",
+    "mise.utils.text_processing",
+])
+def test_core_modules_defer_heavy_imports(module, tmp_path):
+    times = _import_times(module, tmp_path)
+    assert _heavy_modules_loaded(times) == []
+
+def test_app_import_within_budget(tmp_path):
+    pytest.importorskip("PySide6")
+    times = _import_times("mise.app", tmp_path)
+
+    assert _heavy_modules_loaded(times) == []
+    # The view stacks load when a project is opened, not at startup
+    assert "mise.projectview.project_window" not in times
+    assert "mise.analysisview.analysis_window" not in times
+    assert times["mise.app"] < IMPORT_BUDGET_SECONDS
+
+def test_first_paint_within_budget(tmp_path):
+    pytest.importorskip("PySide6")
+    result = _run_python([], FIRST_PAINT_PROBE, tmp_path, QT_QPA_PLATFORM="offscreen")
+    assert result.returncode == 0, result.stderr
+
+    first_paint = float(result.stdout.split()[0])
+    assert first_paint < FIRST_PAINT_BUDGET_SECONDS
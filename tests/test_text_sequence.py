@@ -0,0 +1,40 @@
+import sqlite3
+
+from mise.database import SCHEMA, initialize_database
+from mise.utils.project_repository import ProjectRepository
+
+def test_sequence_starts_after_existing_texts(tmp_path):
+    db_path = tmp_path / "project.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO documents (original_filename, display_name, text_path, created_at, doc_uuid) "
+        "VALUES (?, ?, ?, datetime('now'), ?)",
+        [("a.md", "a.md", "doc-0001.txt", "u1"), ("b.md", "b.md", "doc-0012.txt", "u2")],
+    )
+    conn.commit()
+    conn.close()
+
+    repo = ProjectRepository(db_path, tmp_path / "texts")
+    try:
+        assert [p.name for p in repo.allocate_text_paths(2)] == ["doc-0013.txt", "doc-0014.txt"]
+    finally:
+        repo.close()
+
+def test_connections_never_share_names_and_skip_existing_files(tmp_path):
+    initialize_database(tmp_path)
+    texts_dir = tmp_path / "texts"
+    texts_dir.mkdir()
+    # Left behind by an interrupted import
+    (texts_dir / "doc-0002.txt").write_text("orphan", encoding="utf-8")
+
+    first = ProjectRepository(tmp_path / "project.db", texts_dir)
+    second = ProjectRepository(tmp_path / "project.db", texts_dir)
+    try:
+        names = [p.name for p in first.allocate_text_paths(2)]
+        names += [p.name for p in second.allocate_text_paths(2)]
+        names += [p.name for p in first.allocate_text_paths(1)]
+        assert names == ["doc-0001.txt", "doc-0003.txt", "doc-0004.txt", "doc-0005.txt", "doc-0006.txt"]
+    finally:
+        first.close()
+        second.close()
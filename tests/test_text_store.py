@@ -0,0 +1,50 @@
+import random
+
+from mise.utils.text_store import (
+    OFFSET_INDEX_STRIDE, TextStoreReader, TextStoreWriter, index_path_for, write_text_file
+)
+
+SAMPLE_ALPHABET = "abc déf 漢字 \n😀"
+
+def _sample_text(length):
+    rng = random.Random(42)
+    return "".join(rng.choice(SAMPLE_ALPHABET) for _ in range(length))
+
+def test_reader_windows_match_string_slices(tmp_path):
+    text = _sample_text(OFFSET_INDEX_STRIDE * 5 + 17)
+    path = tmp_path / "doc-0001.txt"
+    write_text_file(path, text)
+
+    reader = TextStoreReader.open(path)
+    try:
+        assert reader.char_length == len(text)
+        for start, end in [(0, 1), (0, len(text)), (1000, 1200),
+                           (OFFSET_INDEX_STRIDE, OFFSET_INDEX_STRIDE * 2),
+                           (len(text) - 5, len(text) + 50), (30, 30)]:
+            assert reader.read(start, end) == text[start:end]
+    finally:
+        reader.close()
+
+def test_streamed_writes_and_rebuilt_index_agree(tmp_path):
+    pages = [_sample_text(700), _sample_text(1500), "", _sample_text(3)]
+    path = tmp_path / "doc-0002.txt"
+    with TextStoreWriter(path) as writer:
+        for page in pages:
+            writer.write(page)
+    text = "".join(pages)
+    streamed_index = index_path_for(path).read_bytes()
+
+    # A missing sidecar is rebuilt from the text file on open
+    index_path_for(path).unlink()
+    reader = TextStoreReader.open(path)
+    try:
+        assert index_path_for(path).read_bytes() == streamed_index
+        assert reader.read(650, 2300) == text[650:2300]
+    finally:
+        reader.close()
+
+def test_crlf_files_are_not_indexed(tmp_path):
+    path = tmp_path / "doc-0003.txt"
+    path.write_bytes("line one\r\nline two".encode("utf-8"))
+    assert TextStoreReader.open(path) is None
+    assert not index_path_for(path).exists()
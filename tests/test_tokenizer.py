@@ -0,0 +1,56 @@
+import pytest
+
+from mise.utils.token_cache import TokenCache
+from mise.utils.tokenizer import iter_tokens, tokenize
+
+TEXT = 'Mr. Smith said "Don\'t go!" Then J. Doe left at 3.5 p.m.  It ended.\n\nNo stop here\nor here'
+
+def test_sentences_keep_abbreviations_and_split_at_blank_lines():
+    sentences = [token for token, _, _ in iter_tokens(TEXT, "sentence")]
+    assert sentences == [
+        'Mr. Smith said "Don\'t go!"',
+        "Then J. Doe left at 3.5 p.m.",
+        "It ended.",
+        "No stop here\nor here",
+    ]
+
+def test_words_carry_offsets_into_the_text():
+    tokens = list(iter_tokens("Don't stop, well-being!", "word"))
+    assert tokens == [("Don't", 0, 5), ("stop", 6, 10), (",", 10, 11), ("well-being", 12, 22), ("!", 22, 23)]
+    for token, start, end in iter_tokens(TEXT):
+        assert TEXT[start:end] == token
+
+def test_tokenize_returns_offset_arrays():
+    spans = tokenize(TEXT, "sentence")
+    assert spans.starts.typecode == "q"
+    assert list(spans.strings(TEXT)) == [token for token, _, _ in iter_tokens(TEXT, "sentence")]
+    with pytest.raises(ValueError):
+        tokenize(TEXT, "paragraph")
+
+def test_cache_is_keyed_by_text_hash(repo, tmp_path):
+    path = repo.texts_dir / "doc-0001.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    document_id = repo.register_document("a.md", path, text_hash="abc123")
+    cache = TokenCache(repo)
+
+    spans = cache.get(document_id, "sentence")
+    cached = tmp_path / "cache" / "tokens" / "abc123-sentence.tok"
+    assert cached.exists()
+
+    # A second read comes from the file, not the text
+    path.write_text("Changed.", encoding="utf-8")
+    repo.text_service.invalidate(document_id)
+    assert cache.get(document_id, "sentence") == spans
+
+    repo.delete_document(document_id)
+    assert cache.prune() == 1
+    assert not cached.exists()
+
+def test_iter_corpus_tokenizes_every_document(repo):
+    texts = {"a": "One. Two.", "b": "Three."}
+    for name, text in texts.items():
+        (repo.texts_dir / f"{name}.txt").write_text(text, encoding="utf-8")
+    ids = repo.register_documents([(f"{name}.md", repo.texts_dir / f"{name}.txt") for name in texts])
+
+    corpus = dict(TokenCache(repo).iter_corpus("sentence"))
+    assert {document_id: spans.size for document_id, spans in corpus.items()} == dict(zip(ids, [2, 1]))
@@ -0,0 +1,63 @@
+import pytest
+
+from mise.utils.project_repository import ProjectRepository
+
+def _count_codes(repo):
+    return repo.connection.execute("SELECT COUNT(*) FROM codes").fetchone()[0]
+
+def test_connection_uses_wal(repo):
+    mode = repo.connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+def test_transaction_defers_commit_until_outermost_block(repo, tmp_path):
+    other = ProjectRepository(tmp_path / "project.db", tmp_path / "texts")
+    try:
+        with repo.transaction():
+            repo.add_code("a")
+            with repo.transaction():
+                repo.add_code("b")
+            # nothing is visible to other connections until the outer block exits
+            assert _count_codes(other) == 0
+        assert _count_codes(other) == 2
+    finally:
+        other.close()
+
+def test_nested_failure_rolls_back_only_inner_block(repo):
+    with repo.transaction():
+        repo.add_code("kept")
+        with pytest.raises(RuntimeError):
+            with repo.transaction():
+                repo.add_code("dropped")
+                raise RuntimeError("boom")
+    assert [row["label"] for row in repo.list_codes()] == ["kept"]
+
+def test_outer_failure_rolls_back_everything(repo):
+    with pytest.raises(RuntimeError):
+        with repo.transaction():
+            repo.add_code("a")
+            with repo.transaction():
+                repo.add_code("b")
+            raise RuntimeError("boom")
+    assert _count_codes(repo) == 0
+
+def test_bulk_inserts_return_ids_in_input_order(repo):
+    doc_ids = repo.register_documents(
+        (f"doc-{i}.md", repo.texts_dir / f"doc-{i:04d}.txt") for i in range(1, 4)
+    )
+    assert doc_ids == [1, 2, 3]
+    assert repo.lookup_document_id(repo.texts_dir / "doc-0002.txt") == doc_ids[1]
+
+    code_id = repo.add_code("a")
+    single = repo.add_coded_segment(doc_ids[0], code_id, 0, 5)
+    seg_ids = repo.add_coded_segments(
+        [(doc_ids[0], code_id, 10, 20), (doc_ids[1], code_id, 0, 5, "memo")]
+    )
+    assert seg_ids == [single + 1, single + 2]
+
+    rows = repo.get_coded_segments(doc_ids[1])
+    assert [(row["id"], row["memo"]) for row in rows] == [(seg_ids[1], "memo")]
+
+    # segment ids keep increasing after deletes (AUTOINCREMENT)
+    assert repo.delete_segments(seg_ids) == 2
+    assert repo.add_coded_segments([(doc_ids[0], code_id, 1, 2)]) == [seg_ids[-1] + 1]
+    assert repo.register_documents([]) == []
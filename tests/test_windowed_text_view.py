@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QColor, QTextCursor
+
+from mise.utils.text_store import write_text_file
+from mise.ui import windowed_text_view
+from mise.ui.windowed_text_view import WindowedTextView
+
+LINE = "field note line with an emoji 😀 in it\n"
+
+pytestmark = pytest.mark.usefixtures("qapp")
+
+@pytest.fixture(autouse=True)
+def small_windows(monkeypatch):
+    # Small limits so a test document counts as large
+    monkeypatch.setattr(windowed_text_view, "LARGE_DOCUMENT_CHARS", 10_000)
+    monkeypatch.setattr(windowed_text_view, "WINDOW_CHARS", 4_000)
+    monkeypatch.setattr(windowed_text_view, "WINDOW_MARGIN_CHARS", 500)
+
+def _background_at(view, offset):
+    cursor = QTextCursor(view.document())
+    cursor.setPosition(view.to_position(offset) + 1)
+    return cursor.charFormat().background().color()
+
+def test_large_document_is_loaded_a_window_at_a_time(repo):
+    text = LINE * 1000
+    path = repo.texts_dir / "doc-0001.txt"
+    write_text_file(path, text)
+    doc_id = repo.register_document("notes.txt", path)
+    code = repo.add_code("Red", color="#ff0000")
+    far = text.index("emoji", 30_000)
+    repo.add_coded_segments([(doc_id, code, far, far + 5)])
+
+    view = WindowedTextView(repo)
+    view.show_document(doc_id)
+    assert view.windowed
+    assert view.window_start == 0
+    assert len(view.toPlainText()) < len(text)
+
+    view.reveal(far, far + 5)
+    assert view.window_start <= far < view.window_end
+    # Windows start and end on line boundaries
+    assert text[view.window_start - 1] == "\n"
+    assert view.toPlainText() == text[view.window_start:view.window_end]
+    assert view.to_offset(view.textCursor().selectionStart()) == far
+    assert _background_at(view, far + 1) == QColor("#ff0000")
+
+def test_small_document_is_shown_whole(repo):
+    text = LINE * 10
+    path = repo.texts_dir / "doc-0001.txt"
+    write_text_file(path, text)
+    doc_id = repo.register_document("notes.txt", path)
+
+    view = WindowedTextView(repo)
+    view.show_document(doc_id)
+    assert not view.windowed
+    assert view.toPlainText() == text
+    assert view.to_offset(view.to_position(len(LINE) + 31)) == len(LINE) + 31